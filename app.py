@@ -16,7 +16,9 @@ st.set_page_config(
 from components.sidebar import render_sidebar
 from components.analyze_ui import render_analyze_tab
 from components.demo_ui import render_demo_tab
+from components.portfolio_ui import render_portfolio_tab
 from components.dashboard_ui import render_dashboard
+from core.backend import drop_results
 
 # ==========================================
 # 3. RENDER SIDEBAR
@@ -34,9 +36,10 @@ st.markdown("<h5 style='text-align:center;color:#64748B;margin-top:-10px;margin-
 # 5. CLEAR STATE FUNCTION
 # ==========================================
 def clear_state():
-    for key in ["analysis_result", "email_draft", "demo_text", "doc_type"]:
-        if key in st.session_state: 
-            del st.session_state[key]
+    # Heavy results live in the engine's bounded session store, the flags in st.session_state
+    drop_results("analysis_result", "email_draft", "demo_text", "version_diff", "canonical_analysis", "canonical_diff", "clause_anchors")
+    if "doc_type" in st.session_state: 
+        del st.session_state["doc_type"]
 
 # ==========================================
 # 6. APP NAVIGATION (RADIO BUTTONS)
@@ -44,7 +47,7 @@ def clear_state():
 
 app_mode = st.radio(
     "Choose Mode:", 
-    ["📝 Analyze Your Contract", "⚡ Instant Demos"], 
+    ["📝 Analyze Your Contract", "⚡ Instant Demos", "📊 Portfolio"], 
     horizontal=True, 
     label_visibility="collapsed", 
     on_change=clear_state
@@ -54,8 +57,10 @@ st.markdown("<br>", unsafe_allow_html=True)
 
 if app_mode == "📝 Analyze Your Contract":
     render_analyze_tab()
-else:
+elif app_mode == "⚡ Instant Demos":
     render_demo_tab()
+else:
+    render_portfolio_tab()
 
 # ==========================================
 # 7. RESULTS DASHBOARD
@@ -0,0 +1,150 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core.anchoring import page_starts
+from core.classifier import classify_document
+from core.engine import EngineConfig, TrueClauseEngine, calculate_score, get_verdict
+from core.pdf import join_pages
+from rules import RULEBOOKS
+
+# ==========================================
+# 1. CONFIG
+# ==========================================
+SUPPORTED_EXTENSIONS = (".pdf", ".txt")
+
+# ==========================================
+# 2. PROVIDER RATE LIMIT (SHARED BY ALL WORKERS)
+# ==========================================
+class RateLimiter:
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        time.sleep(max(slot - now, 0.0))
+
+# ==========================================
+# 3. DIRECTORY WALK + RESUME
+# ==========================================
+def find_contracts(root: str) -> list:
+    found = []
+    for folder, _, files in os.walk(root):
+        found.extend(os.path.join(folder, name) for name in files if name.lower().endswith(SUPPORTED_EXTENSIONS))
+    return sorted(found)
+
+def load_done(output_path: str) -> set:
+    # Only successful rows count as done, so failed files are retried on the next run
+    done = set()
+    if os.path.exists(output_path):
+        with open(output_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # half-written last line from a crash
+                if row.get("status") == "ok":
+                    done.add(row["path"])
+    return done
+
+# ==========================================
+# 4. SINGLE FILE PIPELINE
+# ==========================================
+def process_file(engine: TrueClauseEngine, path: str, rules_text: str, doc_type: str, language: str, limiter: RateLimiter,
+                 portfolio: str = "default") -> dict:
+    started = time.perf_counter()
+    row = {"path": path, "doc_type": doc_type, "language": language}
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        row["sha256"] = hashlib.sha256(data).hexdigest()
+        starts = None
+        if path.lower().endswith(".pdf"):
+            pages = engine.extract_pdf_pages(data)
+            text, starts = join_pages(pages), page_starts(pages)
+        else:
+            text = data.decode("utf-8", errors="replace")
+        if len(text.split()) < 20:
+            raise ValueError("Not enough extractable text (scanned PDF or empty file).")
+        if rules_text is None:
+            # --doc-type auto: local classifier picks the rulebook per file
+            prediction = classify_document(text)
+            rules_text = RULEBOOKS[prediction.doc_type]
+            row.update(doc_type=prediction.doc_type, doc_type_confidence=prediction.confidence)
+        limiter.wait()
+        analysis = engine.analyze_contract(text, rules_text, language, doc_type=row["doc_type"], portfolio=portfolio)
+        score = calculate_score(analysis.risks)
+        # Quotes that are not in the file at all (paraphrased / invented) are flagged, not dropped
+        anchors = engine.anchor_clauses(analysis.risks, text, starts)
+        row.update(status="ok", score=score, verdict=get_verdict(score), analysis=analysis.model_dump(),
+                   anchors=[anchor._asdict() for anchor in anchors], quotes_not_found=sum(a.status == "not_found" for a in anchors))
+    except Exception as e:
+        row.update(status="error", error=f"{type(e).__name__}: {e}")
+    row["seconds"] = round(time.perf_counter() - started, 3)
+    return row
+
+def _format_eta(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"
+
+# ==========================================
+# 5. BATCH RUNNER
+# ==========================================
+def run(args) -> int:
+    files = find_contracts(args.input_dir)
+    done = load_done(args.output)
+    todo = [p for p in files if p not in done]
+    print(f"Found {len(files)} contract(s), {len(done)} already processed, {len(todo)} to go.", flush=True)
+    if not todo:
+        return 0
+
+    engine = TrueClauseEngine(EngineConfig.load())
+    limiter = RateLimiter(args.rate_per_minute)
+    write_lock = threading.Lock()
+    started, finished, failed = time.perf_counter(), 0, 0
+    with open(args.output, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(process_file, engine, path, RULEBOOKS.get(args.doc_type), args.doc_type, args.language, limiter, args.portfolio) for path in todo]
+        for future in as_completed(futures):
+            row = future.result()
+            with write_lock:
+                # One flushed line per file: a crash loses at most the file being written
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                out.flush()
+            finished += 1
+            failed += row["status"] != "ok"
+            elapsed = time.perf_counter() - started
+            rate = finished / elapsed if elapsed else 0.0
+            eta = (len(todo) - finished) / rate if rate else 0.0
+            print(f"[{finished}/{len(todo)}] {row['status']:<5} {row['seconds']:>7.2f}s  {os.path.basename(row['path'])}  "
+                  f"| {rate * 60:.1f} files/min, ETA {_format_eta(eta)}", flush=True)
+
+    print(f"Done: {finished - failed} ok, {failed} failed in {_format_eta(time.perf_counter() - started)}.", flush=True)
+    return 1 if failed else 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze a directory of contracts (PDF/TXT) headlessly and write JSONL results.")
+    parser.add_argument("input_dir", help="Directory to scan recursively for .pdf and .txt contracts")
+    parser.add_argument("-o", "--output", default="trueclause_results.jsonl", help="JSONL output file (appended to, used for resume)")
+    parser.add_argument("-t", "--doc-type", choices=sorted(RULEBOOKS) + ["auto"], default="generic",
+                        help="Rulebook to apply ('auto' = detect per file)")
+    parser.add_argument("-l", "--language", choices=["English", "Hindi", "Hinglish"], default="English")
+    parser.add_argument("-p", "--portfolio", default="default", help="Portfolio name the results are filed under (see /v1/portfolio)")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Concurrent files in flight")
+    parser.add_argument("-r", "--rate-per-minute", type=float, default=30.0, help="Max analyze calls per minute across all workers (0 = unlimited)")
+    return run(parser.parse_args(argv))
+
+if __name__ == "__main__":
+    sys.exit(main())
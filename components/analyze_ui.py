@@ -1,5 +1,8 @@
 import streamlit as st
-from core.backend import analyze_contract, extract_text_from_pdf
+from core.backend import (CANONICAL_LANGUAGE, anchor_clauses, analyze_contract, classify_document, compare_versions, drop_results,
+                          extract_pdf_pages, join_pages, load_result, page_starts, providers_configured, save_result, translate_analysis,
+                          translate_diff)
+from components.dashboard_ui import render_live_risks
 
 # ==========================================
 # 1. KNOWLEDGE BASE IMPORTS
@@ -19,9 +22,17 @@ except ImportError:
 # 2. HELPER TO CLEAR STATE
 # ==========================================
 def clear_state():
-    if "analysis_result" in st.session_state: del st.session_state["analysis_result"]
-    if "email_draft" in st.session_state: del st.session_state["email_draft"]
-    if "demo_text" in st.session_state: del st.session_state["demo_text"]
+    drop_results("analysis_result", "email_draft", "demo_text", "version_diff", "canonical_analysis", "canonical_diff", "clause_anchors")
+    # "previous_version" deliberately survives: uploading the revised draft must not forget round one
+
+def show_report(canonical, canonical_diff, language):
+    # Reports are analyzed in CANONICAL_LANGUAGE; the dashboard shows them translated (no call for English or cached findings)
+    save_result("analysis_result", translate_analysis(canonical, language))
+    if canonical_diff is not None:
+        save_result("version_diff", translate_diff(canonical_diff, language))
+    # The draft was written in the old language
+    drop_results("email_draft")
+    st.session_state["language"] = language
 
 # ==========================================
 # 3. THE ANALYZE TAB UI
@@ -35,24 +46,52 @@ def render_analyze_tab():
         "Terms of Service / Privacy Policy": TOS_RULES, 
         "Other / Generic Contract": GENERIC_RULES
     }
+    # Classifier / API keys -> selectbox labels (same order as rule_mapping)
+    labels = dict(zip(["employment", "rent", "freelance", "nda", "tos", "generic"], rule_mapping))
+
+    # Auto-detected type of the latest upload / paste: has to land in the widget state before the selectbox is drawn
+    suggestion = st.session_state.get("doc_type_suggestion")
+    if suggestion and not suggestion["applied"]:
+        st.session_state["doc_type_choice"] = labels[suggestion["doc_type"]]
+        suggestion["applied"] = True
     
     col1, col2 = st.columns(2)
     with col1: 
-        doc_type = st.selectbox("📄 Step 1: Document Type", list(rule_mapping.keys()), on_change=clear_state)
+        doc_type = st.selectbox("📄 Step 1: Document Type", list(rule_mapping.keys()), key="doc_type_choice", on_change=clear_state)
     with col2: 
-        language = st.selectbox("🌐 Step 2: Explanation Language", ["English", "Hindi", "Hinglish"], on_change=clear_state)
+        language = st.selectbox("🌐 Step 2: Explanation Language", ["English", "Hindi", "Hinglish"])
+
+    # Language switch on an analyzed contract: translate the stored report instead of clearing it
+    canonical = load_result("canonical_analysis")
+    if canonical is not None and st.session_state.get("language", language) != language:
+        with st.spinner(f"Translating the report into {language}... 🌐"):
+            show_report(canonical, load_result("canonical_diff"), language)
     
+    if not providers_configured():
+        st.info("🔌 Offline mode: no AI engine is configured, so TrueClause will run its local rulebook pre-screen only.")
+
     uploaded_file = st.file_uploader("📂 Step 3: Upload PDF Contract", type=["pdf"], on_change=clear_state)
     
-    user_text = ""
+    user_text, starts = "", None
     if uploaded_file is not None:
         try:
-            extracted_text = extract_text_from_pdf(uploaded_file)
+            # Scanned pages go through local OCR (cached per page), which takes a few seconds the first time
+            with st.spinner("Reading your PDF... 📄"):
+                progress = st.empty()
+                pages = extract_pdf_pages(uploaded_file, on_page=lambda page: progress.caption(f"📄 Page {page.number} read"))
+                progress.empty()
+            extracted_text = join_pages(pages)
+            scanned_pages = [p.number for p in pages if not p.has_text_layer and not p.ocr]
+            ocr_pages = [p.number for p in pages if p.ocr]
             if len(extracted_text.split()) < 30:
                 st.warning("⚠️ We couldn't extract enough text from this PDF. It might be a scanned image. Please copy and paste the text manually below.")
             else:
-                user_text = extracted_text
+                user_text, starts = extracted_text, page_starts(pages)
                 st.success("PDF Text Extracted Successfully! Ready for review.")
+                if ocr_pages:
+                    st.caption(f"🔎 Page(s) {', '.join(map(str, ocr_pages))} were scanned images and were read with OCR. Please skim the extracted text for misread numbers.")
+                if scanned_pages:
+                    st.caption(f"ℹ️ Page(s) {', '.join(map(str, scanned_pages))} look like scanned images and were skipped.")
                 with st.expander("👁️ View Extracted Text"): 
                     st.text(user_text[:1000] + "... (truncated)")
         except Exception:
@@ -62,15 +101,74 @@ def render_analyze_tab():
     if not user_text:
         user_text = st.text_area("📝 Or Paste Contract Text Here", height=150, placeholder="Paste your text here...", on_change=clear_state)
     
+    # Local TF-IDF classifier (~1ms, no network): pre-select the rulebook once per new text, the user can still override it
+    if user_text.strip():
+        if not suggestion or suggestion["text_hash"] != hash(user_text):
+            prediction = classify_document(user_text)
+            suggestion = {"text_hash": hash(user_text), "doc_type": prediction.doc_type, "confidence": prediction.confidence,
+                          "applied": not prediction.confidence or labels[prediction.doc_type] == doc_type}
+            st.session_state["doc_type_suggestion"] = suggestion
+            if not suggestion["applied"]:
+                st.rerun()
+        if suggestion["confidence"]:
+            st.caption(f"🧭 Looks like a **{labels[suggestion['doc_type']]}** ({suggestion['confidence']:.0%} confident). Change Step 1 if that's wrong.")
+        else:
+            st.caption("🧭 We couldn't recognize the document type automatically. Please double-check Step 1.")
+
+    # Negotiation rounds: offer a diff against the last analyzed draft of the same document type (any language, findings are canonical)
+    previous = st.session_state.get("previous_version")
+    compare = False
+    if previous and previous["doc_type"] == doc_type and user_text and hash(user_text) != previous["text_hash"]:
+        compare = st.checkbox(f"🔁 Compare with the previous version (round {previous['round']}) - only changed clauses are re-analyzed", value=True)
+
     # Changed from 🚨 Audit to 🔍 Analyze for a professional SaaS vibe
     if st.button("🔍 Analyze Agreement", type="primary", use_container_width=True):
         if len(user_text.split()) < 20:
             st.warning("⚠️ Please provide a bit more text. This doesn't look like a complete contract.")
         else:
             with st.spinner("Analyzing against industry standards... ⚙️"):
+                queue_notice = st.empty()
+                progress_bar = st.empty()
+                live_preview = st.empty()
+                def show_progress(done, total):
+                    # Only long contracts are split into sections, so the bar only shows up for them
+                    progress_bar.progress(done / total, text=f"Analyzed {done} of {total} sections...")
+                def show_queue(position, eta_seconds):
+                    # Busy hour: tell the user where they stand instead of failing with a 429
+                    if position:
+                        queue_notice.info(f"⏳ Lots of contracts being reviewed right now. You're #{position} in line (about {max(1, round(eta_seconds))}s).")
+                    else:
+                        queue_notice.empty()
                 try:
-                    st.session_state["analysis_result"] = analyze_contract(user_text, rule_mapping[doc_type], language)
+                    previous_text, previous_analysis = (load_result("previous_text"), load_result("previous_analysis")) if compare else (None, None)
+                    if compare and (previous_text is None or previous_analysis is None):
+                        # Evicted from the session store (idle too long / memory cap): fall back to a full analysis
+                        st.info("⌛ The previous version expired, so this draft gets a full analysis.")
+                        compare = False
+                    # Live preview cards are canonical; the final report below is in the chosen language
+                    version_diff = None
+                    if compare:
+                        result, version_diff = compare_versions(previous_text, previous_analysis, user_text, rule_mapping[doc_type], CANONICAL_LANGUAGE,
+                                                                on_progress=show_progress, on_queue=show_queue)
+                        save_result("canonical_diff", version_diff)
+                    else:
+                        drop_results("version_diff", "canonical_diff")
+                        result = analyze_contract(user_text, rule_mapping[doc_type], CANONICAL_LANGUAGE,
+                                                  on_progress=show_progress, on_queue=show_queue,
+                                                  on_risks=lambda risks: render_live_risks(live_preview, risks))
+                    save_result("canonical_analysis", result)
+                    # Where each quoted clause sits in the text (page + highlight), found locally; translation keeps the order
+                    save_result("clause_anchors", anchor_clauses(result.risks, user_text, starts))
+                    show_report(result, version_diff, language)
                     st.session_state["doc_type"] = doc_type 
+                    save_result("previous_text", user_text)
+                    save_result("previous_analysis", result)
+                    st.session_state["previous_version"] = {"text_hash": hash(user_text), "doc_type": doc_type,
+                                                            "round": previous["round"] + 1 if compare else 1}
                 except Exception:
                     # GRACEFUL HANDLING: No raw errors, just a polite message
                     st.warning("⚠️ Our AI engines are experiencing unusually high traffic right now. Please try clicking 'Analyze' again in a few seconds!")
+                queue_notice.empty()
+                progress_bar.empty()
+                # The full report below replaces the live preview
+                live_preview.empty()
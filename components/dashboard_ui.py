@@ -1,32 +1,20 @@
+import html
 import streamlit as st
-from core.backend import calculate_score, generate_report_text, generate_email
+from core.anchoring import Anchor, highlight_html
+from core.backend import HIGH_RISK_SCORE, REVIEW_SCORE, calculate_score, get_verdict, generate_report_text, generate_email, load_result, save_result
 
 # ==========================================
-# 4. THE RESULTS DASHBOARD UI
+# 3. SHARED PIECES (FINAL REPORT + LIVE STREAMING PREVIEW)
 # ==========================================
-def render_dashboard():
-    # Agar abhi tak koi analysis nahi hua hai, toh dashboard mat dikhao
-    if "analysis_result" not in st.session_state: 
-        return
-    
-    analysis = st.session_state["analysis_result"]
-    st.markdown("<br>", unsafe_allow_html=True)
-    st.subheader("🛡️ TrueClause Intelligence Report")
-
-    # Agar koi risk nahi mila
-    if not analysis.risks:
-        st.success("✅ Good news! This contract aligns with standard industry practices. No significant deviations found.")
-        st.balloons()
-        return
-
+def render_score_header(risks):
     # Score aur Verdict calculate karna
-    score = calculate_score(analysis.risks)
-    verdict = "⚠️ High Risk Exposure" if score >= 70 else "⚖️ Review & Negotiate" if score >= 30 else "✅ Standard Terms"
+    score = calculate_score(risks)
+    verdict = get_verdict(score)
     
     # Premium B2B SaaS Colors (Tailwind inspired soft backgrounds with crisp borders)
-    if score >= 70:
+    if score >= HIGH_RISK_SCORE:
         bg_color, border_color = "#FEF2F2", "#DC2626" # Soft Red
-    elif score >= 30:
+    elif score >= REVIEW_SCORE:
         bg_color, border_color = "#FFFBEB", "#D97706" # Soft Amber
     else:
         bg_color, border_color = "#F0FDF4", "#16A34A" # Soft Green
@@ -37,14 +25,96 @@ def render_dashboard():
     with c2:
         st.markdown(f"<h4 style='margin-bottom: 5px; color: #1E293B;'>Verdict: {verdict}</h4>", unsafe_allow_html=True)
         st.progress(score / 100)
-        st.write(f"Found **{len(analysis.risks)}** clause deviation(s).")
+        st.write(f"Found **{len(risks)}** clause deviation(s).")
+
+    return score, verdict
+
+def render_risk_card(r, location=None):
+    with st.container(border=True):
+        icon, color = ("🚨", "#DC2626") if r.risk_level.upper() == "HIGH" else ("⚠️", "#D97706")
+        st.markdown(f"<h5 style='color:{color}; margin-bottom: 10px;'>{icon} {r.risk_level.upper()} RISK | {r.category}</h5>", unsafe_allow_html=True)
+        st.markdown("**📜 Found in Contract:**")
+        st.info(f"\"{r.clause_text}\"") 
+        if location is not None:
+            render_clause_location(Anchor(**location["anchor"]), location["context"])
+        st.markdown(f"**⚖️ Baseline (Standard):** {r.baseline}")
+        st.markdown(f"**⚠️ Deviation Found:** <span style='color:{color}; font-weight:500;'>{r.deviation}</span>", unsafe_allow_html=True)
+        st.markdown(f"**🛡️ Recommended Fix:** {r.suggestion}")
+
+def render_clause_location(anchor, context):
+    # From anchor_clauses(): page + the quote highlighted in its surroundings (context = [before, match, after])
+    if anchor.status == "not_found":
+        st.warning("🔎 We couldn't find this quote in your document. The AI may have paraphrased or invented it, so please double-check this point.")
+        return
+    where = f"on page {anchor.page}" if anchor.page else "in your document"
+    if anchor.status == "exact":
+        st.caption(f"📍 Found word-for-word {where}.")
+    elif anchor.score == 1.0:
+        st.caption(f"📍 Found {where}. The AI left out part of the clause (\"...\").")
+    else:
+        st.caption(f"📍 Closest match {where} ({anchor.score:.0%} of the quoted words). The AI shortened or reworded this quote.")
+    with st.expander("📄 Show in document"):
+        st.markdown(f"<div style='font-size: 14px; line-height: 1.6;'>{highlight_html(*context)}</div>", unsafe_allow_html=True)
+
+def render_live_risks(placeholder, risks):
+    # Redrawn on every streamed risk: score so far + one card per finished risk
+    with placeholder.container():
+        st.caption("⚡ Live preview: risks appear as the AI finds them...")
+        render_score_header(risks)
+        for r in risks:
+            render_risk_card(r)
 
+def render_version_diff(diff):
+    # Revised draft vs the previous round: what the counterparty actually fixed (or slipped in)
+    st.markdown("<h3 style='color: #1E3A8A; margin-top: 10px;'>🔁 Changes Since the Previous Version</h3>", unsafe_allow_html=True)
+    c1, c2, c3 = st.columns(3)
+    c1.metric("✅ Resolved", len(diff.resolved))
+    c2.metric("🆕 Introduced", len(diff.introduced))
+    c3.metric("➖ Unchanged", len(diff.unchanged))
+    st.caption(f"Re-analyzed {diff.clauses_reanalyzed} of {diff.clauses_total} clause(s); {diff.clauses_removed} removed. Everything else kept its earlier findings.")
+    if diff.introduced:
+        with st.expander(f"🆕 New risks in this version ({len(diff.introduced)})", expanded=True):
+            for r in diff.introduced:
+                render_risk_card(r)
+    if diff.resolved:
+        with st.expander(f"✅ Risks resolved since the previous version ({len(diff.resolved)})"):
+            for r in diff.resolved:
+                st.markdown(f"- ~~{r.category}: \"{r.clause_text}\"~~")
+
+# ==========================================
+# 4. THE RESULTS DASHBOARD UI
+# ==========================================
+def render_dashboard():
+    # Agar abhi tak koi analysis nahi hua hai, toh dashboard mat dikhao
+    analysis = load_result("analysis_result")
+    if analysis is None: 
+        return
+
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.subheader("🛡️ TrueClause Intelligence Report")
+
+    version_diff = load_result("version_diff")
+    if version_diff is not None:
+        render_version_diff(version_diff)
+
+    # Agar koi risk nahi mila
+    if not analysis.risks:
+        st.success("✅ Good news! This contract aligns with standard industry practices. No significant deviations found.")
+        st.balloons()
+        return
+
+    score, verdict = render_score_header(analysis.risks)
     st.write("---")
+
+    # One location per risk, same order as the report; anything else is a stale leftover
+    locations = load_result("clause_anchors") or []
+    if len(locations) != len(analysis.risks):
+        locations = [None] * len(analysis.risks)
     
     # Download Button
     st.download_button(
         label="📥 Download TrueClause Report", 
-        data=generate_report_text(analysis, score, verdict), 
+        data=generate_report_text(analysis, score, verdict, [Anchor(**l["anchor"]) for l in locations if l] or None), 
         file_name="TrueClause_Audit_Report.txt", 
         mime="text/plain", 
         use_container_width=True
@@ -57,27 +127,43 @@ def render_dashboard():
                 st.markdown(f"- **{s.clause_summary}**: {s.reason}")
 
     st.markdown("<h3 style='color: #1E3A8A; margin-top: 20px;'>🔍 The Breakdown (Baseline vs Deviation)</h3>", unsafe_allow_html=True)
-    for r in analysis.risks:
-        with st.container(border=True):
-            icon, color = ("🚨", "#DC2626") if r.risk_level.upper() == "HIGH" else ("⚠️", "#D97706")
-            st.markdown(f"<h5 style='color:{color}; margin-bottom: 10px;'>{icon} {r.risk_level.upper()} RISK | {r.category}</h5>", unsafe_allow_html=True)
-            st.markdown("**📜 Found in Contract:**")
-            st.info(f"\"{r.clause_text}\"") 
-            st.markdown(f"**⚖️ Baseline (Standard):** {r.baseline}")
-            st.markdown(f"**⚠️ Deviation Found:** <span style='color:{color}; font-weight:500;'>{r.deviation}</span>", unsafe_allow_html=True)
-            st.markdown(f"**🛡️ Recommended Fix:** {r.suggestion}")
+    missing = sum(1 for l in locations if l and l["anchor"]["status"] == "not_found")
+    if missing:
+        st.warning(f"🔎 {missing} of {len(analysis.risks)} quoted clause(s) could not be found in your document. Those findings are marked below.")
+    for r, location in zip(analysis.risks, locations):
+        render_risk_card(r, location)
             
     st.write("---")
     
     st.subheader("✉️ Negotiation Assistant")
     st.info("Let our agentic workflow draft a polite, corporate-ready email to negotiate these flagged terms.")
+    c1, c2 = st.columns([1, 2])
+    with c1:
+        tone = st.selectbox("🎙️ Tone", ["Polite", "Firm", "Friendly"])
+    with c2:
+        st.markdown("<br>", unsafe_allow_html=True)
+        same_context = st.checkbox("🔗 Continue the analysis conversation (the AI cites its own findings instead of us re-sending them)")
     if st.button("✨ Draft Negotiation Email"):
         with st.spinner("Drafting your email... ✍️"):
+            queue_notice = st.empty()
+            live_draft = st.empty()
+            def show_queue(position, eta_seconds):
+                if position:
+                    queue_notice.info(f"⏳ You're #{position} in line for the email engine (about {max(1, round(eta_seconds))}s).")
+                else:
+                    queue_notice.empty()
+            def show_draft(text):
+                # Tokens appear as they are written; the editable text area below takes over when done
+                live_draft.markdown(f"<div style='white-space: pre-wrap; padding: 12px; border: 1px solid #E2E8F0; border-radius: 8px;'>{html.escape(text)}▌</div>", unsafe_allow_html=True)
             try: 
-                st.session_state["email_draft"] = generate_email(analysis.risks, st.session_state["doc_type"])
+                save_result("email_draft", generate_email(analysis.risks, st.session_state["doc_type"], st.session_state.get("language", "English"),
+                                                          tone, same_context, on_queue=show_queue, on_text=show_draft))
             except Exception as e:
                 st.warning(f"⚠️ {str(e)} Please try drafting again in a few moments.")
+            queue_notice.empty()
+            live_draft.empty()
                 
-    if "email_draft" in st.session_state:
+    email_draft = load_result("email_draft")
+    if email_draft is not None:
         st.success("Draft Generated!")
-        st.text_area("Review, copy, and send:", value=st.session_state["email_draft"], height=250)
+        st.text_area("Review, copy, and send:", value=email_draft, height=250)
@@ -1,5 +1,7 @@
 import streamlit as st
-from core.backend import ContractAnalysis, RiskItem, SafeItem
+from core.backend import anchor_clauses, drop_results, load_result, save_result
+from core.models import ContractAnalysis, RiskItem, SafeItem
+from rules.demos import DEMO_CONTRACTS
 
 # ==========================================
 # 5. THE DEMO TAB UI
@@ -11,12 +13,15 @@ def render_demo_tab():
     def toggle_demo_state(selected_doc_type, text_content, analysis_obj):
         # Agar same button wapas click hua hai, toh close kar do (clear state)
         if st.session_state.get("doc_type") == selected_doc_type:
-            for key in ["demo_text", "analysis_result", "doc_type", "email_draft"]:
-                st.session_state.pop(key, None)
+            drop_results("demo_text", "analysis_result", "email_draft", "canonical_analysis", "clause_anchors")
+            st.session_state.pop("doc_type", None)
         # Warna naya demo open kar do (set state)
         else:
-            st.session_state["demo_text"] = text_content
-            st.session_state["analysis_result"] = analysis_obj
+            save_result("demo_text", text_content)
+            save_result("analysis_result", analysis_obj)
+            save_result("clause_anchors", anchor_clauses(analysis_obj.risks, text_content))
+            # Pre-written in English; a stale upload's report must not come back on a language switch
+            drop_results("canonical_analysis", "canonical_diff", "version_diff")
             st.session_state["doc_type"] = selected_doc_type
 
     col1, col2, col3 = st.columns(3)
@@ -33,7 +38,7 @@ def render_demo_tab():
                     SafeItem(clause_summary="6-Month Probation Period", reason="Standard duration across the IT industry.")
                 ]
             )
-            text = "EMPLOYMENT AGREEMENT\n\n1. The employee shall be on a standard probation period of 6 months.\n2. The Company reserves the right to terminate the employee immediately without notice, while the employee must serve a 90-day notice period if they wish to resign.\n3. The Employee agrees to pay a training recovery fee of ₹3,00,000 if they leave within the first 2 years of service.\n4. The employee is bound by a standard confidentiality agreement (NDA) during and after employment."
+            text = DEMO_CONTRACTS["employment"]
             toggle_demo_state("Employment / Job Offer", text, analysis)
 
     with col2:
@@ -48,7 +53,7 @@ def render_demo_tab():
                     SafeItem(clause_summary="Residential Use Only", reason="Standard zoning and usage restriction.")
                 ]
             )
-            text = "LEASE AGREEMENT\n\n1. The Tenant shall pay a security deposit of ₹1,00,000.\n2. The Landlord reserves the right to automatically deduct 50% of the security deposit for 'standard repainting and deep cleaning' upon vacating, regardless of the flat's actual condition.\n3. The Tenant must give 2 months' notice to vacate, but the Landlord can evict the Tenant with 24 hours' notice.\n4. The Tenant is allowed to use the premises for residential purposes only."
+            text = DEMO_CONTRACTS["rent"]
             toggle_demo_state("Rental / Lease Agreement", text, analysis)
 
     with col3:
@@ -62,12 +67,13 @@ def render_demo_tab():
                     SafeItem(clause_summary="Independent Contractor Status", reason="Standard classification for freelance work, exempting client from employee benefits.")
                 ]
             )
-            text = "INDEPENDENT CONTRACTOR AGREEMENT\n\n1. The Contractor will operate as an independent contractor, not an employee.\n2. The Contractor will be paid strictly on a Net-90 days basis after invoice submission.\n3. The Contractor may not work with any other client in the software industry globally for a period of 5 years after project completion."
+            text = DEMO_CONTRACTS["freelance"]
             toggle_demo_state("Freelance / Agency Contract", text, analysis)
 
     # 👁️ THE UX MASTERSTROKE
-    if "demo_text" in st.session_state:
+    demo_text = load_result("demo_text")
+    if demo_text is not None:
         st.markdown("<br>", unsafe_allow_html=True)
         with st.expander("👁️ View the Contract Text being analyzed", expanded=False):
             st.info("This is the exact text TrueClause is analyzing in the background.")
-            st.text(st.session_state["demo_text"])
+            st.text(demo_text)
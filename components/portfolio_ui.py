@@ -0,0 +1,57 @@
+import time
+import streamlit as st
+from core.backend import portfolio, portfolio_options
+
+# ==========================================
+# 7. THE PORTFOLIO TAB UI (ALL ANALYSES, AGGREGATED)
+# ==========================================
+PERIODS = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "Last year": 365, "All time": None}
+
+def render_portfolio_tab():
+    st.info("📊 Every contract analyzed on this instance, scored together. Only risk levels, categories and doc types are kept, never contract text.")
+    options = portfolio_options()
+    if not options["doc_types"]:
+        st.caption("No analyses recorded yet. Analyze a contract (or run bulk_analyze.py) and come back here.")
+        return
+
+    c1, c2, c3, c4 = st.columns([2, 2, 1.4, 1.2])
+    with c1:
+        doc_types = st.multiselect("Document types", options["doc_types"], placeholder="All types")
+    with c2:
+        portfolios = st.multiselect("Portfolios", options["portfolios"], placeholder="All portfolios")
+    with c3:
+        period = st.selectbox("Period", list(PERIODS), index=4)
+    with c4:
+        level = st.selectbox("Risk level", ["HIGH", "MEDIUM"])
+
+    days = PERIODS[period]
+    result = portfolio(doc_types=doc_types, portfolios=portfolios, level=level, since=time.time() - days * 86400 if days else None)
+    if not result["analyses"]:
+        st.warning("No analyses match these filters.")
+        return
+
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Contracts", f"{result['analyses']:,}")
+    m2.metric("Avg. risk score", f"{result['mean_score']}%")
+    m3.metric("P90 risk score", f"{result['p90_score']:.0f}%")
+    high_risk = list(result["verdicts"].values())[-1]
+    m4.metric("High risk exposure", f"{high_risk / result['analyses']:.0%}")
+
+    # Which clause categories drive the chosen level
+    st.markdown(f"#### 🧭 What drives {result['level']} risk")
+    st.bar_chart({d["category"]: d["risks"] for d in result["drivers"]}, horizontal=True)
+    st.dataframe(
+        [{"Category": d["category"], f"{result['level']} risks": d["risks"], "Share": f"{d['share']:.0%}",
+          "Contracts affected": f"{d['contract_share']:.0%}", "In high-risk contracts": d["in_high_risk_contracts"]}
+         for d in result["drivers"]],
+        hide_index=True, use_container_width=True,
+    )
+
+    st.markdown("#### 🗂️ By document type")
+    st.dataframe(
+        [{"Type": d["doc_type"], "Contracts": d["analyses"], "Avg. score": d["mean_score"], "High risk": f"{d['high_risk_share']:.0%}"}
+         for d in result["by_doc_type"]],
+        hide_index=True, use_container_width=True,
+    )
+    st.caption("Verdicts: " + " · ".join(f"{name} {count:,}" for name, count in result["verdicts"].items())
+               + f" | computed in {result['query_ms']:.0f} ms")
@@ -21,11 +21,13 @@ def render_sidebar():
                 if len(feedback_text.strip()) < 5:
                     st.warning("Please provide a few more details so we can understand your feedback.")
                 else:
-                    with st.spinner("Securely routing your feedback... ⚙️"):
-                        try:
-                            # Calling the backend function
-                            response = send_feedback(feedback_text)
+                    try:
+                        # Only written to the local spool here; a background worker delivers it (instant, even if Discord is down)
+                        if send_feedback(feedback_text):
                             st.success("Feedback received! Thanks for helping us improve TrueClause.")
-                        except Exception:
-                            # GRACEFUL HANDLING: Production ready polite error
-                            st.error("We couldn't connect to our servers right now. Please try again later.")
+                        else:
+                            # No delivery channel on this deployment: don't claim it reached the team
+                            st.info("Thanks! Your feedback was saved on this server, but feedback delivery isn't set up here yet, so the team hasn't received it.")
+                    except Exception:
+                        # GRACEFUL HANDLING: Production ready polite error
+                        st.error("We couldn't save your feedback on this device right now. Please try again in a moment.")
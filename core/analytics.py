@@ -0,0 +1,375 @@
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from core.cache import make_cache_key
+from core.repair import CATEGORIES, normalize_category
+
+# ==========================================
+# 1. SCORING RULES (ONE PLACE FOR THE UI, REPORTS AND PORTFOLIO QUERIES)
+# ==========================================
+RISK_POINTS = {"HIGH": 30, "MEDIUM": 15}   # anything that is not HIGH counts as MEDIUM
+MAX_SCORE = 100
+HIGH_RISK_SCORE = 70   # >= "High Risk Exposure"
+REVIEW_SCORE = 30      # >= "Review & Negotiate", below = "Standard Terms"
+VERDICTS = ("✅ Standard Terms", "⚖️ Review & Negotiate", "⚠️ High Risk Exposure")
+
+def score_columns(high, medium):
+    # calculate_score() over whole NumPy columns of per-contract HIGH / MEDIUM counts
+    import numpy as np
+    return np.minimum(high * RISK_POINTS["HIGH"] + medium * RISK_POINTS["MEDIUM"], MAX_SCORE)
+
+def verdict_for(score) -> str:
+    return VERDICTS[2] if score >= HIGH_RISK_SCORE else VERDICTS[1] if score >= REVIEW_SCORE else VERDICTS[0]
+
+_RULEBOOK_NAMES = None
+
+def doc_type_for(rules_text: str) -> str:
+    # Engine callers pass rulebook text, not its key: reverse lookup, anything else is "custom"
+    global _RULEBOOK_NAMES
+    if _RULEBOOK_NAMES is None:
+        from rules import RULEBOOKS
+        _RULEBOOK_NAMES = {text: name for name, text in RULEBOOKS.items()}
+    return _RULEBOOK_NAMES.get(rules_text, "custom")
+
+# ==========================================
+# 2. COLUMNAR STORE (NUMPY SEGMENTS + APPEND LOG)
+# ==========================================
+# Only machine values are kept: no clause text, no explanations, no file names.
+# Every analysis is one line in log.jsonl (cheap, crash-safe); every COMPACT_ROWS lines become an .npz segment of
+# dictionary-encoded columns. Queries run on the concatenated in-memory columns, time-sorted so a date range is a
+# binary search; risks point at their analysis row, so any analysis filter is one gather away from the risk columns.
+ANALYSIS_COLUMNS = {"ts": "float64", "doc_type": "int16", "portfolio": "int16", "high": "int16", "medium": "int16",
+                    "safe": "int16", "contract": "uint64"}
+RISK_COLUMNS = {"row": "int64", "level": "int8", "category": "int8"}
+LEVEL_CODES = {"HIGH": 0, "MEDIUM": 1}
+CATEGORY_CODES = {name: i for i, name in enumerate(CATEGORIES)}
+COMPACT_ROWS = 2000
+MAX_SEGMENTS = 32   # more than this on load -> merged into one
+
+def _empty(columns: dict) -> dict:
+    import numpy as np
+    return {name: np.empty(0, dtype) for name, dtype in columns.items()}
+
+def _concat(parts: list, columns: dict) -> dict:
+    import numpy as np
+    parts = [p for p in parts if len(p[next(iter(columns))])]
+    if not parts:
+        return _empty(columns)
+    return {name: np.concatenate([p[name] for p in parts]).astype(dtype, copy=False) for name, dtype in columns.items()}
+
+@contextmanager
+def _file_lock(path: str):
+    # bulk_analyze.py, the API and the app share one store directory: one process at a time appends, compacts or reloads,
+    # so no row lands in log.jsonl between a compaction reading it and truncating it
+    if not path:
+        yield
+        return
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, ".lock"), "a+b") as f:
+        try:
+            import fcntl
+        except ImportError:
+            fcntl = None   # Windows
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+class AnalyticsStore:
+    def __init__(self, path: str = ".trueclause_cache/analytics"):
+        self.path = path   # "" = in memory only
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._disk = None  # files as last read / written by this process
+        self._vocab = {"doc_type": [], "portfolio": []}
+        self._codes = {"doc_type": {}, "portfolio": {}}
+        self._analyses, self._risks = None, None
+        self._tail = []    # rows recorded since the columns were last built
+        self._logged = 0   # rows in log.jsonl (not yet in a segment)
+        self._seen = set() # (contract, portfolio): re-running the same contract is not a new data point
+
+    # ---------- writes ----------
+    def record(self, analysis, doc_type: str, portfolio: str = "default", contract_key: str = "", ts: float = None) -> bool:
+        # False when this contract was already recorded for this portfolio
+        contract = int(contract_key[:16], 16) if contract_key else 0
+        row = {"ts": time.time() if ts is None else ts, "doc_type": doc_type or "custom", "portfolio": portfolio or "default",
+               "contract": contract, "safe": len(analysis.safe_clauses),
+               "risks": [[r.risk_level.upper() if r.risk_level.upper() in LEVEL_CODES else "MEDIUM", normalize_category(r.category)]
+                         for r in analysis.risks]}
+        with self._lock, _file_lock(self.path):
+            self._load()
+            if contract and (contract, row["portfolio"]) in self._seen:
+                return False
+            self._seen.add((contract, row["portfolio"]))
+            self._tail.append(row)
+            if self.path:
+                with open(os.path.join(self.path, "log.jsonl"), "a", encoding="utf-8") as f:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                self._logged += 1
+                if self._logged >= COMPACT_ROWS:
+                    self._compact()
+                self._disk = self._disk_state()
+        return True
+
+    def append_columns(self, analyses: dict, risks: dict, vocab: dict):
+        # Bulk import (backfills, benchmarks): columns in the store's layout, codes relative to `vocab`
+        import numpy as np
+        with self._lock, _file_lock(self.path):
+            self._load()
+            self._columns()
+            offset = len(self._analyses["ts"])
+            analyses = dict(analyses)
+            for field in ("doc_type", "portfolio"):
+                remap = np.array([self._code(field, name) for name in vocab[field]], dtype="int16")
+                analyses[field] = remap[np.asarray(analyses[field])]
+            risks = {**risks, "row": np.asarray(risks["row"], dtype="int64") + offset}
+            self._analyses = _concat([self._analyses, analyses], ANALYSIS_COLUMNS)
+            self._risks = _concat([self._risks, risks], RISK_COLUMNS)
+            self._seen.update(zip(analyses["contract"].tolist(), [self._vocab["portfolio"][c] for c in analyses["portfolio"].tolist()]))
+            self._sort()
+            if self.path:
+                self._write_segment(analyses, risks)
+                self._disk = self._disk_state()
+
+    def _code(self, field: str, name: str) -> int:
+        codes = self._codes[field]
+        if name not in codes:
+            codes[name] = len(self._vocab[field])
+            self._vocab[field].append(name)
+        return codes[name]
+
+    # ---------- persistence ----------
+    def _disk_state(self) -> tuple:
+        # Segment names + log size: changes when another process (bulk_analyze.py, the API) wrote to the same store
+        log_path = os.path.join(self.path, "log.jsonl")
+        return tuple(sorted(glob.glob(os.path.join(self.path, "segment-*.npz")))), os.path.getsize(log_path) if os.path.exists(log_path) else 0
+
+    def _load(self):
+        if self._loaded and (not self.path or self._disk_state() == self._disk):
+            return
+        import numpy as np
+        self._loaded = True
+        self._analyses, self._risks = _empty(ANALYSIS_COLUMNS), _empty(RISK_COLUMNS)
+        self._vocab, self._codes = {"doc_type": [], "portfolio": []}, {"doc_type": {}, "portfolio": {}}
+        self._tail, self._logged, self._seen = [], 0, set()
+        if not self.path:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        vocab_path = os.path.join(self.path, "vocab.json")
+        if os.path.exists(vocab_path):
+            with open(vocab_path, encoding="utf-8") as f:
+                self._vocab = json.load(f)
+            self._codes = {field: {name: i for i, name in enumerate(names)} for field, names in self._vocab.items()}
+        analyses, risks, offset = [], [], 0
+        segments = sorted(glob.glob(os.path.join(self.path, "segment-*.npz")))
+        for segment in segments:
+            with np.load(segment) as data:
+                part = {name: data["a_" + name] for name in ANALYSIS_COLUMNS}
+                risk_part = {name: data["r_" + name] for name in RISK_COLUMNS}
+            risk_part["row"] = risk_part["row"] + offset
+            offset += len(part["ts"])
+            analyses.append(part)
+            risks.append(risk_part)
+        self._analyses, self._risks = _concat(analyses, ANALYSIS_COLUMNS), _concat(risks, RISK_COLUMNS)
+        self._seen = set(zip(self._analyses["contract"].tolist(), [self._vocab["portfolio"][c] for c in self._analyses["portfolio"].tolist()]))
+        self._sort()
+        log_path = os.path.join(self.path, "log.jsonl")
+        if os.path.exists(log_path):
+            with open(log_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # half-written last line from a crash
+                    if row["contract"] and (row["contract"], row["portfolio"]) in self._seen:
+                        continue  # already in a segment (crash between compaction and log truncation)
+                    self._tail.append(row)
+                    self._seen.add((row["contract"], row["portfolio"]))
+                    self._logged += 1
+        if len(segments) > MAX_SEGMENTS:
+            self._columns()
+            for segment in segments:
+                os.remove(segment)
+            self._write_segment(self._analyses, self._risks)
+            self._truncate_log()
+        self._disk = self._disk_state()
+
+    def _write_segment(self, analyses: dict, risks: dict):
+        import numpy as np
+        vocab_path = os.path.join(self.path, "vocab.json")
+        with open(vocab_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self._vocab, f, ensure_ascii=False)
+        os.replace(vocab_path + ".tmp", vocab_path)   # codes before the segment that uses them
+        existing = sorted(glob.glob(os.path.join(self.path, "segment-*.npz")))
+        number = int(os.path.basename(existing[-1])[8:-4]) + 1 if existing else 1
+        final = os.path.join(self.path, f"segment-{number:06d}.npz")
+        with open(final + ".tmp", "wb") as f:
+            np.savez(f, **{"a_" + k: v for k, v in analyses.items()}, **{"r_" + k: v for k, v in risks.items()})
+        os.replace(final + ".tmp", final)
+
+    def _compact(self):
+        # log.jsonl -> one more segment (the rows are already counted in memory, only the file layout changes)
+        rows = self._logged_rows()
+        if rows:
+            analyses, risks = self._build(rows)
+            self._write_segment(analyses, risks)
+        self._truncate_log()
+
+    def _logged_rows(self) -> list:
+        log_path = os.path.join(self.path, "log.jsonl")
+        if not os.path.exists(log_path):
+            return []
+        rows = []
+        with open(log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return rows
+
+    def _truncate_log(self):
+        open(os.path.join(self.path, "log.jsonl"), "w").close()
+        self._logged = 0
+
+    # ---------- columns ----------
+    def _build(self, rows: list) -> tuple:
+        import numpy as np
+        levels = [[LEVEL_CODES[level] for level, _ in row["risks"]] for row in rows]
+        analyses = {
+            "ts": np.array([row["ts"] for row in rows], dtype="float64"),
+            "doc_type": np.array([self._code("doc_type", row["doc_type"]) for row in rows], dtype="int16"),
+            "portfolio": np.array([self._code("portfolio", row["portfolio"]) for row in rows], dtype="int16"),
+            "high": np.array([lv.count(0) for lv in levels], dtype="int16"),
+            "medium": np.array([lv.count(1) for lv in levels], dtype="int16"),
+            "safe": np.array([row["safe"] for row in rows], dtype="int16"),
+            "contract": np.array([row["contract"] for row in rows], dtype="uint64"),
+        }
+        risks = {
+            "row": np.repeat(np.arange(len(rows), dtype="int64"), [len(lv) for lv in levels]),
+            "level": np.array([code for lv in levels for code in lv], dtype="int8"),
+            "category": np.array([CATEGORY_CODES[category] for row in rows for _, category in row["risks"]], dtype="int8"),
+        }
+        return analyses, risks
+
+    def _columns(self) -> tuple:
+        # Folds recently recorded rows into the column arrays (one concatenate per batch of writes, not per row)
+        if self._tail:
+            analyses, risks = self._build(self._tail)
+            risks["row"] = risks["row"] + len(self._analyses["ts"])
+            self._analyses = _concat([self._analyses, analyses], ANALYSIS_COLUMNS)
+            self._risks = _concat([self._risks, risks], RISK_COLUMNS)
+            self._tail = []
+            self._sort()
+        return self._analyses, self._risks
+
+    def _sort(self):
+        # Keeps analyses in time order (recorded rows nearly always arrive in order, so this is rarely a real sort)
+        import numpy as np
+        ts = self._analyses["ts"]
+        if len(ts) < 2 or not (ts[1:] < ts[:-1]).any():
+            return
+        order = np.argsort(ts, kind="stable")
+        self._analyses = {name: column[order] for name, column in self._analyses.items()}
+        new_row = np.empty_like(order)
+        new_row[order] = np.arange(len(order))
+        self._risks = {**self._risks, "row": new_row[self._risks["row"]]}
+
+    # ---------- queries ----------
+    def portfolio(self, doc_types=None, portfolios=None, since: float = None, until: float = None, level: str = "HIGH") -> dict:
+        # One pass of vectorized filters + bincounts: summary, verdict mix, which categories drive `level` risks, per doc type
+        import numpy as np
+        started = time.perf_counter()
+        with self._lock:
+            with _file_lock(self.path):
+                self._load()
+            analyses, risks = self._columns()
+            doc_names, portfolio_names = list(self._vocab["doc_type"]), list(self._vocab["portfolio"])
+        ts = analyses["ts"]
+        lo = int(np.searchsorted(ts, since, "left")) if since is not None else 0
+        hi = int(np.searchsorted(ts, until, "right")) if until is not None else len(ts)
+        mask = np.zeros(len(ts), bool)
+        mask[lo:hi] = True
+        for field, wanted, names in (("doc_type", doc_types, doc_names), ("portfolio", portfolios, portfolio_names)):
+            if wanted:
+                codes = [names.index(name) for name in wanted if name in names]
+                mask &= np.isin(analyses[field], codes)
+
+        high, medium = analyses["high"].astype("int32"), analyses["medium"].astype("int32")
+        scores = score_columns(high, medium)
+        selected = scores[mask]
+        verdicts = np.digitize(selected, [REVIEW_SCORE, HIGH_RISK_SCORE])
+        verdict_counts = np.bincount(verdicts, minlength=3)
+
+        level_code = LEVEL_CODES.get(level.upper(), 0)
+        risk_rows = risks["row"]
+        in_scope = mask[risk_rows] & (risks["level"] == level_code)
+        categories = risks["category"][in_scope].astype("int64")
+        per_category = np.bincount(categories, minlength=len(CATEGORIES))
+        # Contracts with at least one such risk per category: a contracts x categories flag matrix (no sort needed)
+        flags = np.zeros((len(ts), len(CATEGORIES)), bool)
+        flags[risk_rows[in_scope], categories] = True
+        contracts_per_category = flags.sum(axis=0)
+        # Same risks, only inside contracts that ended up "High Risk Exposure"
+        high_risk_rows = scores[risk_rows[in_scope]] >= HIGH_RISK_SCORE
+        in_high_risk = np.bincount(categories[high_risk_rows], minlength=len(CATEGORIES))
+
+        total_analyses, total_risks = int(mask.sum()), int(per_category.sum())
+        drivers = [{"category": name, "risks": int(per_category[i]), "share": round(float(per_category[i] / total_risks), 4) if total_risks else 0.0,
+                    "contracts": int(contracts_per_category[i]),
+                    "contract_share": round(float(contracts_per_category[i] / total_analyses), 4) if total_analyses else 0.0,
+                    "in_high_risk_contracts": int(in_high_risk[i]), "points": int(per_category[i]) * RISK_POINTS[("HIGH", "MEDIUM")[level_code]]}
+                   for i, name in enumerate(CATEGORIES)]
+        drivers.sort(key=lambda d: d["risks"], reverse=True)
+
+        doc_codes = analyses["doc_type"][mask].astype("int64")
+        per_doc = np.bincount(doc_codes, minlength=len(doc_names))
+        score_per_doc = np.bincount(doc_codes, weights=selected, minlength=len(doc_names))
+        high_risk_per_doc = np.bincount(doc_codes[verdicts == 2], minlength=len(doc_names))
+        by_doc_type = [{"doc_type": name, "analyses": int(per_doc[i]), "mean_score": round(float(score_per_doc[i] / per_doc[i]), 1),
+                        "high_risk_share": round(float(high_risk_per_doc[i] / per_doc[i]), 4)}
+                       for i, name in enumerate(doc_names) if per_doc[i]]
+        by_doc_type.sort(key=lambda d: d["analyses"], reverse=True)
+
+        return {
+            "analyses": total_analyses,
+            "level": ("HIGH", "MEDIUM")[level_code],
+            "mean_score": round(float(selected.mean()), 1) if total_analyses else 0.0,
+            "p50_score": float(np.percentile(selected, 50)) if total_analyses else 0.0,
+            "p90_score": float(np.percentile(selected, 90)) if total_analyses else 0.0,
+            "verdicts": {name: int(count) for name, count in zip(VERDICTS, verdict_counts)},
+            "drivers": drivers,
+            "by_doc_type": by_doc_type,
+            "query_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def options(self) -> dict:
+        # Filter values seen so far (UI dropdowns, API docs)
+        with self._lock:
+            with _file_lock(self.path):
+                self._load()
+            self._columns()
+            return {"doc_types": sorted(self._vocab["doc_type"]), "portfolios": sorted(self._vocab["portfolio"])}
+
+    def stats(self) -> dict:
+        with self._lock:
+            with _file_lock(self.path):
+                self._load()
+            return {"analyses": len(self._analyses["ts"]) + len(self._tail), "risks": len(self._risks["row"]) + sum(len(r["risks"]) for r in self._tail),
+                    "unsegmented": self._logged}
+
+def contract_key(text: str, rules_text: str) -> str:
+    return make_cache_key("analytics", text, rules_text)
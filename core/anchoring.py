@@ -0,0 +1,165 @@
+import bisect
+import html
+import re
+import threading
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import NamedTuple
+
+# ==========================================
+# 1. ANCHORS (WHERE A QUOTED CLAUSE SITS IN THE SOURCE TEXT)
+# ==========================================
+EXACT, FUZZY, NOT_FOUND = "exact", "fuzzy", "not_found"
+NGRAM = 3            # word trigrams: rare enough to pin a quote down, short enough to survive small edits
+MIN_SCORE = 0.6      # share of quoted words found in order; below this the quote is reported as not found
+MAX_POSTINGS = 200   # trigrams more common than this ("of the company") carry no position information
+MAX_CANDIDATES = 32  # alignments checked per quote fragment
+GAP_WORDS = 400      # an elided quote ("A ... B") may skip at most this many words between its fragments
+ELLIPSIS = re.compile(r"\[?(?:\.\s*){3,}\]?|…")
+_WORD = re.compile(r"\w+")
+
+class Anchor(NamedTuple):
+    start: int      # character offsets into the indexed text, -1 when not found
+    end: int
+    page: int       # 1-based page of `start`, None for plain text
+    score: float    # 0-1, quoted words matched in order
+    status: str     # exact / fuzzy / not_found
+
+def page_starts(pages) -> list:
+    # [(char offset, page number)] for text built with pdf.join_pages (same skipping of empty pages)
+    starts, offset = [], 0
+    for page in pages:
+        if page.text:
+            starts.append((offset, page.number))
+            offset += len(page.text) + 1
+    return starts
+
+# ==========================================
+# 2. INDEX (BUILT ONCE PER CONTRACT, O(WORDS))
+# ==========================================
+class ClauseAnchorIndex:
+    def __init__(self, text: str, starts: list = None):
+        self.text = text
+        matches = list(_WORD.finditer(text))
+        self._words = [m.group().casefold() for m in matches]
+        self._starts = [m.start() for m in matches]
+        self._ends = [m.end() for m in matches]
+        self._page_offsets = [offset for offset, _ in starts or []]
+        self._page_numbers = [number for _, number in starts or []]
+        self._grams = defaultdict(list)
+        self._unigrams = defaultdict(list)
+        for i, word in enumerate(self._words):
+            self._unigrams[word].append(i)
+            if i + NGRAM <= len(self._words):
+                self._grams[tuple(self._words[i:i + NGRAM])].append(i)
+
+    def page_of(self, offset: int):
+        if not self._page_numbers:
+            return None
+        return self._page_numbers[max(bisect.bisect_right(self._page_offsets, offset) - 1, 0)]
+
+    # ==========================================
+    # 3. LOOKUP (VOTE FOR AN ALIGNMENT, THEN VERIFY LOCALLY)
+    # ==========================================
+    def locate(self, quote: str) -> Anchor:
+        fragments = [words for words in ([w.casefold() for w in _WORD.findall(part)] for part in ELLIPSIS.split(quote)) if words]
+        total = sum(len(words) for words in fragments)
+        if not total or not self._words:
+            return Anchor(-1, -1, None, 0.0, NOT_FOUND)
+        found, matched, after, verbatim = [], 0, None, True
+        for words in fragments:
+            hit = self._locate_words(words, after)
+            if hit is None:
+                verbatim = False
+                continue
+            first, last, count = hit
+            found.append((first, last))
+            matched += count
+            verbatim = verbatim and count == len(words) == last - first + 1
+            after = last
+        score = round(matched / total, 3)
+        if not found or score < MIN_SCORE:
+            return Anchor(-1, -1, None, score, NOT_FOUND)
+        start, end = self._starts[found[0][0]], self._ends[found[-1][1]]
+        return Anchor(start, end, self.page_of(start), score, EXACT if verbatim else FUZZY)
+
+    def _locate_words(self, words: list, after: int = None):
+        # -> (first word index, last word index, quoted words matched) or None.
+        # Each shared n-gram votes for "quote starts at text position p - j"; the best diagonal is checked with difflib
+        # on a window the size of the quote, so the cost is O(quote words * postings), never O(contract).
+        n = min(NGRAM, len(words))
+        index = self._grams if n == NGRAM else self._unigrams
+        votes, common = Counter(), []
+        for j in range(len(words) - n + 1):
+            key = tuple(words[j:j + n]) if n == NGRAM else words[j]
+            postings = index.get(key, ())
+            if len(postings) > MAX_POSTINGS:
+                common.append((j, postings))
+                continue
+            for p in postings:
+                votes[p - j] += 1
+        if not votes:
+            # Boilerplate repeated all over the document: only common n-grams are left, let them vote after all
+            for j, postings in common:
+                votes.update(p - j for p in postings)
+        if not votes and n == NGRAM:
+            # Heavily paraphrased: no trigram survived, rare single words still point at the right place
+            for j, word in enumerate(words):
+                postings = self._unigrams.get(word, ())
+                if len(postings) <= MAX_POSTINGS:
+                    for p in postings:
+                        votes[p - j] += 1
+        if after is not None:
+            # Next fragment of an elided quote: prefer a match shortly after the previous one
+            nearby = Counter({d: v for d, v in votes.items() if after < d + len(words) and d <= after + GAP_WORDS})
+            votes = nearby or votes
+        if not votes:
+            return None
+        # Inserted / dropped words shift the diagonal a little: score the best candidates with their neighbours' votes
+        slack = len(words) // 4 + 2
+        shift = len(words) // 8 + 1
+        candidates = [d for d, _ in votes.most_common(MAX_CANDIDATES)]
+        diagonal = max(candidates, key=lambda d: (sum(votes.get(d + k, 0) for k in range(-shift, shift + 1)), votes[d], -d))
+        lo, hi = max(diagonal - slack, 0), min(diagonal + len(words) + slack, len(self._words))
+        blocks = [b for b in SequenceMatcher(None, words, self._words[lo:hi], autojunk=False).get_matching_blocks() if b.size]
+        if not blocks:
+            return None
+        return lo + blocks[0].b, lo + blocks[-1].b + blocks[-1].size - 1, sum(b.size for b in blocks)
+
+    def anchor(self, quotes: list) -> list:
+        return [self.locate(quote) for quote in quotes]
+
+# ==========================================
+# 4. DISPLAY + STATS
+# ==========================================
+def snippet(text: str, anchor: Anchor, context: int = 160) -> tuple:
+    # (before, match, after) around an anchor, cut at whitespace; ("", "", "") when not found
+    if anchor.start < 0:
+        return "", "", ""
+    lo, hi = max(anchor.start - context, 0), min(anchor.end + context, len(text))
+    before, after = text[lo:anchor.start], text[anchor.end:hi]
+    if lo > 0:
+        before = "…" + before[before.find(" ") + 1:] if " " in before else before
+    if hi < len(text):
+        after = (after[:after.rfind(" ")] if " " in after else after) + "…"
+    return before, text[anchor.start:anchor.end], after
+
+def highlight_html(before: str, match: str, after: str) -> str:
+    return f"{html.escape(before)}<mark>{html.escape(match)}</mark>{html.escape(after)}".replace("\n", "<br>")
+
+class AnchorStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"quotes": 0, EXACT: 0, FUZZY: 0, NOT_FOUND: 0}
+
+    def record(self, anchors: list):
+        with self._lock:
+            self._counts["quotes"] += len(anchors)
+            for anchor in anchors:
+                self._counts[anchor.status] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        counts["not_found_rate"] = round(counts[NOT_FOUND] / counts["quotes"], 4) if counts["quotes"] else 0.0
+        return counts
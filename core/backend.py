@@ -1,135 +1,159 @@
+import os
+import queue
+import threading
 import streamlit as st
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_groq import ChatGroq
-from langchain_core.prompts import PromptTemplate
-from pydantic import BaseModel, Field
-from typing import List
-import PyPDF2
-import requests
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from core.anchoring import page_starts, snippet
+from core.analytics import HIGH_RISK_SCORE, REVIEW_SCORE
+from core.classifier import classify_document
+from core.engine import EngineConfig, TrueClauseEngine, calculate_score, get_verdict, generate_report_text
+from core.models import ContractAnalysis, RiskItem, SafeItem
+from core.pdf import join_pages
+from core.translation import CANONICAL_LANGUAGE
 
 # ==========================================
-# 1. DATA MODELS (PYDANTIC)
+# 1. STREAMLIT ADAPTER FOR THE ENGINE
 # ==========================================
-class RiskItem(BaseModel):
-    clause_text: str = Field(description="Exact text of the suspicious clause found in the document")
-    risk_level: str = Field(description="Strictly output: HIGH or MEDIUM")
-    category: str = Field(description="Financial, Career, Privacy, Legal, or Freedom")
-    baseline: str = Field(description="What is the standard, fair industry practice for this? (The Baseline)")
-    deviation: str = Field(description="Why does this specific clause deviate from the baseline? Why is it one-sided?")
-    suggestion: str = Field(description="Actionable advice on what to negotiate")
-
-class SafeItem(BaseModel):
-    clause_summary: str = Field(description="Short summary of the standard clause found (e.g., '30-Day Notice Period')")
-    reason: str = Field(description="Why this is considered standard and safe")
-
-class ContractAnalysis(BaseModel):
-    risks: List[RiskItem]
-    safe_clauses: List[SafeItem] = Field(description="List of clauses checked that are standard/fair and NOT red flags.")
+# core/engine.py has no Streamlit dependency (used by bulk_analyze.py and server.py too);
+# this module only injects st.secrets and shares one engine per process via cache_resource.
+@st.cache_resource
+def get_engine():
+    try:
+        secrets = {key: st.secrets[key] for key in st.secrets}
+    except Exception:
+        # No secrets.toml at all
+        secrets = {}
+    return TrueClauseEngine(EngineConfig.from_mapping({**secrets, **os.environ}))
+
+def providers_configured() -> bool:
+    return get_engine().providers_configured()
+
+def _session_id() -> str:
+    # Fair-queue key: every browser tab gets its turn, however many chunks another tab submits
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else "anonymous"
+
+def _run_with_events(call, on_event):
+    # Engine events fire on worker threads, where st.* calls are dropped; run the call off-thread
+    # and replay its events here on the script thread so callbacks can update the page
+    events, outcome = queue.Queue(), {}
+    def worker():
+        try:
+            outcome["result"] = call(lambda event, data: events.put((event, data)))
+        except Exception as e:
+            outcome["error"] = e
+        finally:
+            events.put(None)
+    threading.Thread(target=worker, daemon=True).start()
+    while (item := events.get()) is not None:
+        on_event(*item)
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
 
 # ==========================================
-# 2. MULTI-LLM FAILOVER ENGINE
+# 2. UI-FACING FUNCTIONS
 # ==========================================
-@st.cache_resource
-def get_gemini_llm():
-    my_api_key = st.secrets["GEMINI_API_KEY"]
-    return ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0, google_api_key=my_api_key)
+def _ui_events(on_progress=None, on_queue=None, on_risks=None, on_text=None):
+    streamed = {}  # section -> risks received so far
+    text = []      # streamed email draft so far
+    def on_event(event, data):
+        if event == "progress" and on_progress:
+            on_progress(data["done"], data["total"])
+        elif event == "queued" and on_queue:
+            on_queue(data["position"], data["eta_seconds"])
+        elif event == "dequeued" and on_queue:
+            on_queue(0, 0.0)
+        elif event in ("risk", "risk_reset") and on_risks:
+            section = streamed.setdefault(data["section"], [])
+            if event == "risk_reset":
+                section.clear()
+            else:
+                section.append(RiskItem(**data["risk"]))
+            on_risks([risk for key in sorted(streamed) for risk in streamed[key]])
+        elif event in ("text_delta", "text_reset") and on_text:
+            if event == "text_reset":
+                text.clear()
+            else:
+                text.append(data["text"])
+            on_text("".join(text))
+    return on_event
 
-@st.cache_resource
-def get_groq_llm():
-    my_groq_key = st.secrets["GROQ_API_KEY"]
-    return ChatGroq(model="llama3-70b-8192", temperature=0, groq_api_key=my_groq_key)
-
-def analyze_contract(text: str, rules_text: str, language: str) -> ContractAnalysis:
-    prompt = PromptTemplate(
-        template="""You are RedFlag.ai, an enterprise-grade contract risk analyzer. 
-        RULEBOOK: {rules_text}
-        
-        TASK:
-        1. Identify RED FLAGS (deviations from baselines). Extract exact quoted text. Explain the standard baseline and how this clause deviates.
-        2. Identify GREEN FLAGS (standard, fair clauses). List them to prove you are analyzing the document without 'alert fatigue'. Do not flag standard clauses as risks.
-        
-        LANGUAGE: Write the 'baseline', 'deviation', 'suggestion', 'clause_summary', and 'reason' strictly in {language}. (clause_text must remain in original language).
-        Contract: {contract_text}""",
-        input_variables=["rules_text", "contract_text", "language"]
+def analyze_contract(text: str, rules_text: str, language: str, on_progress=None, on_queue=None, on_risks=None, **options) -> ContractAnalysis:
+    # on_queue(position, eta_seconds) while waiting for provider quota; position 0 means our turn came.
+    # on_risks(risks_so_far) turns on streaming: called every time another risk has been fully generated.
+    session_id = _session_id()
+    return _run_with_events(
+        lambda on_event: get_engine().analyze_contract(text, rules_text, language, session_id=session_id,
+                                                       stream=on_risks is not None, on_event=on_event, **options),
+        _ui_events(on_progress, on_queue, on_risks),
+    )
+
+def compare_versions(previous_text: str, previous_analysis: ContractAnalysis, text: str, rules_text: str, language: str,
+                     on_progress=None, on_queue=None, **options) -> tuple:
+    # Revised draft: (analysis, VersionDiff) with only the edited clauses re-analyzed
+    session_id = _session_id()
+    return _run_with_events(
+        lambda on_event: get_engine().compare_versions(previous_text, previous_analysis, text, rules_text, language,
+                                                       session_id=session_id, on_event=on_event, **options),
+        _ui_events(on_progress, on_queue),
+    )
+
+def translate_analysis(analysis: ContractAnalysis, language: str, on_queue=None) -> ContractAnalysis:
+    # Explanation language switch: only the explanation fields are translated (cached per finding), no re-analysis
+    session_id = _session_id()
+    return _run_with_events(lambda on_event: get_engine().translate_analysis(analysis, language, session_id=session_id, on_event=on_event),
+                            _ui_events(on_queue=on_queue))
+
+def translate_diff(diff, language: str, on_queue=None):
+    session_id = _session_id()
+    return _run_with_events(lambda on_event: get_engine().translate_diff(diff, language, session_id=session_id, on_event=on_event),
+                            _ui_events(on_queue=on_queue))
+
+def anchor_clauses(risks, text: str, starts: list = None) -> list:
+    # One {"anchor", "context": [before, match, after]} per risk: enough to highlight the quote without keeping the whole
+    # contract around. Plain JSON, so it fits the session store
+    return [{"anchor": anchor._asdict(), "context": list(snippet(text, anchor))} for anchor in get_engine().anchor_clauses(risks, text, starts)]
+
+def generate_email(risks, doc_type, language: str = "English", tone: str = "Polite", same_context: bool = False,
+                   on_queue=None, on_text=None):
+    # on_text(draft_so_far) turns on streaming
+    session_id = _session_id()
+    return _run_with_events(
+        lambda on_event: get_engine().generate_email(risks, doc_type, language, tone, same_context, session_id=session_id,
+                                                     stream=on_text is not None, on_event=on_event),
+        _ui_events(on_queue=on_queue, on_text=on_text),
     )
-    
-    try:
-        # First Attempt: Gemini
-        llm = get_gemini_llm()
-        structured_llm = llm.with_structured_output(ContractAnalysis)
-        return (prompt | structured_llm).invoke({"rules_text": rules_text, "contract_text": text, "language": language})
-    except Exception:
-        # Second Attempt: Groq Llama-3
-        st.toast("⚠️ Gemini network busy. Switching to high-speed Llama-3 backup engine...", icon="⚡")
-        try:
-            fallback_llm = get_groq_llm()
-            structured_fallback = fallback_llm.with_structured_output(ContractAnalysis)
-            return (prompt | structured_fallback).invoke({"rules_text": rules_text, "contract_text": text, "language": language})
-        except Exception:
-            # 🚨 GRACEFUL FAIL: Agar dono crash ho jayein toh clean error raise karo
-            raise RuntimeError("Both primary and backup engines are currently unavailable due to high traffic.")
-
-def generate_email(risks, doc_type):
-    risk_descriptions = "\n".join([f"- Clause: '{r.clause_text}'\n  Request: {r.suggestion}" for r in risks])
-    prompt = f"""You are an elite negotiator. Write a highly professional, polite email regarding a {doc_type} to negotiate these red flags:\n{risk_descriptions}\nKeep it concise and corporate. Start with "Dear [Name],". No subject line."""
-    
-    try:
-        llm = get_gemini_llm()
-        return llm.invoke(prompt).content
-    except Exception:
-        try:
-            fallback_llm = get_groq_llm()
-            return fallback_llm.invoke(prompt).content
-        except Exception:
-            # 🚨 GRACEFUL FAIL FOR EMAIL
-            raise RuntimeError("Email generation service is busy.")
 
 # ==========================================
-# 3. HELPER FUNCTIONS 
+# 3. SESSION RESULTS (BOUNDED ENGINE STORE, NOT st.session_state)
 # ==========================================
+# Reports, drafts and contract texts live compressed in engine.sessions (per-session + global caps, TTL, optional
+# disk spill); st.session_state only keeps small flags. A value may be evicted: callers treat None as "not there".
+def load_result(key: str, default=None):
+    return get_engine().sessions.get(_session_id(), key, default)
+
+def save_result(key: str, value):
+    get_engine().sessions.set(_session_id(), key, value)
+
+def drop_results(*keys):
+    get_engine().sessions.delete(_session_id(), *keys)
+
+def extract_pdf_pages(uploaded_file, on_page=None):
+    return get_engine().extract_pdf_pages(uploaded_file, on_page)
+
 def extract_text_from_pdf(uploaded_file):
-    try:
-        reader = PyPDF2.PdfReader(uploaded_file)
-        text = ""
-        for page in reader.pages:
-            extracted = page.extract_text()
-            if extracted: text += extracted + "\n"
-        return text
-    except Exception:
-        # 🚨 GRACEFUL FAIL FOR PDF
-        raise ValueError("Could not read this PDF format.")
-
-def calculate_score(risks):
-    return min(sum(30 if r.risk_level.upper() == "HIGH" else 15 for r in risks), 100)
-
-def generate_report_text(analysis, score, verdict):
-    report = f"🚩 REDFLAG.AI AUDIT REPORT 🚩\n\nToxicity Score: {score}%\nVerdict: {verdict}\n" + "-"*40 + "\n\n"
-    if analysis.risks:
-        report += "⚠️ IDENTIFIED RISKS & DEVIATIONS:\n\n"
-        for r in analysis.risks:
-            report += f"[{r.risk_level.upper()} RISK] | Category: {r.category}\nFound Clause: \"{r.clause_text}\"\nBaseline: {r.baseline}\nDeviation: {r.deviation}\nSuggestion: {r.suggestion}\n" + "-"*40 + "\n\n"
-    if analysis.safe_clauses:
-        report += "✅ CLAUSES CHECKED & PASSED (STANDARD):\n\n"
-        for s in analysis.safe_clauses:
-            report += f"- {s.clause_summary}: {s.reason}\n"
-        report += "-"*40 + "\n\n"
-    return report + "Generated by RedFlag.ai (Not Legal Advice)"
-
-def send_feedback(feedback_text):
-    try:
-        webhook_url = st.secrets["DISCORD_WEBHOOK_URL"]
-        
-        payload = {
-            "username": "TrueClause User", 
-            "content": f"🛡️ **New Feedback from TrueClause:**\n\n> {feedback_text}"
-        }
-        
-        response = requests.post(webhook_url, json=payload, timeout=5)
-        
-        if response.status_code not in [200, 204]:
-            raise Exception("Discord rejected the payload.")
-            
-        return response
-    except Exception:
-        # 🚨 GRACEFUL FAIL: Asli error hide karke generic message bhejenge
-        raise RuntimeError("Webhook connection failed.")
+    return get_engine().extract_text_from_pdf(uploaded_file)
+
+def portfolio(**filters) -> dict:
+    # Every analysis this instance completed (all sessions), scored + aggregated in one vectorized pass
+    return get_engine().portfolio(**filters)
+
+def portfolio_options() -> dict:
+    return get_engine().analytics.options()
+
+def send_feedback(feedback_text) -> bool:
+    # True when a delivery worker will forward it; False when it is only kept on this server (no webhook configured)
+    engine = get_engine()
+    engine.send_feedback(feedback_text)
+    return engine.feedback_delivery_configured()
@@ -0,0 +1,113 @@
+import re
+from difflib import SequenceMatcher
+
+# ==========================================
+# 1. TOKEN BUDGET
+# ==========================================
+# ~4 characters per token holds well enough for English/Hinglish contract prose
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    return (len(text or "") + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+# ==========================================
+# 2. CLAUSE / SECTION SPLITTING
+# ==========================================
+# A new clause starts at numbered items (1. / 1.2 / (a) / iv.), SECTION / ARTICLE headings or ALL-CAPS titles
+NUMBERED_START = re.compile(r"^\s*(?:(?:section|article|clause|schedule|annexure)\s+\w|\d+(?:\.\d+)*[.)]\s|\([a-z0-9]{1,3}\)\s|[ivx]{1,4}\.\s)", re.IGNORECASE)
+HEADING_LINE = re.compile(r"^\s*[A-Z][A-Z0-9 &/,'()-]{3,}\s*$")
+SENTENCE_END = re.compile(r"(?<=[.;:!?])\s+")
+
+def clause_spans(text: str) -> list:
+    # (start, end) character offsets of every clause, so callers can map matches back into the source
+    spans, start, end, pos = [], None, 0, 0
+    for line in (text or "").splitlines(keepends=True):
+        line_start, pos = pos, pos + len(line)
+        if not line.strip():
+            if start is not None:
+                spans.append((start, end))
+                start = None
+            continue
+        if start is not None and (NUMBERED_START.match(line) or HEADING_LINE.match(line)):
+            spans.append((start, end))
+            start = None
+        if start is None:
+            start = line_start + len(line) - len(line.lstrip())
+        end = line_start + len(line.rstrip())
+    if start is not None:
+        spans.append((start, end))
+    return spans
+
+def split_into_clauses(text: str) -> list:
+    return [text[start:end] for start, end in clause_spans(text)]
+
+def _split_oversized(clause: str, max_tokens: int) -> list:
+    pieces, current = [], ""
+    for sentence in SENTENCE_END.split(clause):
+        if current and estimate_tokens(current) + estimate_tokens(sentence) > max_tokens:
+            pieces.append(current)
+            current = ""
+        # A single run-on "sentence" bigger than the budget gets a hard cut
+        while estimate_tokens(sentence) > max_tokens:
+            cut = max_tokens * CHARS_PER_TOKEN
+            pieces.append(sentence[:cut])
+            sentence = sentence[cut:]
+        current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+def chunk_contract(text: str, max_tokens: int) -> list:
+    chunks, current, current_tokens = [], [], 0
+    for clause in split_into_clauses(text):
+        for piece in (_split_oversized(clause, max_tokens) if estimate_tokens(clause) > max_tokens else [clause]):
+            piece_tokens = estimate_tokens(piece)
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+# ==========================================
+# 3. MERGE & DE-DUPLICATE (REDUCE STEP)
+# ==========================================
+# Two quotes are one clause when they share one run of at least this many characters covering most of the longer quote
+# (the same clause quoted with a little more or less context), never because a short quote occurs inside a longer one
+MIN_OVERLAP_CHARS = 40
+MIN_OVERLAP_RATIO = 0.8
+
+def _fingerprint(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", (text or "").lower()).strip()
+
+def _same_quote(a: str, b: str) -> bool:
+    if a == b:
+        return True
+    if not a or not b:
+        return False
+    overlap = SequenceMatcher(None, a, b, autojunk=False).find_longest_match(0, len(a), 0, len(b)).size
+    return overlap >= MIN_OVERLAP_CHARS and overlap >= MIN_OVERLAP_RATIO * max(len(a), len(b))
+
+def _dedupe(items, key_of, prefer, same=lambda a, b: a == b):
+    kept = []
+    for item in items:
+        key = _fingerprint(key_of(item))
+        for i, (other_key, other) in enumerate(kept):
+            if same(key, other_key):
+                kept[i] = (max(key, other_key, key=len), prefer(item, other))
+                break
+        else:
+            kept.append((key, item))
+    return [item for _, item in kept]
+
+def _prefer_risk(a, b):
+    rank = {"HIGH": 2, "MEDIUM": 1}
+    return a if rank.get(a.risk_level.upper(), 0) > rank.get(b.risk_level.upper(), 0) else b
+
+def merge_findings(analyses) -> tuple:
+    risks = _dedupe([r for a in analyses for r in a.risks], lambda r: r.clause_text, _prefer_risk, _same_quote)
+    # Summaries are short labels ("Notice" vs "30-Day Notice Period"): only identical ones are duplicates
+    safe_clauses = _dedupe([s for a in analyses for s in a.safe_clauses], lambda s: s.clause_summary, lambda a, b: b)
+    return risks, safe_clauses
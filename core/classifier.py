@@ -0,0 +1,94 @@
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import NamedTuple
+
+# ==========================================
+# 1. TRAINING TEXT (RULEBOOKS + DEMO CONTRACTS + VOCABULARY OF EACH DOCUMENT TYPE)
+# ==========================================
+# The rulebooks describe what each contract type talks about and the demo contracts show real wording for the types that
+# have one; the seed vocabulary adds the words actual contracts of every type are full of (parties, titles, money terms)
+# but the rulebooks rarely spell out.
+SEED_VOCABULARY = {
+    "employment": "employment agreement offer letter employee employer salary ctc designation joining date probation "
+                  "resignation notice period appraisal gratuity provident fund working hours leave policy hr manager "
+                  "training bond non-compete termination of employment payroll",
+    "rent": "rental agreement lease deed landlord tenant lessor lessee licensor licensee premises flat apartment monthly rent "
+            "security deposit lock-in period maintenance charges society electricity water bills eviction vacate keys "
+            "rent increase occupancy",
+    "freelance": "freelance agreement consultancy agreement independent contractor freelancer consultant client agency "
+                 "scope of work statement of work deliverables milestone invoice project fee revisions acceptance "
+                 "kill fee payment terms net days portfolio",
+    "nda": "non-disclosure agreement confidentiality agreement disclosing party receiving party confidential information "
+           "proprietary information trade secrets recipient permitted purpose return or destroy injunctive relief "
+           "unauthorized disclosure mutual nda",
+    "tos": "terms of service terms of use privacy policy user users account website app platform service cookies "
+           "personal data personal information subscription auto-renewal opt out data sharing third parties "
+           "content license we may suspend your account",
+    # Everything else: loans, sales, partnerships, settlements, MoUs, deeds
+    "generic": "loan lender borrower interest instalment repayment default sale deed seller buyer purchase consideration ownership "
+               "transfer partnership deed partners profit sharing capital contribution memorandum of understanding mou settlement "
+               "release of claims gift deed donor power of attorney sponsorship guarantor indemnity bond",
+}
+GENERIC = "generic"
+MAX_CHARS = 20000        # the type of a contract is obvious from its first pages; 500-page uploads stay in milliseconds
+MIN_SCORE = 0.02         # below this cosine nothing looks familiar -> generic rulebook, confidence 0
+MIN_CONFIDENCE = 0.3
+TEMPERATURE = 0.02       # softmax temperature over cosine scores (tuned on tools/doc_type_tune.jsonl, never on the eval set)
+_TOKEN = re.compile(r"[a-z]{3,}")
+_STOPWORDS = frozenset("""the and for that this with are any all not but from has have was were will shall may must can its
+their they them you your our his her which who whom such other than then into onto upon per each been being also only
+standard red flag flags clause clauses contract contracts agreement e.g""".split())
+
+def _terms(text: str) -> Counter:
+    words = [w for w in _TOKEN.findall(text[:MAX_CHARS].lower()) if w not in _STOPWORDS]
+    # Unigrams + bigrams: "receiving party" / "security deposit" carry most of the signal
+    return Counter(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+def _unit(vector: dict) -> dict:
+    norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+    return {term: v / norm for term, v in vector.items()}
+
+# ==========================================
+# 2. TF-IDF CENTROID CLASSIFIER
+# ==========================================
+class Prediction(NamedTuple):
+    doc_type: str        # RULEBOOKS key
+    confidence: float    # 0..1 (0.0 = no clear winner, fell back to generic)
+    scores: dict         # doc_type -> cosine similarity
+
+class DocTypeClassifier:
+    def __init__(self, rulebooks: dict, seeds: dict = SEED_VOCABULARY, examples: dict = None, temperature: float = TEMPERATURE):
+        # examples: doc_type -> contract texts of that type
+        self.temperature = temperature
+        documents = {name: _terms(" ".join([text[:MAX_CHARS], *(example[:MAX_CHARS] for example in (examples or {}).get(name, []))])
+                                  + (" " + seeds.get(name, "")) * 3) for name, text in rulebooks.items()}
+        df = Counter(term for counts in documents.values() for term in counts)
+        # Terms found in every rulebook ("party", "payment") separate nothing: idf 0
+        self.idf = {term: math.log(len(documents) / n) for term, n in df.items() if n < len(documents)}
+        self.centroids = {name: _unit({t: (1 + math.log(c)) * self.idf[t] for t, c in counts.items() if t in self.idf})
+                          for name, counts in documents.items()}
+
+    def predict(self, text: str) -> Prediction:
+        query = _unit({t: (1 + math.log(c)) * self.idf[t] for t, c in _terms(text).items() if t in self.idf})
+        scores = {name: sum(w * centroid.get(t, 0.0) for t, w in query.items()) for name, centroid in self.centroids.items()}
+        best = max(scores, key=scores.get)
+        exp = {name: math.exp((s - scores[best]) / self.temperature) for name, s in scores.items()}
+        confidence = exp[best] / sum(exp.values())
+        if scores[best] < MIN_SCORE or confidence < MIN_CONFIDENCE:
+            # Can't tell: the generic rulebook is the safe default, and the UI shouldn't pretend to be sure
+            return Prediction(GENERIC, 0.0, scores)
+        return Prediction(best, round(confidence, 3), scores)
+
+def build_classifier(temperature: float = TEMPERATURE) -> DocTypeClassifier:
+    from rules import RULEBOOKS
+    from rules.demos import DEMO_CONTRACTS
+    return DocTypeClassifier(RULEBOOKS, examples={name: [text] for name, text in DEMO_CONTRACTS.items()}, temperature=temperature)
+
+@lru_cache(maxsize=1)
+def get_classifier() -> DocTypeClassifier:
+    return build_classifier()
+
+def classify_document(text: str) -> Prediction:
+    return get_classifier().predict(text)
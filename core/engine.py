@@ -0,0 +1,842 @@
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pydantic import BaseModel
+from core.models import ContractAnalysis, RiskItem, VersionDiff
+from core.anchoring import AnchorStats, ClauseAnchorIndex
+from core.analytics import MAX_SCORE, RISK_POINTS, AnalyticsStore, contract_key, doc_type_for, verdict_for
+from core.cache import ResultCache, make_cache_key
+from core.ocr import ocr_available, ocr_errors, ocr_pages
+from core.pdf import iter_pdf_pages, join_pages, read_pdf_bytes
+from core.feedback import FeedbackDelivery, FeedbackSpool
+from core.chunking import chunk_contract, estimate_tokens, merge_findings
+from core.hedging import LatencyTracker, hedged_call
+from core.providers import ProviderRegistry, is_rate_limit_error
+from core.prescreen import get_prescreen_engine
+from core.prompts import ANALYSIS_DYNAMIC, ANALYSIS_STATIC, EMAIL_FOLLOW_UP, EMAIL_PROMPT, EMAIL_TONES, REPAIR_PROMPT, TRANSLATE_PROMPT, PromptCompiler, TokenLedger
+from core.ratelimit import LLMRateLimiter, QueueTimeout
+from core.repair import PendingRepair, RepairStats, RiskRepairBatch, loads_object, normalize_analysis, raw_payload, repair_analysis
+from core.revisions import compare_findings, plan_revision
+from core.session_store import SessionStore, SqliteSpill
+from core.similarity import NearDuplicateIndex
+from core.streaming import ArrayItemStreamParser, RiskStreamRelay, TextStreamRelay, chunk_text, parse_streamed_json
+from core.translation import CANONICAL_LANGUAGE, TranslationBatch, apply_fields, explanatory_fields, translated_fields, translation_entries
+from core.tracing import Tracer, gauge_lines, llm_end_recorder, serve_metrics
+
+# ==========================================
+# 1. CONFIG (INJECTED, NO STREAMLIT)
+# ==========================================
+GEMINI_MODEL = "gemini-2.5-flash"
+GROQ_MODEL = "llama3-70b-8192"
+# Reserved per call for the model's answer when charging the tokens-per-minute bucket
+OUTPUT_TOKEN_ALLOWANCE = 1024
+# Email follow-ups: last analysis conversation kept per session (oldest sessions dropped first)
+MAX_CONVERSATIONS = 256
+# Clause anchoring: indexes of the most recently anchored contracts (dashboard reruns anchor the same text again)
+ANCHOR_INDEXES = 8
+logger = logging.getLogger("trueclause")
+
+class EngineConfig(BaseModel):
+    gemini_api_key: str = ""
+    groq_api_key: str = ""
+    discord_webhook_url: str = ""
+    # Feedback is written here first and posted to the webhook by a background thread (batched, retried with backoff)
+    feedback_spool_path: str = ".trueclause_cache/feedback.sqlite3"
+    feedback_batch_size: int = 10
+    # Offline stand-in engine: deterministic answers + simulated prefix cache, no API keys needed
+    local_llm: bool = False
+    # Static rulebook prefix as its own system message, for providers with context caching
+    prefix_caching: bool = False
+    # Chunked (map-reduce) mode: contract budget per call keeps rulebook + chunk + output inside llama3's 8k window
+    chunk_tokens: int = 3000
+    chunk_workers: int = 4
+    # Backup engine is launched once the primary is slower than this percentile of its own recent latencies
+    hedge_percentile: float = 0.9
+    cache_path: str = ".trueclause_cache/analysis.sqlite3"
+    # Lightly edited copies of an analyzed contract only send their changed clauses (0 = off, "" path = in memory)
+    near_duplicate_threshold: float = 0.9
+    similarity_path: str = ".trueclause_cache/similarity.sqlite3"
+    similarity_max_contracts: int = 0    # 0 = no cap, only the retention window
+    similarity_retention_days: float = 180
+    # Explanation-language translations per finding ("" = in memory only)
+    translation_cache_path: str = ".trueclause_cache/translations.sqlite3"
+    # Scanned pages (no text layer) are OCR'd when pytesseract + tesseract are installed; results cached per page image
+    ocr: bool = True
+    ocr_language: str = "eng"   # tesseract language codes, e.g. "eng+hin"
+    ocr_cache_path: str = ".trueclause_cache/ocr.sqlite3"
+    # Every completed analysis (levels, categories, doc type, score; no contract text) for portfolio queries ("" = in memory)
+    analytics_path: str = ".trueclause_cache/analytics"
+    # Process-wide quotas per provider (0 = unlimited); callers over quota wait in a fair queue instead of getting a 429
+    gemini_rpm: int = 10
+    gemini_tpm: int = 250000
+    groq_rpm: int = 30
+    groq_tpm: int = 6000
+    local_rpm: int = 0
+    local_tpm: int = 0
+    # Give up on a provider's queue after this long (the next engine is tried instead)
+    queue_max_wait: float = 120.0
+    # Per-stage spans -> rotating JSONL file ("" = metrics only) + Prometheus text on metrics_port (0 = off)
+    tracing: bool = True
+    trace_path: str = ".trueclause_cache/traces.jsonl"
+    trace_max_mb: float = 20.0
+    trace_backups: int = 3
+    metrics_port: int = 0
+    # UI session results (reports, drafts, previous versions): compressed, LRU/TTL-bounded, optional disk spill ("" = off)
+    session_store_mb: float = 256.0
+    session_max_mb: float = 4.0
+    session_ttl_minutes: float = 60.0
+    session_spill_path: str = ""
+
+    @classmethod
+    def from_mapping(cls, values) -> "EngineConfig":
+        # Accepts st.secrets / os.environ style keys: GEMINI_API_KEY or TRUECLAUSE_CHUNK_TOKENS
+        picked = {}
+        for field in cls.model_fields:
+            for key in (field.upper(), f"TRUECLAUSE_{field.upper()}"):
+                if key in values:
+                    picked[field] = values[key]
+        return cls(**picked)
+
+    @classmethod
+    def load(cls, secrets_path: str = ".streamlit/secrets.toml") -> "EngineConfig":
+        # Headless entry points: same secrets file as the UI, environment variables win
+        return cls.from_mapping({**read_secrets_file(secrets_path), **os.environ})
+
+def read_secrets_file(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        import tomllib
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    except ImportError:
+        import toml
+        return toml.load(path)
+
+# ==========================================
+# 2. MULTI-LLM FAILOVER ENGINE
+# ==========================================
+class TrueClauseEngine:
+    # One instance per process: caches, provider health and compiled prompts are shared by every caller.
+    # Callers receive progress through on_event(event_name, data) instead of UI calls.
+    def __init__(self, config: EngineConfig = None, llms: dict = None):
+        # llms: pre-built chat models by provider name (benchmarks use fault-injecting stand-ins here)
+        self.config = config or EngineConfig()
+        # Stand-in models (the local provider, models injected by benchmarks) never write to the on-disk caches:
+        # their output must not be served back later as a real provider's analysis
+        self.standin_models = bool(llms) or self.config.local_llm
+        self.analysis_cache = ResultCache(db_path=None if self.standin_models else self.config.cache_path)
+        # Streamlit re-runs the whole script on every widget click; re-parsing the same upload each time is pure waste
+        self.pdf_cache = ResultCache(db_path=None, memory_items=64)
+        self.ocr_cache = ResultCache(db_path=self.config.ocr_cache_path, memory_items=512, disk_items=50000)
+        # One row per translated finding: many small entries, kept apart so they never push whole analyses out
+        self.translation_cache = ResultCache(db_path=None if self.standin_models else self.config.translation_cache_path,
+                                             memory_items=4096, disk_items=100000)
+        self.analytics = AnalyticsStore(self.config.analytics_path)
+        self.prompts = PromptCompiler()
+        self.similar = NearDuplicateIndex("" if self.standin_models else self.config.similarity_path, self.config.near_duplicate_threshold,
+                                          max_contracts=self.config.similarity_max_contracts,
+                                          retention_days=self.config.similarity_retention_days) if self.config.near_duplicate_threshold else None
+        self.tokens = TokenLedger()
+        self.repairs = RepairStats()
+        self.anchors = AnchorStats()
+        self._anchor_indexes = OrderedDict()
+        self._anchor_lock = threading.Lock()
+        # Streaming mode: seconds from the start of an analysis until its first risk card can be shown
+        self.first_risk_latency = LatencyTracker(window=500, default_seconds=0.0, min_samples=1)
+        self.streamed_analyses = 0
+        self._stream_lock = threading.Lock()
+        self.tracer = Tracer(self.config.trace_path, int(self.config.trace_max_mb * 1024 * 1024),
+                             self.config.trace_backups, enabled=self.config.tracing)
+        self._llms = dict(llms or {})
+        self._llm_lock = threading.Lock()
+        self._conversations = OrderedDict()  # session_id -> last single-call analysis (email follow-ups)
+        self.sessions = SessionStore(int(self.config.session_store_mb * 1024 * 1024), int(self.config.session_max_mb * 1024 * 1024),
+                                     int(self.config.session_ttl_minutes * 60),
+                                     SqliteSpill(self.config.session_spill_path) if self.config.session_spill_path else None)
+
+        # More engines = one more register() line, not another nested try/except
+        self.registry = ProviderRegistry()
+        self.limiter = LLMRateLimiter()
+        for name, enabled in (("local", self.config.local_llm), ("gemini", self.config.gemini_api_key), ("groq", self.config.groq_api_key)):
+            if enabled:
+                self.registry.register(name, lambda name=name: self._get_llm(name))
+                self.limiter.configure(name, getattr(self.config, f"{name}_rpm"), getattr(self.config, f"{name}_tpm"))
+        # Part of every cache key: results are only reused under the same providers + models
+        self.model_key = "|".join(f"{name}={self._model_id(name)}" for name in self.registry.names())
+        self.feedback = None
+        self.feedback_delivery = None
+        if self.config.discord_webhook_url:
+            # Start delivering right away: feedback a previous process could not deliver is still in the spool
+            self._feedback_spool()
+        if self.config.metrics_port:
+            self.metrics_server = serve_metrics("127.0.0.1", self.config.metrics_port, self.metrics_text)
+
+    def _get_llm(self, name: str):
+        with self._llm_lock:
+            if name not in self._llms:
+                self._llms[name] = self._build_llm(name)
+            return self._llms[name]
+
+    def _model_id(self, name: str) -> str:
+        # Without building the model: provider SDKs are only imported on the first real call
+        if name in self._llms:
+            llm = self._llms[name]
+            return f"{type(llm).__name__}:{getattr(llm, 'model', None) or getattr(llm, 'model_name', None) or ''}"
+        return {"gemini": GEMINI_MODEL, "groq": GROQ_MODEL}.get(name, "local-standin")
+
+    def _build_llm(self, name: str):
+        # Provider SDKs are imported on first use: they cost ~1.5s of cold start and the demo tab never needs them
+        if name == "gemini":
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            return ChatGoogleGenerativeAI(model=GEMINI_MODEL, temperature=0, google_api_key=self.config.gemini_api_key)
+        if name == "groq":
+            from langchain_groq import ChatGroq
+            return ChatGroq(model=GROQ_MODEL, temperature=0, groq_api_key=self.config.groq_api_key)
+        from core.local_llm import LocalChatModel
+        return LocalChatModel()
+
+    def providers_configured(self) -> bool:
+        return bool(self.registry.names())
+
+    def streaming_stats(self) -> dict:
+        return {
+            "streamed_analyses": self.streamed_analyses,
+            "time_to_first_risk_p50": round(self.first_risk_latency.percentile(0.5), 3),
+            "time_to_first_risk_p90": round(self.first_risk_latency.percentile(0.9), 3),
+        }
+
+    def metrics_text(self, extra_lines=()) -> str:
+        # Prometheus text exposition: span histograms/counters plus live gauges
+        circuit = {"closed": 0, "half_open": 1, "open": 2}
+        health, limits, cache = self.registry.health(), self.limiter.metrics(), self.analysis_cache.stats()
+        lines = self.tracer.metrics.prometheus()
+        lines += gauge_lines("trueclause_provider_circuit_state", "0 closed, 1 half-open, 2 open.",
+                             [((("provider", name),), circuit.get(h["state"], 0)) for name, h in health.items()])
+        lines += gauge_lines("trueclause_rate_limit_queue_depth", "Calls waiting for provider quota.",
+                             [((("provider", name),), m["queue_depth"]) for name, m in limits.items()])
+        lines += gauge_lines("trueclause_rate_limit_wait_p95_seconds", "95th percentile quota wait.",
+                             [((("provider", name),), m["p95_wait_seconds"]) for name, m in limits.items()])
+        lines += gauge_lines("trueclause_analysis_cache_hit_ratio", "Analysis result cache hit ratio.", [((), cache["hit_rate"])])
+        lines += gauge_lines("trueclause_translation_cache_hit_ratio", "Share of findings served from the translation cache.",
+                             [((), self.translation_cache.stats()["hit_rate"])])
+        if self.similar is not None:
+            lines += gauge_lines("trueclause_clause_reuse_ratio", "Share of clauses answered from near-duplicate contracts.",
+                                 [((), self.similar.stats()["clause_reuse_rate"])])
+        sessions = self.sessions.stats(top=0)
+        lines += gauge_lines("trueclause_session_store_bytes", "Compressed UI session results held per tier.",
+                             [((("tier", "memory"),), sessions["memory_bytes"]), ((("tier", "disk"),), sessions["disk_bytes"])])
+        lines += gauge_lines("trueclause_session_store_sessions", "UI sessions with stored results.", [((), sessions["sessions"])])
+        lines += gauge_lines("trueclause_session_store_largest_session_bytes", "Memory held by the heaviest session.", [((), sessions["max_session_bytes"])])
+        lines += gauge_lines("trueclause_session_store_evictions", "Values pushed out by the memory caps since start.", [((), sessions["evictions"])])
+        repairs = self.repairs.stats()
+        lines += gauge_lines("trueclause_structured_output_invalid_ratio", "Share of model answers that failed schema validation.", [((), repairs["invalid_rate"])])
+        lines += gauge_lines("trueclause_structured_output_repair_ratio", "Share of invalid answers repaired without failover.", [((), repairs["repair_rate"])])
+        lines += gauge_lines("trueclause_structured_output_repair_tokens_saved", "Prompt tokens not re-sent thanks to repairs since start.", [((), repairs["tokens_saved"])])
+        lines += gauge_lines("trueclause_clause_quote_not_found_ratio", "Share of quoted clauses not found in their contract (paraphrased or invented).",
+                             [((), self.anchors.stats()["not_found_rate"])])
+        if self.feedback is not None:
+            lines += gauge_lines("trueclause_feedback_pending", "Feedback messages waiting for webhook delivery.", [((), self.feedback.stats()["pending"])])
+            # 0 = feedback is only piling up in the spool: alert on this together with the pending count
+            lines += gauge_lines("trueclause_feedback_delivery_configured", "1 when a webhook delivery worker is running.", [((), int(self.feedback_delivery is not None))])
+        lines += gauge_lines("trueclause_time_to_first_risk_seconds", "Streaming time to first risk.",
+                             [((("quantile", q),), round(self.first_risk_latency.percentile(q), 3)) for q in (0.5, 0.9)])
+        return "\n".join(lines + list(extra_lines)) + "\n"
+
+    def _call_with_failover(self, invoke, is_valid=lambda result: result is not None, tokens: int = 0, session_id: str = None, emit=None,
+                            finish=None):
+        # finish(name, result): follow-up work on an attempt's result after registry.call returned (e.g. re-requesting
+        # broken items), so its quota wait and its own call are never counted as the attempt's provider latency
+        ranked = self.registry.ranked()
+        if not ranked:
+            raise RuntimeError("No AI engine is configured.")
+        launches, queued_ms = {}, {}
+
+        def on_launch(name, reason, last_error):
+            launches[name] = (reason, _failure_reason(last_error))
+
+        def admit(name, reason):
+            # Quota is taken on the caller's thread before the attempt reaches the hedge pool, so a queued session never
+            # holds a pool worker and the hedge timer starts once quota is granted. A hedge only goes out on free quota.
+            if reason == "hedge":
+                return self.limiter.try_acquire(name, session_id, tokens)
+            waited = []
+            def on_wait(position, eta_seconds):
+                waited.append(position)
+                if emit:
+                    emit("queued", {"provider": name, "position": position, "eta_seconds": eta_seconds})
+            queued_at = time.perf_counter()
+            self.limiter.acquire(name, session_id, tokens, on_wait, self.config.queue_max_wait)
+            if waited:
+                queued_ms[name] = round((time.perf_counter() - queued_at) * 1000, 1)
+                if emit:
+                    emit("dequeued", {"provider": name})
+            return True
+
+        def attempt(name):
+            reason, after = launches.get(name, ("primary", None))
+            with self.tracer.span("provider_attempt", provider=name, reason=reason) as span:
+                if after:
+                    span.set(previous_failure=after)
+                if name in queued_ms:
+                    span.set(queue_wait_ms=queued_ms[name])
+                result = self.registry.call(name, lambda llm: invoke(name, llm))
+                if finish:
+                    result = finish(name, result)
+                span.set(valid=is_valid(result))
+                return result
+
+        # Each attempt runs on the hedge pool with its own copy of the caller's trace context
+        attempts = [(name, lambda name=name, ctx=contextvars.copy_context(): ctx.run(attempt, name)) for name in ranked]
+        return hedged_call(
+            attempts,
+            hedge_after=self.registry.get(ranked[0]).latency.percentile(self.config.hedge_percentile),
+            is_valid=is_valid,
+            on_launch=on_launch,
+            admit=admit,
+        )
+
+    # ==========================================
+    # 3. CONTRACT ANALYSIS
+    # ==========================================
+    def analyze_contract(self, text: str, rules_text: str, language: str, chunk_tokens: int = None,
+                         max_workers: int = None, prescreen: bool = True, session_id: str = None, stream: bool = False,
+                         on_event=None, reuse_similar: bool = True, doc_type: str = None, portfolio: str = "default",
+                         record: bool = True) -> ContractAnalysis:
+        # stream=True: each risk is sent as a "risk" event the moment the model finishes writing it;
+        # the returned result is validated, merged and cached exactly like the non-streaming path.
+        # Detection runs (and is cached) in CANONICAL_LANGUAGE; `language` only costs a small translation call,
+        # or nothing once those findings were translated before. Streamed risk cards are canonical.
+        with self.tracer.span("analyze", language=language, stream=stream, contract_chars=len(text)) as span:
+            result = self._analyze_contract(span, text, rules_text, CANONICAL_LANGUAGE, chunk_tokens, max_workers, prescreen,
+                                            session_id, stream, on_event, reuse_similar)
+        if record:
+            self.record_analysis(text, rules_text, result, doc_type, portfolio)
+        return self.translate_analysis(result, language, session_id=session_id, on_event=on_event)
+
+    def _analyze_contract(self, span, text, rules_text, language, chunk_tokens, max_workers, prescreen, session_id, stream, on_event, reuse_similar=True):
+        emit = on_event or (lambda event, data: None)
+        chunk_tokens = self.config.chunk_tokens if chunk_tokens is None else chunk_tokens
+        max_workers = max_workers or self.config.chunk_workers
+
+        # Streaming (JSON-mode prompt) and non-streaming (structured output) answers come from different prompts: never mixed
+        mode = "stream" if stream else "structured"
+        cache_key = make_cache_key(text, rules_text, language, self.model_key, chunk_tokens, prescreen, mode)
+        cached = self.analysis_cache.get(cache_key)
+        span.set(cache_hit=cached is not None)
+        if cached is not None:
+            emit("cache_hit", {"key": cache_key})
+            return ContractAnalysis.model_validate_json(cached)
+
+        relay = None
+        if stream:
+            with self._stream_lock:
+                self.streamed_analyses += 1
+            relay = RiskStreamRelay(emit, on_first_risk=self.first_risk_latency.record)
+
+        # Templated contracts: reuse findings for clauses already analyzed in a near-identical contract
+        original_text, plan = text, None
+        namespace = make_cache_key(rules_text, language, self.model_key, prescreen, mode)
+        if reuse_similar and self.similar is not None and self.providers_configured():
+            with self.tracer.span("near_duplicate") as similar_span:
+                plan = self.similar.plan(namespace, text)
+                similar_span.set(similarity=round(plan.similarity, 3), reused_clauses=len(plan.clauses) - len(plan.changed), changed_clauses=len(plan.changed))
+            if len(plan.changed) < len(plan.clauses):
+                emit("near_duplicate", {"similarity": round(plan.similarity, 3), "reused_clauses": len(plan.clauses) - len(plan.changed),
+                                        "changed_clauses": len(plan.changed)})
+                if relay:
+                    relay.finish(-1, "reuse", plan.reused)
+                if not plan.changed:
+                    self.analysis_cache.set(cache_key, plan.reused.model_dump_json())
+                    return plan.reused
+                text = plan.changed_text
+
+        # Local pre-screen: only clauses that hit a rulebook trigger (plus the matching rule sections) go to the LLM
+        screener = get_prescreen_engine(rules_text) if prescreen else None
+        if screener is not None:
+            with self.tracer.span("prescreen") as screen_span:
+                screen = screener.scan(text)
+                screen_span.set(candidates=len(screen.candidates), clauses=screen.total_clauses)
+            emit("prescreen", {"candidates": len(screen.candidates), "clauses": screen.total_clauses})
+            if not self.providers_configured():
+                # No engine configured: the deterministic findings are the whole answer (not cached, they are instant)
+                return ContractAnalysis(risks=[RiskItem(**item) for item in screener.findings(screen)], safe_clauses=[])
+            if screen.candidates:
+                # In prefix-caching mode the full rulebook stays put (a stable, cached prefix beats a smaller one)
+                text, rules_text = screen.focused_text, (rules_text if self.config.prefix_caching else screen.focused_rules)
+
+        if chunk_tokens and estimate_tokens(text) > chunk_tokens:
+            result = self._run_chunked_analysis(text, rules_text, language, chunk_tokens, max_workers, session_id, emit, relay)
+        else:
+            result, provider = self._run_analysis(text, rules_text, language, session_id, emit, relay)
+            self._remember_conversation(session_id, text, rules_text, language, result)
+            span.set(provider=provider)
+            emit("provider", {"name": provider})
+        if plan is not None:
+            if plan.reused.risks or plan.reused.safe_clauses:
+                risks, safe_clauses = merge_findings([plan.reused, result])
+                result = ContractAnalysis(risks=risks, safe_clauses=safe_clauses)
+            self.similar.add(namespace, original_text, result, plan.clauses)
+        self.analysis_cache.set(cache_key, result.model_dump_json())
+        return result
+
+    def compare_versions(self, previous_text: str, previous_analysis: ContractAnalysis, text: str, rules_text: str, language: str,
+                         session_id: str = None, on_event=None, doc_type: str = None, portfolio: str = "default", **options) -> tuple:
+        # Negotiation round N+1: only inserted / rewritten clauses go to the LLM, the rest keep last round's findings.
+        # Returns (analysis of the new version, VersionDiff)
+        emit = on_event or (lambda event, data: None)
+        with self.tracer.span("compare_versions", language=language, contract_chars=len(text)) as span:
+            plan = plan_revision(previous_text, previous_analysis, text)
+            span.set(clauses=len(plan.clauses), changed_clauses=len(plan.changed), removed_clauses=plan.removed)
+            emit("revision", {"clauses": len(plan.clauses), "changed_clauses": len(plan.changed), "removed_clauses": plan.removed})
+            fresh = ContractAnalysis(risks=[], safe_clauses=[])
+            if plan.changed:
+                # Clause fragments are not whole contracts: keep them out of the near-duplicate index
+                fresh = self.analyze_contract(plan.changed_text, rules_text, CANONICAL_LANGUAGE, session_id=session_id, on_event=on_event,
+                                              reuse_similar=False, record=False, **options)
+            analysis, diff = compare_findings(plan, fresh)
+        self.record_analysis(text, rules_text, analysis, doc_type, portfolio)
+        # Report + diff share their findings: one translation batch covers both
+        parts = [analysis.risks, analysis.safe_clauses, diff.resolved, diff.introduced, diff.unchanged]
+        items = iter(self._translate_items([item for part in parts for item in part], language, session_id, on_event))
+        risks, safe_clauses, resolved, introduced, unchanged = [[next(items) for _ in part] for part in parts]
+        return (ContractAnalysis(risks=risks, safe_clauses=safe_clauses),
+                diff.model_copy(update={"resolved": resolved, "introduced": introduced, "unchanged": unchanged}))
+
+    def record_analysis(self, text: str, rules_text: str, analysis: ContractAnalysis, doc_type: str = None, portfolio: str = "default"):
+        # Portfolio analytics must never fail an analysis
+        try:
+            self.analytics.record(analysis, doc_type or doc_type_for(rules_text), portfolio, contract_key(text, rules_text))
+        except Exception:
+            pass
+
+    def portfolio(self, **filters) -> dict:
+        with self.tracer.span("portfolio") as span:
+            result = self.analytics.portfolio(**filters)
+            span.set(analyses=result["analyses"])
+        return result
+
+    # ==========================================
+    # 3B. CLAUSE ANCHORING (QUOTE -> OFFSETS + PAGE, NO LLM CALL)
+    # ==========================================
+    def anchor_clauses(self, risks, text: str, starts: list = None) -> list:
+        # One Anchor per risk (same order). `starts` = anchoring.page_starts(pages) when `text` is join_pages(pages)
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest() + json.dumps(starts)
+        with self.tracer.span("anchor", quotes=len(risks), contract_chars=len(text)) as span:
+            with self._anchor_lock:
+                index = self._anchor_indexes.get(key)
+                if index is not None:
+                    self._anchor_indexes.move_to_end(key)
+            span.set(index_hit=index is not None)
+            if index is None:
+                index = ClauseAnchorIndex(text, starts)
+                with self._anchor_lock:
+                    self._anchor_indexes[key] = index
+                    while len(self._anchor_indexes) > ANCHOR_INDEXES:
+                        self._anchor_indexes.popitem(last=False)
+            anchors = index.anchor([r.clause_text for r in risks])
+            span.set(not_found=sum(a.status == "not_found" for a in anchors))
+        self.anchors.record(anchors)
+        return anchors
+
+    # ==========================================
+    # 3C. EXPLANATION LANGUAGE (TRANSLATION PASS)
+    # ==========================================
+    def translate_analysis(self, analysis: ContractAnalysis, language: str, session_id: str = None, on_event=None) -> ContractAnalysis:
+        items = self._translate_items(analysis.risks + analysis.safe_clauses, language, session_id, on_event)
+        return ContractAnalysis(risks=items[:len(analysis.risks)], safe_clauses=items[len(analysis.risks):])
+
+    def translate_diff(self, diff: VersionDiff, language: str, session_id: str = None, on_event=None) -> VersionDiff:
+        parts = [diff.resolved, diff.introduced, diff.unchanged]
+        items = iter(self._translate_items([item for part in parts for item in part], language, session_id, on_event))
+        resolved, introduced, unchanged = [[next(items) for _ in part] for part in parts]
+        return diff.model_copy(update={"resolved": resolved, "introduced": introduced, "unchanged": unchanged})
+
+    def _translate_items(self, items: list, language: str, session_id=None, on_event=None) -> list:
+        # Cached per (finding, language): switching back and forth, cache hits and revised drafts only pay for new findings
+        if language == CANONICAL_LANGUAGE or not items:
+            return list(items)
+        keys = [make_cache_key("translation", language, type(item).__name__, explanatory_fields(item), self.model_key) for item in items]
+        translated = {}
+        for key in set(keys):
+            cached = self.translation_cache.get(key)
+            if cached is not None:
+                translated[key] = json.loads(cached)
+        missing = {key: item for key, item in zip(keys, items) if key not in translated}
+        with self.tracer.span("translate", language=language, items=len(set(keys)), cached=len(translated)) as span:
+            if missing and self.providers_configured():
+                order = list(missing)
+                prompt = TRANSLATE_PROMPT.format(language=language, entries=json.dumps(translation_entries([missing[k] for k in order]), ensure_ascii=False))
+
+                def invoke(provider, llm):
+                    return llm.with_structured_output(TranslationBatch).invoke(prompt)
+
+                try:
+                    # Output is about as long as the input here, not a full analysis
+                    provider, batch = self._call_with_failover(invoke, tokens=estimate_tokens(prompt) * 2, session_id=session_id, emit=on_event)
+                    span.set(provider=provider)
+                except Exception:
+                    # Untranslated beats no report: the findings stay in the canonical language, nothing is cached
+                    batch = None
+                for entry in (batch.entries if batch is not None else []):
+                    fields = translated_fields(missing[order[entry.id]], entry) if 0 <= entry.id < len(order) else None
+                    if fields:
+                        translated[order[entry.id]] = fields
+                        self.translation_cache.set(order[entry.id], json.dumps(fields, ensure_ascii=False))
+                span.set(translated=sum(key in translated for key in order), prompt_tokens=estimate_tokens(prompt))
+        return [apply_fields(item, translated.get(key)) for key, item in zip(keys, items)]
+
+    def _run_chunked_analysis(self, text, rules_text, language, chunk_tokens, max_workers, session_id, emit, relay=None) -> ContractAnalysis:
+        chunks = chunk_contract(text, chunk_tokens)
+        emit("progress", {"done": 0, "total": len(chunks)})
+        self.tracer.annotate(chunks=len(chunks))
+
+        results = [None] * len(chunks)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+            futures = {
+                pool.submit(contextvars.copy_context().run, self._run_analysis, f"[Part {i + 1} of {len(chunks)} of the contract]\n{chunk}", rules_text, language, session_id, emit, relay, i): i
+                for i, chunk in enumerate(chunks)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[futures[future]], _ = future.result()
+                emit("progress", {"done": done, "total": len(chunks)})
+
+        risks, safe_clauses = merge_findings(results)
+        return ContractAnalysis(risks=risks, safe_clauses=safe_clauses)
+
+    def _run_analysis(self, text: str, rules_text: str, language: str, session_id: str = None, emit=None,
+                      relay: RiskStreamRelay = None, section: int = 0) -> tuple:
+        def invoke(provider, llm):
+            compiled = self._build_prompt(provider, llm, rules_text, language)
+            # Callback timestamp splits model time from structured-output parsing (they run in one chain)
+            recorder = llm_end_recorder()
+            output = compiled.chain.invoke(compiled.inputs(text, rules_text), config={"callbacks": [recorder]})
+            if recorder.llm_end:
+                self.tracer.record("parse", time.perf_counter() - recorder.llm_end, provider=provider, ok=output["parsed"] is not None)
+            self._record_tokens(provider, compiled, output["raw"], text, rules_text)
+            parsed = output["parsed"]
+            return self._checked_result(provider, parsed, raw_payload(output["raw"]) if parsed is None else None, text, rules_text, language)
+
+        def invoke_streaming(provider, llm):
+            compiled = self._build_prompt(provider, llm, rules_text, language, streaming=True)
+            parser, raw, items = ArrayItemStreamParser("risks"), None, []
+            for chunk in compiled.chain.stream(compiled.inputs(text, rules_text)):
+                raw = chunk if raw is None else raw + chunk
+                for item in parser.feed(chunk_text(chunk)):
+                    items.append(item)
+                    # Same local fixes as the final answer; incomplete items only show up once repaired
+                    for risk in repair_analysis({"risks": [item]}).analysis.risks:
+                        relay.risk(section, provider, risk)
+            self._record_tokens(provider, compiled, raw, text, rules_text)
+            with self.tracer.span("parse", provider=provider) as parse_span:
+                result = parse_streamed_json(parser.text, ContractAnalysis)
+                parse_span.set(ok=result is not None)
+            payload = (loads_object(parser.text) or ({"risks": items} if items else None)) if result is None else None
+            return self._checked_result(provider, result, payload, text, rules_text, language)
+
+        try:
+            # Healthiest engine first, the next one raced in only if it is in its slow tail or fails
+            tokens = estimate_tokens(rules_text + text) + OUTPUT_TOKEN_ALLOWANCE
+            provider, result = self._call_with_failover(invoke_streaming if relay else invoke, tokens=tokens, session_id=session_id, emit=emit,
+                                                        finish=lambda name, result: self._finish_repair(name, result, session_id))
+        except Exception:
+            # 🚨 GRACEFUL FAIL: Agar dono crash ho jayein toh clean error raise karo
+            raise RuntimeError("Both primary and backup engines are currently unavailable due to high traffic.")
+        if relay:
+            relay.finish(section, provider, result)
+        return result, provider
+
+    def _checked_result(self, provider, parsed, payload, text, rules_text, language):
+        # Invalid structured output is not an outage: keep every valid item, fix what can be fixed locally and
+        # re-ask this engine only for the incomplete items. None still means "unusable" -> failover re-runs everything.
+        if parsed is not None:
+            parsed, normalized = normalize_analysis(parsed)
+            self.repairs.record(answers=1, normalized_items=normalized)
+            return parsed
+        self.repairs.record(answers=1, invalid_answers=1)
+        if not payload or not isinstance(payload.get("risks"), list):
+            self.repairs.record(failed_repairs=1)
+            return None
+        outcome, tokens_saved = repair_analysis(payload), estimate_tokens(rules_text + text)
+        if outcome.broken:
+            # Runs inside registry.call: the re-request is left to _finish_repair, after this attempt's call has returned
+            prompt = REPAIR_PROMPT.format(language=language, items=json.dumps(outcome.broken, ensure_ascii=False))
+            return PendingRepair(outcome, prompt, tokens_saved - estimate_tokens(prompt))
+        with self.tracer.span("repair", provider=provider) as span:
+            return self._repaired(span, outcome, [], tokens_saved)
+
+    def _finish_repair(self, provider, result, session_id):
+        if not isinstance(result, PendingRepair):
+            return result
+        with self.tracer.span("repair", provider=provider) as span:
+            quotes = {item["clause_text"] for item in result.outcome.broken}
+            recovered = [r for r in self._rerequest_risks(provider, result.prompt, session_id) if r.clause_text in quotes]
+            return self._repaired(span, result.outcome, recovered, result.tokens_saved)
+
+    def _repaired(self, span, outcome, recovered, tokens_saved):
+        risks = list(outcome.analysis.risks)
+        span.set(kept=len(risks), normalized=outcome.normalized, rerequested=len(outcome.broken), recovered=len(recovered),
+                 dropped=outcome.dropped + len(outcome.broken) - len(recovered), tokens_saved=tokens_saved)
+        if outcome.broken and not risks and not recovered:
+            # Nothing usable survived: a clean answer from the backup beats an empty report
+            self.repairs.record(failed_repairs=1)
+            return None
+        self.repairs.record(repaired_answers=1, normalized_items=outcome.normalized, rerequested_items=len(outcome.broken),
+                            dropped_items=outcome.dropped + len(outcome.broken) - len(recovered), tokens_saved=max(tokens_saved, 0))
+        return ContractAnalysis(risks=risks + recovered, safe_clauses=outcome.analysis.safe_clauses)
+
+    def _rerequest_risks(self, provider, prompt, session_id) -> list:
+        # Quota first, then the model itself (not through registry.call: a short repair call is not a sample of this
+        # engine's analysis latency, and its queue wait is no provider latency at all)
+        try:
+            self.limiter.acquire(provider, session_id, estimate_tokens(prompt) + OUTPUT_TOKEN_ALLOWANCE, None, self.config.queue_max_wait)
+            batch = self._get_llm(provider).with_structured_output(RiskRepairBatch).invoke(prompt)
+        except Exception:
+            # Repair is best effort: the items are dropped, the valid rest of the answer still counts
+            return []
+        return normalize_analysis(ContractAnalysis(risks=batch.risks, safe_clauses=[]))[0].risks if batch is not None else []
+
+    def _build_prompt(self, provider, llm, rules_text, language, streaming=False):
+        with self.tracer.span("prompt_build", provider=provider) as span:
+            started = time.perf_counter()
+            compiled = self.prompts.analysis(provider, llm, ContractAnalysis, rules_text, language, self.config.prefix_caching, streaming=streaming)
+            span.set(cache_hit=compiled.created_at < started)
+            return compiled
+
+    def _record_tokens(self, provider, compiled, raw_message, text, rules_text):
+        entry = self.tokens.record(provider, compiled, raw_message, text, rules_text)
+        # Lands on the enclosing provider_attempt span
+        self.tracer.annotate(input_tokens=entry["rulebook_tokens"] + entry["contract_tokens"],
+                             output_tokens=entry["output_tokens"], cached_tokens=entry["cached_tokens"])
+
+    def generate_email(self, risks, doc_type, language: str = "English", tone: str = "Polite", same_context: bool = False,
+                       session_id: str = None, stream: bool = False, on_event=None):
+        # Same (risks, doc_type, language, tone) -> same draft: repeat clicks and reruns are served from the result cache.
+        # stream=True sends "text_delta" events while the draft is written.
+        # same_context=True continues this session's analysis conversation instead of re-listing every risk
+        emit = on_event or (lambda event, data: None)
+        tone_text = EMAIL_TONES.get(tone, EMAIL_TONES["Polite"])
+        conversation = self._conversation_for(session_id, risks) if same_context else None
+        cache_key = make_cache_key("email", [r.model_dump() for r in risks], doc_type, language, tone, self.model_key,
+                                   conversation is not None)
+
+        with self.tracer.span("email", doc_type=doc_type, risks=len(risks), tone=tone, same_context=conversation is not None) as span:
+            cached = self.analysis_cache.get(cache_key)
+            span.set(cache_hit=cached is not None)
+            if cached is not None:
+                emit("cache_hit", {"key": cache_key})
+                return cached
+
+            if conversation is not None:
+                request = self._email_follow_up(conversation, risks, doc_type, language, tone_text)
+            else:
+                risk_descriptions = "\n".join([f"- Clause: '{r.clause_text}'\n  Request: {r.suggestion}" for r in risks])
+                request = EMAIL_PROMPT.format(tone=tone_text, doc_type=doc_type, risk_descriptions=risk_descriptions, language=language)
+            relay = TextStreamRelay(emit) if stream else None
+
+            def invoke(provider, llm):
+                if relay:
+                    message = None
+                    for chunk in llm.stream(request):
+                        message = chunk if message is None else message + chunk
+                        relay.delta(provider, chunk_text(chunk))
+                else:
+                    message = llm.invoke(request)
+                usage = getattr(message, "usage_metadata", None) or {}
+                self.tracer.annotate(input_tokens=usage.get("input_tokens", 0), output_tokens=usage.get("output_tokens", 0),
+                                     cached_tokens=(usage.get("input_token_details") or {}).get("cache_read", 0))
+                return chunk_text(message) if message is not None else ""
+
+            prompt_text = request if isinstance(request, str) else "".join(str(m.content) for m in request)
+            try:
+                provider, content = self._call_with_failover(invoke, is_valid=lambda content: bool(content and content.strip()),
+                                                             tokens=estimate_tokens(prompt_text) + OUTPUT_TOKEN_ALLOWANCE, session_id=session_id, emit=on_event)
+                span.set(provider=provider)
+            except Exception:
+                # 🚨 GRACEFUL FAIL FOR EMAIL
+                raise RuntimeError("Email generation service is busy.")
+            if relay:
+                relay.finish(provider, content)
+            self.analysis_cache.set(cache_key, content)
+            return content
+
+    def _remember_conversation(self, session_id, contract_text, rules_text, language, result):
+        # Single-call analyses only: the exact messages that produced `result`, so the email can be a follow-up turn
+        if not session_id:
+            return
+        with self._llm_lock:
+            self._conversations[session_id] = (contract_text, rules_text, language, result)
+            self._conversations.move_to_end(session_id)
+            while len(self._conversations) > MAX_CONVERSATIONS:
+                self._conversations.popitem(last=False)
+
+    def _conversation_for(self, session_id, risks):
+        with self._llm_lock:
+            conversation = self._conversations.get(session_id) if session_id else None
+        if conversation is None:
+            return None
+        # Stale if the dashboard now shows another contract (e.g. a cache hit after this analysis)
+        found = {r.clause_text for r in conversation[3].risks}
+        return conversation if risks and all(r.clause_text in found for r in risks) else None
+
+    def _email_follow_up(self, conversation, risks, doc_type, language, tone_text) -> list:
+        from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+        contract_text, rules_text, analysis_language, result = conversation
+        # Byte-identical to the analysis request, so providers with prefix caching bill it as cached input
+        static_text = ANALYSIS_STATIC.format(rules_text=rules_text)
+        dynamic_text = ANALYSIS_DYNAMIC.format(language=analysis_language, contract_text=contract_text)
+        if self.config.prefix_caching:
+            messages = [SystemMessage(static_text), HumanMessage(dynamic_text)]
+        else:
+            messages = [HumanMessage(static_text + dynamic_text)]
+        # Findings numbered in the AI turn; the new request only cites the numbers
+        numbered = {r.clause_text: i for i, r in enumerate(result.risks, start=1)}
+        answer = {"risks": [{"number": i, **r.model_dump()} for i, r in enumerate(result.risks, start=1)],
+                  "safe_clauses": [s.model_dump() for s in result.safe_clauses]}
+        numbers = ", ".join(f"#{numbered[r.clause_text]}" for r in risks)
+        return messages + [AIMessage(json.dumps(answer, ensure_ascii=False)),
+                           HumanMessage(EMAIL_FOLLOW_UP.format(tone=tone_text, doc_type=doc_type, numbers=numbers, language=language))]
+
+    # ==========================================
+    # 4. PDF + FEEDBACK
+    # ==========================================
+    def stream_pdf_pages(self, uploaded_file):
+        # Pages in order as soon as they are parsed: text-layer pages straight away, a run of scanned pages once it is OCR'd
+        # (so OCR overlaps with parsing the rest of the file). The full list is cached per file hash after the last page
+        data = read_pdf_bytes(uploaded_file)
+        file_hash = hashlib.sha256(data).hexdigest()
+        cached = self.pdf_cache.get(file_hash)
+        self.tracer.annotate(bytes=len(data), cache_hit=cached is not None)
+        if cached is not None:
+            yield from cached
+            return
+        pages, scanned = [], []
+        for page in iter_pdf_pages(data):
+            if not page.has_text_layer:
+                scanned.append(page)
+                continue
+            for ready in self._ocr_scanned_pages(data, scanned) + [page]:
+                pages.append(ready)
+                yield ready
+            scanned = []
+        for ready in self._ocr_scanned_pages(data, scanned):
+            pages.append(ready)
+            yield ready
+        self.pdf_cache.set(file_hash, pages)
+
+    def extract_pdf_pages(self, uploaded_file, on_page=None):
+        # on_page(page) per page as it arrives, e.g. for progress ("page 12 read") while a long PDF is still parsing
+        try:
+            with self.tracer.span("extract_pdf") as span:
+                pages = []
+                for page in self.stream_pdf_pages(uploaded_file):
+                    pages.append(page)
+                    if on_page:
+                        on_page(page)
+                span.set(pages=len(pages), scanned_pages=sum(not p.has_text_layer for p in pages), ocr_pages=sum(p.ocr for p in pages))
+                return pages
+        except Exception:
+            # 🚨 GRACEFUL FAIL FOR PDF
+            raise ValueError("Could not read this PDF format.")
+
+    def _ocr_scanned_pages(self, data, pages):
+        scanned = [p.number - 1 for p in pages if not p.has_text_layer]
+        if not scanned or not self.config.ocr or not ocr_available():
+            return list(pages)
+        with self.tracer.span("ocr", scanned_pages=len(scanned)) as span:
+            try:
+                read, stats = ocr_pages(data, scanned, self.config.ocr_language, self.ocr_cache)
+                span.set(**stats)
+            except ocr_errors() as e:
+                # A broken tesseract install / odd scan must not break text-layer PDFs: scanned pages stay empty, as before
+                logger.warning("OCR skipped for %d scanned page(s): %s: %s", len(scanned), type(e).__name__, e, exc_info=True)
+                span.set(error=type(e).__name__)
+                return pages
+        # Merged back in page order: OCR'd pages sit exactly where the scans were
+        return [read.get(p.number - 1, p) for p in pages]
+
+    def extract_text_from_pdf(self, uploaded_file):
+        return join_pages(self.extract_pdf_pages(uploaded_file))
+
+    def send_feedback(self, feedback_text):
+        # Returns as soon as the feedback is on disk; delivery (and retries while Discord is slow or down) happen in the background
+        try:
+            spool, delivery = self._feedback_spool()
+            feedback_id = spool.add(feedback_text)
+        except Exception:
+            # 🚨 GRACEFUL FAIL: Asli error hide karke generic message bhejenge
+            raise RuntimeError("Feedback could not be saved.")
+        if delivery is not None:
+            delivery.notify()
+        return feedback_id
+
+    def feedback_stats(self) -> dict:
+        spool, delivery = self._feedback_spool()
+        return {**spool.stats(), **(delivery.stats() if delivery else {}), "webhook_configured": delivery is not None}
+
+    def _feedback_spool(self):
+        # Without a webhook the spool is opened on first use and keeps everything until one is configured
+        with self._llm_lock:
+            if self.feedback is None:
+                self.feedback = FeedbackSpool(self.config.feedback_spool_path or ":memory:")
+                if self.config.discord_webhook_url:
+                    self.feedback_delivery = FeedbackDelivery(self.feedback, self.config.discord_webhook_url, self.config.feedback_batch_size)
+                    self.feedback_delivery.start()
+                else:
+                    logger.warning("No DISCORD_WEBHOOK_URL configured: feedback is kept in %s and not delivered until one is set",
+                                   self.config.feedback_spool_path or "memory")
+            return self.feedback, self.feedback_delivery
+
+    def feedback_delivery_configured(self) -> bool:
+        return bool(self.config.discord_webhook_url)
+
+# ==========================================
+# 5. HELPER FUNCTIONS
+# ==========================================
+def _failure_reason(error):
+    # Short, label-safe cause for the span that replaces a failed attempt
+    if error is None:
+        return None
+    if isinstance(error, QueueTimeout):
+        return "queue_timeout"
+    if is_rate_limit_error(error):
+        return "rate_limited"
+    if isinstance(error, ValueError) and "invalid result" in str(error):
+        return "invalid_result"
+    return "error"
+
+def _anchor_label(anchor):
+    if anchor.status == "not_found":
+        return "NOT FOUND in the document (paraphrased or invented quote, please verify)"
+    where = f"page {anchor.page}" if anchor.page else f"characters {anchor.start}-{anchor.end}"
+    return where if anchor.status == "exact" else f"{where} (closest match, {anchor.score:.0%} of the quote)"
+
+def calculate_score(risks):
+    # Same points as the portfolio view (core/analytics.py), which scores whole columns at once
+    return min(sum(RISK_POINTS["HIGH"] if r.risk_level.upper() == "HIGH" else RISK_POINTS["MEDIUM"] for r in risks), MAX_SCORE)
+
+def get_verdict(score):
+    return verdict_for(score)
+
+def generate_report_text(analysis, score, verdict, anchors=None):
+    report = f"🚩 REDFLAG.AI AUDIT REPORT 🚩\n\nToxicity Score: {score}%\nVerdict: {verdict}\n" + "-"*40 + "\n\n"
+    if analysis.risks:
+        report += "⚠️ IDENTIFIED RISKS & DEVIATIONS:\n\n"
+        # anchors (optional, one per risk): where the quote was found in the contract
+        for r, anchor in zip(analysis.risks, anchors or [None] * len(analysis.risks)):
+            report += f"[{r.risk_level.upper()} RISK] | Category: {r.category}\nFound Clause: \"{r.clause_text}\"\n"
+            if anchor is not None:
+                report += f"Location: {_anchor_label(anchor)}\n"
+            report += f"Baseline: {r.baseline}\nDeviation: {r.deviation}\nSuggestion: {r.suggestion}\n" + "-"*40 + "\n\n"
+    if analysis.safe_clauses:
+        report += "✅ CLAUSES CHECKED & PASSED (STANDARD):\n\n"
+        for s in analysis.safe_clauses:
+            report += f"- {s.clause_summary}: {s.reason}\n"
+        report += "-"*40 + "\n\n"
+    return report + "Generated by RedFlag.ai (Not Legal Advice)"
@@ -0,0 +1,233 @@
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+
+# ==========================================
+# 1. DURABLE SPOOL (SQLITE, SURVIVES RESTARTS + WEBHOOK OUTAGES)
+# ==========================================
+PENDING, DELIVERED, DEAD = "pending", "delivered", "dead"
+CLAIM_SECONDS = 60.0   # a claimed batch is invisible to other workers / processes sharing the file for this long
+MAX_ATTEMPTS = 12      # ~2 hours of backoff, then the row is kept as "dead" for a manual look
+
+logger = logging.getLogger("trueclause")
+
+class FeedbackSpool:
+    def __init__(self, db_path: str = ".trueclause_cache/feedback.sqlite3"):
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS feedback (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, text TEXT NOT NULL, created REAL NOT NULL, status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0, next_attempt REAL NOT NULL, last_error TEXT)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_feedback_due ON feedback(status, next_attempt)")
+        self._lock = threading.Lock()
+
+    def add(self, text: str) -> int:
+        # Feedback longer than one webhook message is spooled as consecutive parts ("(1/3) ..."); returns the first part's id
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                ids = [self._db.execute("INSERT INTO feedback (text, created, status, next_attempt) VALUES (?, ?, ?, ?)",
+                                        (part, now, PENDING, now)).lastrowid for part in split_feedback(text)]
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            return ids[0]
+
+    def claim(self, limit: int) -> list:
+        # -> [(id, text, attempts)] due now, oldest first; BEGIN IMMEDIATE makes the claim atomic across processes
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute("SELECT id, text, attempts FROM feedback WHERE status = ? AND next_attempt <= ? ORDER BY id LIMIT ?",
+                                        (PENDING, now, limit)).fetchall()
+                self._db.executemany("UPDATE feedback SET next_attempt = ? WHERE id = ?", [(now + CLAIM_SECONDS, r[0]) for r in rows])
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            return rows
+
+    def delivered(self, ids: list):
+        with self._lock:
+            self._db.executemany("UPDATE feedback SET status = ?, last_error = NULL WHERE id = ?", [(DELIVERED, i) for i in ids])
+
+    def retry(self, ids: list, error: str, delay: float):
+        with self._lock:
+            self._db.executemany("""UPDATE feedback SET attempts = attempts + 1, next_attempt = ?, last_error = ?,
+                                    status = CASE WHEN attempts + 1 >= ? THEN ? ELSE status END WHERE id = ?""",
+                                 [(time.time() + delay, error[:200], MAX_ATTEMPTS, DEAD, i) for i in ids])
+
+    def next_due(self):
+        with self._lock:
+            row = self._db.execute("SELECT MIN(next_attempt) FROM feedback WHERE status = ?", (PENDING,)).fetchone()
+            return row[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM feedback GROUP BY status").fetchall())
+            oldest = self._db.execute("SELECT MIN(created) FROM feedback WHERE status = ?", (PENDING,)).fetchone()[0]
+        return {"pending": counts.get(PENDING, 0), "delivered": counts.get(DELIVERED, 0), "dead": counts.get(DEAD, 0),
+                "oldest_pending_seconds": round(time.time() - oldest, 1) if oldest else 0.0}
+
+# ==========================================
+# 2. BACKGROUND DELIVERY (POOLED SESSION, BATCHES, BACKOFF)
+# ==========================================
+MESSAGE_CHARS = 2000   # Discord's content limit per webhook message
+HEADER = "🛡️ **New Feedback from TrueClause:**"
+
+QUOTE_CHARS = MESSAGE_CHARS - len(HEADER) - 4   # one quoted feedback alone in a message
+
+def _quote(text: str) -> str:
+    return "> " + text.strip().replace("\n", "\n> ")
+
+def split_feedback(text: str) -> list:
+    # Parts that each fit one message once quoted ("> " per line, so a newline costs 3 characters), cut between words
+    text = text.strip()
+    if len(_quote(text)) <= QUOTE_CHARS:
+        return [text]
+    budget = QUOTE_CHARS - len("> (99/99) ")
+    pieces, current, used = [], [], 0
+    for token in re.findall(r"\S{1,%d}|\s" % (budget // 2), text):
+        cost = 3 if token == "\n" else len(token)
+        if current and used + cost > budget:
+            pieces.append("".join(current).strip())
+            current, used = [], 0
+        current.append(token)
+        used += cost
+    pieces.append("".join(current).strip())
+    pieces = [piece for piece in pieces if piece]
+    return [f"({i}/{len(pieces)}) {piece}" for i, piece in enumerate(pieces, start=1)]
+
+def format_batch(texts: list) -> str:
+    quoted = []
+    for text in texts:
+        block = _quote(text)
+        if len(block) > QUOTE_CHARS:
+            # Only rows spooled before split_feedback existed can still be this long
+            logger.warning("Feedback cut from %d to %d characters for the webhook", len(block), QUOTE_CHARS)
+            block = block[:QUOTE_CHARS]
+        quoted.append(block)
+    return HEADER + "\n\n" + "\n\n".join(quoted)
+
+class FeedbackDelivery:
+    # One daemon thread per process; send_feedback() only writes the spool and wakes it up
+    def __init__(self, spool: FeedbackSpool, webhook_url: str, batch_size: int = 10, base_backoff: float = 2.0,
+                 max_backoff: float = 900.0, timeout: float = 10.0, session=None):
+        self.spool = spool
+        self.webhook_url = webhook_url
+        self.batch_size = batch_size
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self._session = session
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._counters = {"requests": 0, "failures": 0, "messages_delivered": 0}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="feedback-delivery", daemon=True)
+            self._thread.start()
+        self._wake.set()  # leftovers from a previous run go out right away
+
+    def notify(self):
+        self._wake.set()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        # Shutdown / tests: True once every spooled message was delivered (or given up on)
+        deadline = time.time() + timeout
+        while self.spool.stats()["pending"]:
+            if time.time() >= deadline:
+                return False
+            self._wake.set()
+            time.sleep(0.05)
+        return True
+
+    def stats(self) -> dict:
+        return dict(self._counters)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                idle = self.deliver_due()
+            except Exception:
+                # Spool locked by another process / disk hiccup: try again shortly, never kill the thread
+                idle = self.base_backoff
+            self._wake.wait(idle)
+            self._wake.clear()
+
+    def deliver_due(self) -> float:
+        # Sends everything due now in batches; returns how long the thread may sleep
+        while not self._stop.is_set():
+            rows = self.spool.claim(self.batch_size)
+            if not rows:
+                break
+            # Pack as many messages as fit into one webhook post
+            batch, sent = [], 0
+            for row in rows:
+                if batch and len(format_batch([r[1] for r in batch + [row]])) > MESSAGE_CHARS:
+                    sent += self._post(batch)
+                    batch = []
+                batch.append(row)
+            sent += self._post(batch)
+            if sent < len(rows):
+                break
+        next_due = self.spool.next_due()
+        return 60.0 if next_due is None else min(60.0, max(0.0, next_due - time.time()))
+
+    def _post(self, batch: list) -> int:
+        ids = [row[0] for row in batch]
+        self._counters["requests"] += 1
+        try:
+            response = self._get_session().post(self.webhook_url, json={"username": "TrueClause User", "content": format_batch([r[1] for r in batch])},
+                                                timeout=self.timeout)
+            if response.status_code in (200, 204):
+                self.spool.delivered(ids)
+                self._counters["messages_delivered"] += len(ids)
+                return len(ids)
+            error, retry_after = f"HTTP {response.status_code}", _retry_after(response)
+        except Exception as e:
+            error, retry_after = type(e).__name__, None
+        self._counters["failures"] += 1
+        attempts = max(row[2] for row in batch)
+        # Exponential backoff with jitter; a 429 says exactly how long to wait
+        delay = retry_after if retry_after is not None else min(self.max_backoff, self.base_backoff * 2 ** attempts) * random.uniform(0.8, 1.2)
+        self.spool.retry(ids, error, delay)
+        return 0
+
+    def _get_session(self):
+        if self._session is None:
+            # Keep-alive connection pool: one TLS handshake per burst, not per message
+            import requests
+            from requests.adapters import HTTPAdapter
+            self._session = requests.Session()
+            self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+            self._session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        return self._session
+
+def _retry_after(response):
+    if response.status_code != 429:
+        return None
+    try:
+        return float(response.json().get("retry_after"))
+    except Exception:
+        try:
+            return float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return None
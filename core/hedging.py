@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# ==========================================
+# 1. ROLLING LATENCY PERCENTILES
+# ==========================================
+class LatencyTracker:
+    def __init__(self, window: int = 200, default_seconds: float = 10.0, min_samples: int = 10):
+        self.default_seconds = default_seconds
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> float:
+        with self._lock:
+            samples = sorted(self._samples)
+        # Cold start: not enough history yet, so don't hedge aggressively and double the bill
+        if len(samples) < self.min_samples:
+            return self.default_seconds
+        return samples[min(int(p * len(samples)), len(samples) - 1)]
+
+# ==========================================
+# 2. HEDGED EXECUTION (FIRST VALID RESULT WINS)
+# ==========================================
+# Shared by every session; attempts that lose the race are abandoned here instead of blocking the caller
+_HEDGE_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix="trueclause-hedge")
+
+def hedged_call(attempts, hedge_after: float, is_valid=lambda result: result is not None, on_latency=None, on_launch=None,
+                admit=None):
+    # attempts: ordered list of (name, zero-arg callable). The next one is launched when the current
+    # ones are slower than hedge_after seconds, or immediately when they fail / return junk.
+    # on_launch(name, reason, last_error) fires before each start; reason is "primary", "hedge" or "failover".
+    # admit(name, reason) runs on the caller's thread just before an attempt is submitted (rate-limit quota): a wait there
+    # never holds a pool worker or counts toward hedge_after; False skips a hedge, raising counts as that attempt failing.
+    pending, errors = {}, []
+    remaining = list(attempts)
+    hedging = True
+
+    def launch(reason):
+        nonlocal hedging
+        while remaining:
+            name, fn = remaining[0]
+            if on_launch: on_launch(name, reason, errors[-1][1] if reason == "failover" and errors else None)
+            try:
+                admitted = admit(name, reason) if admit else True
+            except Exception as e:
+                remaining.pop(0)
+                errors.append((name, e))
+                reason = "failover"
+                continue
+            if not admitted:
+                # Backup has no free quota right now: keep racing the primary alone, the backup stays the failover
+                hedging = False
+                return
+            remaining.pop(0)
+            started = time.perf_counter()
+            def timed(fn=fn, name=name, started=started):
+                result = fn()
+                if on_latency: on_latency(name, time.perf_counter() - started)
+                return result
+            pending[_HEDGE_POOL.submit(timed)] = name
+            return
+
+    launch("primary")
+    while pending:
+        done, _ = wait(list(pending), timeout=hedge_after if remaining and hedging else None, return_when=FIRST_COMPLETED)
+        if not done:
+            # Primary is in its slow tail: fire the backup and race them
+            launch("hedge")
+            continue
+        for future in done:
+            name = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                errors.append((name, e))
+                continue
+            if is_valid(result):
+                # Loser can't be interrupted mid-HTTP call; cancel it if queued, otherwise drop its answer
+                for loser in pending:
+                    loser.cancel()
+                return name, result
+            errors.append((name, ValueError(f"{name} returned an invalid result")))
+        if not pending and remaining:
+            launch("failover")
+
+    raise RuntimeError(f"All engines failed: {errors}")
@@ -0,0 +1,204 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from core.anchoring import page_starts
+from core.classifier import classify_document
+from core.models import ContractAnalysis, RiskItem, VersionDiff
+from core.engine import calculate_score, get_verdict
+from core.pdf import join_pages
+from rules import RULEBOOKS
+
+# ==========================================
+# 1. JOB RECORD
+# ==========================================
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+class Job:
+    def __init__(self, kind: str, payload: dict):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.payload = payload
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.events = []
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._changed = threading.Condition()
+        self._cursors = set()   # cursors handed to readers while the job ran
+        self._moved = {}        # ... and where they point once the deltas are collapsed
+
+    def add_event(self, event: str, data: dict):
+        with self._changed:
+            self.events.append({"event": event, "time": time.time(), **data})
+            self._changed.notify_all()
+
+    def finish(self, status: str, data: dict):
+        # Status + last event under one lock, so a reader told "finished" has every event.
+        # A finished job is kept for polling, so its token-by-token text_delta events are collapsed into one per answer
+        with self._changed:
+            self.status, self.finished_at = status, time.time()
+            self.events.append({"event": status, "time": self.finished_at, **data})
+            self.events, self._moved = _collapse_deltas(self.events, self._cursors)
+            self._cursors = set()
+            self._changed.notify_all()
+
+    def wait_for_events(self, cursor: int, timeout: float) -> tuple:
+        # Long-poll / streaming helper: returns (new events since cursor, finished?)
+        with self._changed:
+            if len(self.events) <= cursor and self.status in (QUEUED, RUNNING):
+                self._changed.wait(timeout)
+            if cursor in self._moved:
+                # Cursor from before the collapse: resume inside the merged delta, after the text this reader already has
+                index, sent = self._moved[cursor]
+                head = [{**self.events[index], "text": self.events[index]["text"][sent:]}] if sent else []
+                return head + self.events[index + len(head):], True
+            if self.status in (QUEUED, RUNNING):
+                self._cursors.add(len(self.events))
+            return self.events[cursor:], self.status in (DONE, FAILED)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+def _collapse_deltas(events: list, cursors: set) -> tuple:
+    # -> (events with each run of one provider's text_delta events merged, {old cursor: (new index, chars of that event already sent)})
+    collapsed, texts, moved = [], [], {}
+    for position, event in enumerate(events):
+        last = collapsed[-1] if collapsed else None
+        merge = event["event"] == "text_delta" and last is not None and last["event"] == "text_delta" and last["provider"] == event["provider"]
+        if position in cursors:
+            moved[position] = (len(collapsed) - 1, sum(map(len, texts[-1]))) if merge else (len(collapsed), 0)
+        if merge:
+            texts[-1].append(event["text"])
+        else:
+            collapsed.append(dict(event))
+            texts.append([event["text"]] if event["event"] == "text_delta" else None)
+    if len(events) in cursors:
+        moved[len(events)] = (len(collapsed), 0)
+    for event, parts in zip(collapsed, texts):
+        if parts:
+            event["text"] = "".join(parts)
+    return collapsed, moved
+
+def contract_fields(text, doc_type: str, starts: list = None) -> dict:
+    # Contract text + rulebook for analyze / compare jobs ("auto" = local classifier, no LLM call)
+    if not isinstance(text, str) or len(text.split()) < 20:
+        raise ValueError("Please provide a complete contract (text or pdf_base64).")
+    if doc_type == "auto":
+        doc_type = classify_document(text).doc_type
+    if doc_type not in RULEBOOKS:
+        raise ValueError(f"Unknown doc_type. Use one of: {', '.join(sorted(RULEBOOKS))}, auto")
+    return {"text": text, "rules_text": RULEBOOKS[doc_type], "doc_type": doc_type, "page_starts": starts}
+
+# ==========================================
+# 2. JOB QUEUE + WORKER POOL
+# ==========================================
+class JobQueue:
+    def __init__(self, engine, workers: int = 4, max_jobs: int = 10000, retention_seconds: int = 3600):
+        self.engine = engine
+        self.max_jobs = max_jobs
+        self.retention_seconds = retention_seconds
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="trueclause-job")
+        self._handlers = {"analyze": self._run_analyze, "compare": self._run_compare, "translate": self._run_translate,
+                          "email": self._run_email}
+
+    def submit(self, kind: str, payload: dict) -> Job:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = Job(kind, payload)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        job.add_event("queued", {"position": self.queue_depth()})
+        self._pool.submit(self._execute, job)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return sum(job.status == QUEUED for job in self._jobs.values())
+
+    def _prune(self):
+        # Finished jobs are kept for polling for a while, then dropped oldest-first
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+        while len(self._jobs) >= self.max_jobs:
+            oldest = next((j.id for j in self._jobs.values() if j.finished_at), None)
+            if oldest is None:
+                raise RuntimeError("Job queue is full.")
+            del self._jobs[oldest]
+
+    def _execute(self, job: Job):
+        job.status, job.started_at = RUNNING, time.time()
+        job.add_event("started", {})
+        try:
+            job.result, status = self._handlers[job.kind](job), DONE
+        except Exception as e:
+            job.error, status = str(e), FAILED
+        job.finish(status, {"seconds": round(time.time() - job.started_at, 3)})
+
+    def _contract(self, job: Job) -> dict:
+        # PDF uploads are extracted (and scanned pages OCR'd) here, on a worker, never in the HTTP thread
+        p = job.payload
+        if "pdf" in p:
+            pages = self.engine.extract_pdf_pages(p.pop("pdf"), on_page=lambda page: job.add_event("page", {"number": page.number, "ocr": page.ocr}))
+            job.add_event("extracted", {"pages": len(pages), "ocr_pages": sum(page.ocr for page in pages)})
+            p.update(contract_fields(join_pages(pages), p["doc_type"], page_starts(pages)))
+        return p
+
+    def _run_analyze(self, job: Job) -> dict:
+        p = self._contract(job)
+        analysis = self.engine.analyze_contract(p["text"], p["rules_text"], p.get("language", "English"),
+                                                session_id=p.get("client_id") or job.id, stream=p.get("stream", False),
+                                                on_event=job.add_event, doc_type=p.get("doc_type"), portfolio=p.get("portfolio") or "default")
+        score = calculate_score(analysis.risks)
+        return {"analysis": analysis.model_dump(), "doc_type": p.get("doc_type"), "score": score, "verdict": get_verdict(score),
+                "anchors": self._anchors(analysis, p)}
+
+    def _run_compare(self, job: Job) -> dict:
+        p = self._contract(job)
+        analysis, diff = self.engine.compare_versions(p["previous_text"], ContractAnalysis(**p["previous_analysis"]), p["text"], p["rules_text"],
+                                                      p.get("language", "English"), session_id=p.get("client_id") or job.id,
+                                                      on_event=job.add_event, stream=p.get("stream", False), doc_type=p.get("doc_type"),
+                                                      portfolio=p.get("portfolio") or "default")
+        score = calculate_score(analysis.risks)
+        return {"analysis": analysis.model_dump(), "score": score, "verdict": get_verdict(score), "diff": diff.model_dump(),
+                "anchors": self._anchors(analysis, p)}
+
+    def _anchors(self, analysis: ContractAnalysis, p: dict) -> list:
+        # Per risk: where its clause_text sits in the submitted text ("not_found" = paraphrased or invented quote)
+        return [anchor._asdict() for anchor in self.engine.anchor_clauses(analysis.risks, p["text"], p.get("page_starts"))]
+
+    def _run_translate(self, job: Job) -> dict:
+        p = job.payload
+        session_id = p.get("client_id") or job.id
+        result = {"analysis": self.engine.translate_analysis(ContractAnalysis(**p["analysis"]), p["language"], session_id=session_id,
+                                                             on_event=job.add_event).model_dump()}
+        if p.get("diff"):
+            result["diff"] = self.engine.translate_diff(VersionDiff(**p["diff"]), p["language"], session_id=session_id, on_event=job.add_event).model_dump()
+        return result
+
+    def _run_email(self, job: Job) -> dict:
+        p = job.payload
+        risks = [RiskItem(**r) for r in p["risks"]]
+        return {"email": self.engine.generate_email(risks, p.get("doc_type", "contract"), p.get("language", "English"), p.get("tone", "Polite"),
+                                                    p.get("same_context", False), session_id=p.get("client_id") or job.id,
+                                                    stream=p.get("stream", False), on_event=job.add_event)}
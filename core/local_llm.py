@@ -0,0 +1,109 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import PrivateAttr
+from core.chunking import estimate_tokens
+
+# ==========================================
+# 1. LOCAL STAND-IN PROVIDER (OFFLINE, DETERMINISTIC)
+# ==========================================
+def _default_responder(messages, schema):
+    if schema is None:
+        return "Dear [Name],\n\nThank you for sharing the agreement. I would like to discuss a few clauses before signing.\n\nBest regards"
+    # Empty but schema-valid answer, e.g. ContractAnalysis(risks=[], safe_clauses=[])
+    return {name: [] for name in schema.model_fields}
+
+STREAM_CHUNK_CHARS = 16
+
+class LocalChatModel(BaseChatModel):
+    # Behaves like a hosted chat model, including usage_metadata and a provider-side prefix cache:
+    # a SystemMessage seen before is reported as cache_read tokens, like Gemini's context caching.
+    model: str = "local-standin"
+    responder: object = None
+    # Fault injection for benchmarks: per-call latency (+ uniform jitter, + a share of very slow calls),
+    # plain failures and 429s. Draws come from a seeded RNG so the same seed replays the same faults.
+    latency_seconds: float = 0.0
+    jitter_seconds: float = 0.0
+    slow_call_rate: float = 0.0
+    slow_call_seconds: float = 0.0
+    failure_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    seed: int = 0
+    calls: int = 0
+
+    _seen_prefixes: set = PrivateAttr(default_factory=set)
+    _lock: object = PrivateAttr(default_factory=threading.Lock)
+    _rng: object = PrivateAttr(default=None)
+
+    def _inject_faults(self):
+        with self._lock:
+            if self._rng is None:
+                self._rng = random.Random(self.seed)
+            self.calls += 1
+            delay = self.latency_seconds + self._rng.uniform(0, self.jitter_seconds)
+            if self._rng.random() < self.slow_call_rate:
+                delay += self.slow_call_seconds
+            roll = self._rng.random()
+        if delay:
+            time.sleep(delay)
+        if roll < self.rate_limit_rate:
+            raise RuntimeError(f"429 Resource exhausted: simulated rate limit on {self.model}")
+        if roll < self.rate_limit_rate + self.failure_rate:
+            raise RuntimeError(f"Simulated provider failure on {self.model}")
+
+    @property
+    def _llm_type(self) -> str:
+        return "trueclause-local"
+
+    def _answer(self, messages, kwargs) -> tuple:
+        self._inject_faults()
+        schema = kwargs.get("response_schema")
+        answer = (self.responder or _default_responder)(messages, schema)
+        content = answer if isinstance(answer, str) else json.dumps(answer, ensure_ascii=False)
+
+        prompt_text = "".join(str(m.content) for m in messages)
+        prefix = "".join(str(m.content) for m in messages if isinstance(m, SystemMessage))
+        cached = 0
+        if prefix:
+            digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+            with self._lock:
+                if digest in self._seen_prefixes:
+                    cached = estimate_tokens(prefix)
+                self._seen_prefixes.add(digest)
+
+        input_tokens, output_tokens = estimate_tokens(prompt_text), estimate_tokens(content)
+        return content, {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "input_token_details": {"cache_read": cached},
+        }
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        content, usage = self._answer(messages, kwargs)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content, usage_metadata=usage))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        # Token-sized pieces, usage on the last chunk (like the hosted providers)
+        content, usage = self._answer(messages, kwargs)
+        for start in range(0, len(content), STREAM_CHUNK_CHARS):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=content[start:start + STREAM_CHUNK_CHARS]))
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage))
+
+    def get_num_tokens(self, text: str) -> int:
+        return estimate_tokens(text)
+
+    def with_structured_output(self, schema, include_raw: bool = False, **kwargs):
+        def parse(message):
+            try:
+                parsed, error = schema.model_validate_json(message.content), None
+            except Exception as e:
+                parsed, error = None, e
+            return {"raw": message, "parsed": parsed, "parsing_error": error} if include_raw else parsed
+        return self.bind(response_schema=schema) | RunnableLambda(parse)
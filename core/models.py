@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+# ==========================================
+# 1. DATA MODELS (PYDANTIC)
+# ==========================================
+class RiskItem(BaseModel):
+    clause_text: str = Field(description="Exact text of the suspicious clause found in the document")
+    risk_level: str = Field(description="Strictly output: HIGH or MEDIUM")
+    category: str = Field(description="Financial, Career, Privacy, Legal, or Freedom")
+    baseline: str = Field(description="What is the standard, fair industry practice for this? (The Baseline)")
+    deviation: str = Field(description="Why does this specific clause deviate from the baseline? Why is it one-sided?")
+    suggestion: str = Field(description="Actionable advice on what to negotiate")
+
+class SafeItem(BaseModel):
+    clause_summary: str = Field(description="Short summary of the standard clause found (e.g., '30-Day Notice Period')")
+    reason: str = Field(description="Why this is considered standard and safe")
+    clause_text: str = Field("", description="Exact text of this standard clause as it appears in the document")
+
+class ContractAnalysis(BaseModel):
+    risks: List[RiskItem]
+    safe_clauses: List[SafeItem] = Field(description="List of clauses checked that are standard/fair and NOT red flags.")
+
+class VersionDiff(BaseModel):
+    # Negotiation rounds: how the risks moved between the previous and the revised draft
+    resolved: List[RiskItem]
+    introduced: List[RiskItem]
+    unchanged: List[RiskItem]
+    clauses_total: int = 0
+    clauses_reanalyzed: int = 0
+    clauses_removed: int = 0
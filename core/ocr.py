@@ -0,0 +1,152 @@
+import hashlib
+import io
+import time
+from functools import lru_cache
+from core.cache import make_cache_key
+from core.pdf import PageText, _get_process_pool
+
+# ==========================================
+# 1. OPTIONAL ENGINE (PYTESSERACT + THE TESSERACT BINARY)
+# ==========================================
+# Scanned pages are one embedded image per page: the images are OCR'd directly, no PDF rasterizer needed.
+# Without pytesseract / tesseract installed, scanned pages are simply reported as before.
+MIN_IMAGE_SIDE = 200     # logos, signatures, stamps: not worth a tesseract run
+OCR_PAGES_PER_TASK = 2   # ~1s of OCR per page: small tasks keep every worker busy until the last page
+
+@lru_cache(maxsize=1)
+def ocr_available() -> bool:
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+def ocr_errors() -> tuple:
+    # What a missing / broken tesseract, an unreadable image or a damaged PDF raises. Anything else is a bug and is not swallowed
+    import PyPDF2.errors
+    return OSError, RuntimeError, ValueError, PyPDF2.errors.PyPdfError, PyPDF2.errors.DependencyError
+
+def _peak_rss_mb() -> float:
+    # Worker + its tesseract children (tesseract runs as a subprocess); not available on Windows
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / 1024
+
+# ==========================================
+# 2. PAGE FINGERPRINTS (CACHE KEYS)
+# ==========================================
+def _resolve(value):
+    # /Resources, /XObject and their entries are usually indirect objects in scanner output
+    return value.get_object() if value is not None else {}
+
+def _image_streams(resources, seen: set):
+    # Raw bytes of every image drawn on the page, including images nested in form XObjects
+    xobjects = _resolve(_resolve(resources).get("/XObject"))
+    for name in sorted(xobjects):
+        xobject = _resolve(xobjects[name])
+        if id(xobject) in seen:
+            continue
+        seen.add(id(xobject))
+        if xobject.get("/Subtype") == "/Image":
+            yield xobject.get_data()
+        elif xobject.get("/Subtype") == "/Form":
+            yield from _image_streams(xobject.get("/Resources"), seen)
+
+def page_fingerprints(data: bytes, indexes: list, reader=None) -> dict:
+    # Hash of the page's content + image bytes: the same scan inside another PDF still hits the cache.
+    # A page with no image stream at all is keyed to this file + page, so "draw one image" pages never share a key.
+    if reader is None:
+        import PyPDF2
+        reader = PyPDF2.PdfReader(io.BytesIO(data))
+    file_hash, fingerprints = hashlib.sha256(data).hexdigest(), {}
+    for index in indexes:
+        page, digest = reader.pages[index], hashlib.sha256()
+        contents = page.get_contents()
+        digest.update(contents.get_data() if contents is not None else b"")
+        images = 0
+        for stream in _image_streams(page.get("/Resources"), set()):
+            digest.update(len(stream).to_bytes(8, "big") + stream)
+            images += 1
+        if not images:
+            digest.update(f"{file_hash}:{index}".encode())
+        fingerprints[index] = digest.hexdigest()
+    return fingerprints
+
+# ==========================================
+# 3. OCR WORKERS
+# ==========================================
+def _read_pages(pages, language: str) -> list:
+    # (page index, PyPDF2 page) pairs -> (index, text, seconds, pixels, peak rss MB) rows
+    import pytesseract
+    from PIL import Image
+    rows = []
+    for index, page in pages:
+        started, texts, pixels = time.perf_counter(), [], 0
+        for image in page.images:
+            with Image.open(io.BytesIO(image.data)) as picture:
+                if min(picture.size) < MIN_IMAGE_SIDE:
+                    continue
+                gray = picture.convert("L")
+                pixels += gray.width * gray.height
+                texts.append(pytesseract.image_to_string(gray, lang=language).strip())
+        rows.append((index, "\n".join(t for t in texts if t), time.perf_counter() - started, pixels, _peak_rss_mb()))
+    return rows
+
+def _ocr_range(data: bytes, indexes: list, language: str) -> list:
+    # Runs inside a worker process, like pdf._extract_range; data is a PDF of just these pages, in this order
+    import PyPDF2
+    return _read_pages(zip(indexes, PyPDF2.PdfReader(io.BytesIO(data)).pages), language)
+
+def _pages_pdf(reader, indexes: list) -> bytes:
+    # The pages one task needs (content + still-compressed images), so a task never pickles the whole upload
+    import PyPDF2
+    writer, out = PyPDF2.PdfWriter(), io.BytesIO()
+    for index in indexes:
+        writer.add_page(reader.pages[index])
+    writer.write(out)
+    return out.getvalue()
+
+def ocr_pages(data: bytes, indexes: list, language: str = "eng", cache=None) -> tuple:
+    # -> ({page index: PageText}, stats). Pages already read once (any file) come from `cache`, the rest run on the process pool
+    import PyPDF2
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    keys = {index: make_cache_key("ocr", fingerprint, language) for index, fingerprint in page_fingerprints(data, indexes, reader).items()}
+    pages, todo = {}, []
+    for index in indexes:
+        cached = cache.get(keys[index]) if cache is not None else None
+        if cached is None:
+            todo.append(index)
+        elif cached:
+            pages[index] = PageText(index + 1, cached, 0.0, False, ocr=True)
+
+    started, rows = time.perf_counter(), []
+    if len(todo) == 1:
+        rows = _read_pages([(todo[0], reader.pages[todo[0]])], language)
+    elif todo:
+        pool = _get_process_pool()
+        batches = [todo[i:i + OCR_PAGES_PER_TASK] for i in range(0, len(todo), OCR_PAGES_PER_TASK)]
+        futures = [pool.submit(_ocr_range, _pages_pdf(reader, batch), batch, language) for batch in batches]
+        try:
+            rows = [row for future in futures for row in future.result()]
+        finally:
+            for future in futures:
+                future.cancel()
+    elapsed = time.perf_counter() - started
+
+    for index, text, seconds, _, _ in rows:
+        # Blank results are cached too, so a blank page is not OCR'd again on every upload
+        if cache is not None:
+            cache.set(keys[index], text)
+        if text:
+            pages[index] = PageText(index + 1, text, seconds, False, ocr=True)
+    stats = {
+        "ocr_pages": len(todo),
+        "ocr_cache_hits": len(indexes) - len(todo),
+        "pages_per_s": round(len(todo) / elapsed, 2) if todo and elapsed else None,
+        "image_mb_per_page": round(sum(r[3] for r in rows) / len(rows) / 1024 ** 2, 2) if rows else None,
+        "peak_worker_rss_mb": round(max(r[4] for r in rows), 1) if rows else None,
+    }
+    return pages, stats
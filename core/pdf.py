@@ -0,0 +1,93 @@
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+# ==========================================
+# 1. PAGE RESULT
+# ==========================================
+# Pages with fewer characters than this are treated as scans / images (no usable text layer)
+MIN_TEXT_LAYER_CHARS = 20
+
+class PageText(NamedTuple):
+    number: int          # 1-based page number
+    text: str
+    seconds: float       # time spent extracting this page
+    has_text_layer: bool
+    ocr: bool = False    # text read from the page image (core/ocr.py), not from a text layer
+
+def _page_result(index: int, text: str, seconds: float) -> PageText:
+    text = text or ""
+    return PageText(index + 1, text, seconds, len(text.strip()) >= MIN_TEXT_LAYER_CHARS)
+
+def read_pdf_bytes(source) -> bytes:
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    source.seek(0)
+    return source.read()
+
+# ==========================================
+# 2. EXTRACTION WORKERS
+# ==========================================
+def _extract_range(data: bytes, start: int, stop: int) -> list:
+    # Runs inside a worker process: each worker parses the file once and handles a contiguous page range
+    import PyPDF2
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    pages = []
+    for index in range(start, stop):
+        started = time.perf_counter()
+        text = reader.pages[index].extract_text()
+        pages.append((index, text, time.perf_counter() - started))
+    return pages
+
+_PROCESS_POOL = None
+
+def _get_process_pool(max_workers=None):
+    global _PROCESS_POOL
+    if _PROCESS_POOL is None:
+        # spawn, not fork: the app and server are multithreaded, and a forked child can inherit a lock held by another thread
+        _PROCESS_POOL = ProcessPoolExecutor(max_workers=max_workers or min(os.cpu_count() or 2, 8), mp_context=multiprocessing.get_context("spawn"))
+    return _PROCESS_POOL
+
+# ==========================================
+# 3. STREAMING API (PAGES IN ORDER, AS SOON AS THEY ARE READY)
+# ==========================================
+# Below this many pages, process start-up + re-parsing costs more than it saves
+PARALLEL_MIN_PAGES = 40
+PAGES_PER_TASK = 10
+
+def iter_pdf_pages(source, parallel_min_pages: int = PARALLEL_MIN_PAGES, max_workers=None):
+    # PyPDF2 is loaded on the first upload, not at app start
+    import PyPDF2
+    data = read_pdf_bytes(source)
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    total = len(reader.pages)
+
+    if total < parallel_min_pages:
+        for index, page in enumerate(reader.pages):
+            started = time.perf_counter()
+            text = page.extract_text()
+            yield _page_result(index, text, time.perf_counter() - started)
+        return
+
+    pool = _get_process_pool(max_workers)
+    futures = [pool.submit(_extract_range, data, start, min(start + PAGES_PER_TASK, total))
+               for start in range(0, total, PAGES_PER_TASK)]
+    try:
+        # Results are consumed in page order: engine.stream_pdf_pages hands each page on as soon as it and its predecessors are done
+        for future in futures:
+            for index, text, seconds in future.result():
+                yield _page_result(index, text, seconds)
+    finally:
+        for future in futures:
+            future.cancel()
+
+def join_pages(pages) -> str:
+    return "".join(page.text + "\n" for page in pages if page.text)
@@ -0,0 +1,136 @@
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import NamedTuple
+from core.chunking import clause_spans
+
+# ==========================================
+# 1. RULEBOOK PARSING (SECTIONS + HEURISTICS)
+# ==========================================
+SECTION_HEADING = re.compile(r"^\s*\d+\.\s+(?P<title>[^a-z:]+?)\s*$")
+HEURISTIC_LINE = re.compile(r"^\s*\d+\.\s+(?P<title>[A-Z][A-Z -]+):\s*(?P<body>.+)$")
+
+def parse_rulebook(rules_text: str) -> tuple:
+    # preamble = contract type, global heuristics, interpretation rules (always sent);
+    # sections = numbered rulebook sections + individual global heuristics, keyed by their title
+    preamble, sections, current = [], {}, None
+    for line in rules_text.strip().splitlines():
+        heading = SECTION_HEADING.match(line)
+        if heading:
+            current = heading.group("title")
+            sections[current] = [line]
+        elif current:
+            sections[current].append(line)
+        else:
+            preamble.append(line)
+            heuristic = HEURISTIC_LINE.match(line)
+            if heuristic:
+                sections[heuristic.group("title").strip()] = [line]
+    return "\n".join(preamble), {title: "\n".join(lines) for title, lines in sections.items()}
+
+def _section_lines(section_text: str, marker: str) -> list:
+    return [line.split(marker, 1)[1].strip() for line in section_text.splitlines() if marker in line]
+
+# ==========================================
+# 2. COMPILED MULTI-PATTERN SCANNER
+# ==========================================
+class Candidate(NamedTuple):
+    clause: str
+    start: int
+    end: int
+    sections: tuple   # rulebook section titles this clause triggered
+    matches: tuple    # exact trigger phrases found
+
+class PrescreenResult(NamedTuple):
+    candidates: list
+    sections: list
+    total_clauses: int
+    focused_text: str
+    focused_rules: str
+
+class PrescreenEngine:
+    def __init__(self, rules_text: str, triggers: dict):
+        self.preamble, self.sections = parse_rulebook(rules_text)
+        unknown = [title for title in triggers if title not in self.sections]
+        if unknown:
+            raise ValueError(f"Triggers reference unknown rulebook sections: {unknown}")
+        self.triggers = triggers
+        self._titles = list(triggers)
+        # One alternation, one pass over the contract; the named group tells us which section fired
+        self._pattern = re.compile(
+            "|".join(f"(?P<s{i}>{'|'.join(patterns)})" for i, (_, patterns) in enumerate(triggers.values())),
+            re.IGNORECASE,
+        )
+
+    def scan(self, text: str) -> PrescreenResult:
+        spans = clause_spans(text)
+        starts = [start for start, _ in spans]
+        hits = {}
+        for match in self._pattern.finditer(text):
+            index = bisect_right(starts, match.start()) - 1
+            if index < 0 or match.start() >= spans[index][1]:
+                continue
+            sections, phrases = hits.setdefault(index, ({}, {}))
+            sections[self._titles[int(match.lastgroup[1:])]] = True
+            phrases[match.group(0)] = True
+
+        candidates = [
+            Candidate(text[spans[i][0]:spans[i][1]], spans[i][0], spans[i][1], tuple(sections), tuple(phrases))
+            for i, (sections, phrases) in sorted(hits.items())
+        ]
+        matched = list(dict.fromkeys(title for c in candidates for title in c.sections))
+        return PrescreenResult(
+            candidates=candidates,
+            sections=matched,
+            total_clauses=len(spans),
+            focused_text="\n\n".join(c.clause for c in candidates),
+            focused_rules=self.focused_rules(matched),
+        )
+
+    def focused_rules(self, titles) -> str:
+        # Heuristic lines already live in the preamble; only numbered sections need appending
+        blocks = [self.sections[t] for t in titles if self.sections[t] not in self.preamble]
+        return "\n\n".join([self.preamble] + blocks)
+
+    def findings(self, result: PrescreenResult) -> list:
+        # Offline mode: turn each triggered (clause, section) pair into a RiskItem-shaped dict
+        items = []
+        for candidate in result.candidates:
+            for title in candidate.sections:
+                section = self.sections[title]
+                standard = _section_lines(section, "Standard:")
+                red_flags = _section_lines(section, "RED FLAG:") or [section.split(":", 1)[-1].strip()]
+                items.append({
+                    "clause_text": candidate.clause,
+                    "risk_level": "MEDIUM",
+                    "category": self.triggers[title][0],
+                    "baseline": standard[0] if standard else "Obligations should be specific, time-bound and mutual.",
+                    "deviation": f"Matched {', '.join(repr(m) for m in candidate.matches)} — rulebook ({title.title()}): " + " ".join(red_flags),
+                    "suggestion": "Review this clause against the baseline and ask for it to be narrowed or made mutual.",
+                })
+        return items
+
+# ==========================================
+# 3. ENGINES FOR THE BUILT-IN RULEBOOKS (COMPILED ONCE)
+# ==========================================
+def _builtin_rulebooks() -> dict:
+    from rules.employment import EMPLOYMENT_RULES, EMPLOYMENT_TRIGGERS
+    from rules.rent import RENTAL_RULES, RENTAL_TRIGGERS
+    from rules.freelance import FREELANCE_RULES, FREELANCE_TRIGGERS
+    from rules.nda import NDA_RULES, NDA_TRIGGERS
+    from rules.tos import TOS_RULES, TOS_TRIGGERS
+    from rules.generic import GENERIC_RULES, GENERIC_TRIGGERS
+    return {
+        EMPLOYMENT_RULES: EMPLOYMENT_TRIGGERS,
+        RENTAL_RULES: RENTAL_TRIGGERS,
+        FREELANCE_RULES: FREELANCE_TRIGGERS,
+        NDA_RULES: NDA_TRIGGERS,
+        TOS_RULES: TOS_TRIGGERS,
+        GENERIC_RULES: GENERIC_TRIGGERS,
+    }
+
+@lru_cache(maxsize=None)
+def get_prescreen_engine(rules_text: str):
+    # None for custom rulebooks we have no trigger table for
+    triggers = _builtin_rulebooks().get(rules_text)
+    return PrescreenEngine(rules_text, triggers) if triggers else None
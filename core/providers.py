@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import deque
+from core.hedging import LatencyTracker
+
+# ==========================================
+# 1. PER-PROVIDER HEALTH + CIRCUIT BREAKER
+# ==========================================
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+def is_rate_limit_error(error: Exception) -> bool:
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in ("429", "rate limit", "ratelimit", "resourceexhausted", "resource_exhausted", "quota"))
+
+class ProviderHealth:
+    def __init__(self, name: str, factory, priority: int, failure_threshold: int = 3,
+                 cooldown_seconds: float = 30.0, max_cooldown_seconds: float = 300.0, window: int = 50):
+        self.name = name
+        self.factory = factory
+        self.priority = priority
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown_seconds
+        self.max_cooldown = max_cooldown_seconds
+        self.latency = LatencyTracker()
+        self.state = CLOSED
+        self.cooldown = cooldown_seconds
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.rate_limited = 0
+        self.total_calls = 0
+        self._outcomes = deque(maxlen=window)  # True = success, rolling window for error rate
+        self._probe_started = 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return (self._outcomes.count(False) / len(self._outcomes)) if self._outcomes else 0.0
+
+    def retry_at(self) -> float:
+        return self.opened_at + self.cooldown
+
+    def allows_request(self, now: float) -> bool:
+        if self.state == OPEN and now >= self.retry_at():
+            # Scheduled half-open: let exactly one probe through
+            self.state = HALF_OPEN
+            self._probe_started = 0.0
+        if self.state == HALF_OPEN:
+            # A probe that was ranked but never launched (hedge not needed) must not block the next one forever
+            return now - self._probe_started >= self.cooldown
+        return self.state == CLOSED
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "error_rate": round(self.error_rate, 3),
+            "p50_latency": round(self.latency.percentile(0.5), 3),
+            "rate_limited": self.rate_limited,
+            "consecutive_failures": self.consecutive_failures,
+            "total_calls": self.total_calls,
+            "retry_in": round(max(self.retry_at() - time.time(), 0.0), 1) if self.state == OPEN else 0.0,
+        }
+
+# ==========================================
+# 2. PROCESS-WIDE PROVIDER REGISTRY (HEALTHIEST FIRST)
+# ==========================================
+class ProviderRegistry:
+    def __init__(self):
+        self._providers = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory, priority: int = None, **breaker_options):
+        with self._lock:
+            self._providers[name] = ProviderHealth(name, factory, len(self._providers) if priority is None else priority, **breaker_options)
+
+    def names(self) -> list:
+        return list(self._providers)
+
+    def get(self, name: str) -> ProviderHealth:
+        return self._providers[name]
+
+    def ranked(self) -> list:
+        now = time.time()
+        with self._lock:
+            available = [p for p in self._providers.values() if p.allows_request(now)]
+            if not available and self._providers:
+                # Everything is tripped: probe the provider whose cooldown ends first instead of hard-failing
+                available = [min(self._providers.values(), key=lambda p: p.retry_at())]
+            # Half-open probes go last; then fewer errors, then faster, then configured priority
+            ordered = sorted(available, key=lambda p: (p.state == HALF_OPEN, round(p.error_rate, 1), p.latency.percentile(0.5), p.priority))
+            for p in ordered:
+                if p.state == HALF_OPEN:
+                    p._probe_started = now
+            return [p.name for p in ordered]
+
+    def call(self, name: str, invoke):
+        provider = self._providers[name]
+        started = time.perf_counter()
+        try:
+            result = invoke(provider.factory())
+        except Exception as e:
+            self._record_failure(provider, e)
+            raise
+        self._record_success(provider, time.perf_counter() - started)
+        return result
+
+    def _record_success(self, provider, seconds):
+        with self._lock:
+            provider.latency.record(seconds)
+            provider._outcomes.append(True)
+            provider.total_calls += 1
+            provider.consecutive_failures = 0
+            provider.state, provider.cooldown = CLOSED, provider.base_cooldown
+
+    def _record_failure(self, provider, error):
+        with self._lock:
+            provider._outcomes.append(False)
+            provider.total_calls += 1
+            provider.consecutive_failures += 1
+            rate_limited = is_rate_limit_error(error)
+            if rate_limited:
+                provider.rate_limited += 1
+            if provider.state == HALF_OPEN:
+                # Probe failed: stay open for longer next time
+                provider.state, provider.opened_at = OPEN, time.time()
+                provider.cooldown = min(provider.cooldown * 2, provider.max_cooldown)
+            elif provider.state == CLOSED and (rate_limited or provider.consecutive_failures >= provider.failure_threshold):
+                # A 429 trips immediately; retrying into an exhausted quota only burns latency
+                provider.state, provider.opened_at = OPEN, time.time()
+
+    def health(self) -> dict:
+        with self._lock:
+            return {name: p.snapshot() for name, p in self._providers.items()}
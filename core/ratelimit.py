@@ -0,0 +1,151 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+
+# ==========================================
+# 1. TOKEN BUCKET
+# ==========================================
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0  # refill per second
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # A single request bigger than the whole bucket would never fit; let it through once the bucket is full
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+# ==========================================
+# 2. FAIR QUEUE PER PROVIDER (ROUND-ROBIN ACROSS SESSIONS)
+# ==========================================
+class QueueTimeout(RuntimeError):
+    pass
+
+class ProviderLimiter:
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._waiting = OrderedDict()  # session_id -> deque of tickets, in round-robin order
+        self._tickets = itertools.count()
+        self._cond = threading.Condition()
+        self._wait_times = deque(maxlen=500)
+        self.admitted = 0
+        self.timeouts = 0
+        self.max_depth = 0
+
+    def _buckets_wait(self, tokens: float, now: float) -> float:
+        return max([b.wait_time(amount, now) for b, amount in ((self.requests, 1), (self.tokens, tokens)) if b] or [0.0])
+
+    def _head(self):
+        for session_id, tickets in self._waiting.items():
+            return session_id, tickets[0]
+        return None, None
+
+    def _position(self, session_id, ticket) -> int:
+        # Round-robin order: everyone's 1st request, then everyone's 2nd, ...
+        sessions = list(self._waiting.items())
+        rank = next(i for i, (sid, _) in enumerate(sessions) if sid == session_id)
+        index = list(self._waiting[session_id]).index(ticket)
+        return sum(min(len(q), index) for _, q in sessions) + sum(1 for _, q in sessions[:rank] if len(q) > index) + 1
+
+    def _eta(self, position: int, tokens: float, now: float) -> float:
+        per_request = 60.0 / self.requests.capacity if self.requests else 0.0
+        if self.tokens:
+            per_request = max(per_request, tokens / self.tokens.rate)
+        return self._buckets_wait(tokens, now) + (position - 1) * per_request
+
+    def depth(self) -> int:
+        return sum(len(q) for q in self._waiting.values())
+
+    def acquire(self, session_id: str, tokens: float, on_wait=None, max_wait: float = 120.0):
+        ticket = next(self._tickets)
+        enqueued = time.monotonic()
+        with self._cond:
+            self._waiting.setdefault(session_id, deque()).append(ticket)
+            self.max_depth = max(self.max_depth, self.depth())
+            last_reported = None
+            try:
+                while True:
+                    now = time.monotonic()
+                    head_session, head_ticket = self._head()
+                    wait = self._buckets_wait(tokens, now) if head_ticket == ticket else None
+                    if wait == 0.0:
+                        for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+                            if bucket: bucket.take(amount)
+                        break
+                    if now - enqueued > max_wait:
+                        self.timeouts += 1
+                        raise QueueTimeout("The AI engines are saturated; please try again shortly.")
+                    position = self._position(session_id, ticket)
+                    if on_wait and position != last_reported:
+                        on_wait(position, round(self._eta(position, tokens, now), 1))
+                        last_reported = position
+                    self._cond.wait(timeout=min(wait, 1.0) if wait else 1.0)
+            finally:
+                queue = self._waiting[session_id]
+                queue.remove(ticket)
+                # Served (or gave up): this session goes to the back of the round-robin
+                del self._waiting[session_id]
+                if queue:
+                    self._waiting[session_id] = queue
+                self._cond.notify_all()
+            self.admitted += 1
+            self._wait_times.append(time.monotonic() - enqueued)
+
+    def try_acquire(self, session_id: str, tokens: float) -> bool:
+        # Only when nobody is queued and the quota is there right now (hedges: never worth a wait)
+        with self._cond:
+            if self._waiting or self._buckets_wait(tokens, time.monotonic()) > 0.0:
+                return False
+            for bucket, amount in ((self.requests, 1), (self.tokens, tokens)):
+                if bucket: bucket.take(amount)
+            self.admitted += 1
+            self._wait_times.append(0.0)
+            return True
+
+    def metrics(self) -> dict:
+        with self._cond:
+            waits = sorted(self._wait_times)
+            return {
+                "queue_depth": self.depth(),
+                "max_queue_depth": self.max_depth,
+                "sessions_waiting": len(self._waiting),
+                "admitted": self.admitted,
+                "timeouts": self.timeouts,
+                "avg_wait_seconds": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                "p95_wait_seconds": round(waits[min(int(0.95 * len(waits)), len(waits) - 1)], 3) if waits else 0.0,
+            }
+
+# ==========================================
+# 3. PROCESS-WIDE LIMITER (ALL PROVIDERS)
+# ==========================================
+class LLMRateLimiter:
+    def __init__(self):
+        self._providers = {}
+
+    def configure(self, provider: str, requests_per_minute: float, tokens_per_minute: float):
+        if requests_per_minute or tokens_per_minute:
+            self._providers[provider] = ProviderLimiter(requests_per_minute, tokens_per_minute)
+
+    def acquire(self, provider: str, session_id: str, tokens: float, on_wait=None, max_wait: float = 120.0):
+        limiter = self._providers.get(provider)
+        if limiter is not None:
+            limiter.acquire(session_id or "anonymous", tokens, on_wait, max_wait)
+
+    def try_acquire(self, provider: str, session_id: str, tokens: float) -> bool:
+        limiter = self._providers.get(provider)
+        return limiter is None or limiter.try_acquire(session_id or "anonymous", tokens)
+
+    def metrics(self) -> dict:
+        return {name: limiter.metrics() for name, limiter in self._providers.items()}
@@ -0,0 +1,149 @@
+import json
+import threading
+from difflib import get_close_matches
+from typing import List, NamedTuple
+from pydantic import BaseModel
+from core.models import ContractAnalysis, RiskItem, SafeItem
+from core.streaming import ArrayItemStreamParser
+
+# ==========================================
+# 1. ALLOWED VALUES + WHAT MODELS WRITE INSTEAD
+# ==========================================
+RISK_LEVELS = ("HIGH", "MEDIUM")
+LEVEL_ALIASES = {"CRITICAL": "HIGH", "SEVERE": "HIGH", "MAJOR": "HIGH", "RED": "HIGH",
+                 "MODERATE": "MEDIUM", "MED": "MEDIUM", "MINOR": "MEDIUM", "LOW": "MEDIUM", "AMBER": "MEDIUM"}
+CATEGORIES = ("Financial", "Career", "Privacy", "Legal", "Freedom")
+# Keyword inside an unknown category -> allowed category (first match wins)
+CATEGORY_KEYWORDS = (("financ", "Financial"), ("money", "Financial"), ("payment", "Financial"), ("salary", "Financial"),
+                     ("compensation", "Financial"), ("penalt", "Financial"), ("career", "Career"), ("employ", "Career"),
+                     ("job", "Career"), ("notice", "Career"), ("termination", "Career"), ("privacy", "Privacy"),
+                     ("data", "Privacy"), ("confidential", "Privacy"), ("personal", "Privacy"), ("compet", "Freedom"),
+                     ("freedom", "Freedom"), ("restrict", "Freedom"), ("mobility", "Freedom"))
+DEFAULT_CATEGORY = "Legal"
+# Field names models use when they drift from the schema
+FIELD_ALIASES = {"clause": "clause_text", "quote": "clause_text", "clause_quote": "clause_text", "level": "risk_level",
+                 "severity": "risk_level", "standard": "baseline", "industry_baseline": "baseline", "issue": "deviation",
+                 "why": "deviation", "recommendation": "suggestion", "fix": "suggestion", "advice": "suggestion",
+                 "summary": "clause_summary", "clause_name": "clause_summary", "explanation": "reason"}
+EXPLANATION_FIELDS = ("baseline", "deviation", "suggestion")
+
+class RiskRepairBatch(BaseModel):
+    risks: List[RiskItem]
+
+# ==========================================
+# 2. LOCAL NORMALIZATION (NO LLM CALL)
+# ==========================================
+def raw_payload(message):
+    # The model's answer as a plain dict, even when it did not validate: tool-call args first, then JSON in the text
+    tool_calls = getattr(message, "tool_calls", None) or []
+    if tool_calls and isinstance(tool_calls[0].get("args"), dict):
+        return tool_calls[0]["args"]
+    text = getattr(message, "content", message) if message is not None else ""
+    payload = loads_object(text)
+    if payload is None and isinstance(text, str):
+        # Truncated answer (output token limit): every risk whose closing brace arrived is still usable
+        items = ArrayItemStreamParser("risks").feed(text)
+        payload = {"risks": items} if items else None
+    return payload
+
+def loads_object(text) -> dict:
+    if not isinstance(text, str):
+        return None
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        return None
+    try:
+        value = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+def normalize_level(value) -> str:
+    level = str(value or "").strip().upper().replace(" RISK", "").replace("_RISK", "")
+    if level in RISK_LEVELS:
+        return level
+    return LEVEL_ALIASES.get(level, "HIGH" if "HIGH" in level else "MEDIUM")
+
+def normalize_category(value) -> str:
+    text = str(value or "").strip()
+    for allowed in CATEGORIES:
+        if text.lower() == allowed.lower():
+            return allowed
+    lowered = text.lower()
+    for keyword, allowed in CATEGORY_KEYWORDS:
+        if keyword in lowered:
+            return allowed
+    close = get_close_matches(text.title(), CATEGORIES, n=1, cutoff=0.6)
+    return close[0] if close else DEFAULT_CATEGORY
+
+def _fields(item: dict) -> dict:
+    fields = {}
+    for key, value in item.items():
+        key = FIELD_ALIASES.get(str(key).strip().lower(), str(key).strip().lower())
+        if value is not None and not isinstance(value, (dict, list)):
+            fields.setdefault(key, str(value).strip())
+    return fields
+
+class RepairOutcome(NamedTuple):
+    analysis: ContractAnalysis  # every item that is valid after local fixes
+    broken: list                # risk dicts with a quote but missing explanations -> re-requested
+    normalized: int             # items changed by local fixes
+    dropped: int                # unusable items (no quote / not an object)
+
+class PendingRepair(NamedTuple):
+    outcome: RepairOutcome      # locally repaired answer with broken items still to re-request
+    prompt: str                 # REPAIR_PROMPT for the broken items
+    tokens_saved: int           # full re-run tokens minus the re-request prompt
+
+def repair_analysis(payload: dict) -> RepairOutcome:
+    risks, broken, normalized, dropped = [], [], 0, 0
+    for item in payload.get("risks") or []:
+        fields = _fields(item) if isinstance(item, dict) else {}
+        if not fields.get("clause_text"):
+            dropped += 1
+            continue
+        fixed = dict(fields, risk_level=normalize_level(fields.get("risk_level")), category=normalize_category(fields.get("category")))
+        normalized += any(fixed.get(k) != item.get(k) for k in RiskItem.model_fields)
+        if all(fixed.get(k) for k in EXPLANATION_FIELDS):
+            risks.append(RiskItem(**{k: fixed[k] for k in RiskItem.model_fields}))
+        else:
+            broken.append({k: fixed[k] for k in RiskItem.model_fields if fixed.get(k)})
+    safe_clauses = []
+    for item in payload.get("safe_clauses") or []:
+        fields = _fields(item) if isinstance(item, dict) else {}
+        if fields.get("clause_summary") and fields.get("reason"):
+            safe_clauses.append(SafeItem(clause_summary=fields["clause_summary"], reason=fields["reason"], clause_text=fields.get("clause_text") or ""))
+        else:
+            dropped += 1
+    return RepairOutcome(ContractAnalysis(risks=risks, safe_clauses=safe_clauses), broken, normalized, dropped)
+
+def normalize_analysis(analysis: ContractAnalysis) -> tuple:
+    # Schema-valid answers still get risk_level / category snapped to the allowed values
+    risks, changed = [], 0
+    for risk in analysis.risks:
+        level, category = normalize_level(risk.risk_level), normalize_category(risk.category)
+        if (level, category) != (risk.risk_level, risk.category):
+            risk, changed = risk.model_copy(update={"risk_level": level, "category": category}), changed + 1
+        risks.append(risk)
+    return (ContractAnalysis(risks=risks, safe_clauses=analysis.safe_clauses) if changed else analysis), changed
+
+# ==========================================
+# 3. FAILURE-RATE / SAVINGS COUNTERS
+# ==========================================
+class RepairStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {"answers": 0, "invalid_answers": 0, "repaired_answers": 0, "failed_repairs": 0, "normalized_items": 0,
+                          "rerequested_items": 0, "dropped_items": 0, "tokens_saved": 0}
+
+    def record(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self._counters[name] += amount
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+        stats["invalid_rate"] = round(stats["invalid_answers"] / stats["answers"], 3) if stats["answers"] else 0.0
+        stats["repair_rate"] = round(stats["repaired_answers"] / stats["invalid_answers"], 3) if stats["invalid_answers"] else 0.0
+        return stats
@@ -0,0 +1,74 @@
+from difflib import SequenceMatcher
+from typing import NamedTuple
+from core.chunking import merge_findings, split_into_clauses
+from core.models import ContractAnalysis, VersionDiff
+from core.similarity import clause_key, owning_clause
+
+# ==========================================
+# 1. CLAUSE-LEVEL DIFF AGAINST THE PREVIOUS ROUND
+# ==========================================
+class RevisionPlan(NamedTuple):
+    clauses: list           # every clause of the new version
+    changed: list           # indices (new version) of inserted / rewritten clauses -> LLM
+    removed: int            # clauses of the old version with no counterpart
+    carried: ContractAnalysis  # old findings (risks and safe clauses) whose clause is byte-for-byte unchanged (after normalization)
+    blocks: list            # (old risks, new clause indices) per rewritten / deleted / inserted region
+
+    @property
+    def changed_text(self) -> str:
+        return "\n\n".join(self.clauses[i] for i in self.changed)
+
+def plan_revision(previous_text: str, previous: ContractAnalysis, text: str) -> RevisionPlan:
+    old_clauses, clauses = split_into_clauses(previous_text), split_into_clauses(text)
+    old_owner = {}  # old clause index -> risks quoted from it (None: the quote is in no clause of the old version)
+    for risk in previous.risks:
+        old_owner.setdefault(owning_clause(risk.clause_text, old_clauses), []).append(risk)
+
+    # Diff on clause hashes: cost is one pass over both versions, not one LLM call per clause
+    matcher = SequenceMatcher(None, [clause_key(c) for c in old_clauses], [clause_key(c) for c in clauses], autojunk=False)
+    # A risk that cannot be tied to a clause cannot be tied to an edit either: it stays as reported last round
+    carried, changed, blocks, removed = list(old_owner.get(None, [])), [], [], 0
+    unchanged = set()
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        old_risks = [r for i in range(i1, i2) for r in old_owner.get(i, [])]
+        if tag == "equal":
+            carried.extend(old_risks)
+            unchanged.update(range(i1, i2))
+            continue
+        changed.extend(range(j1, j2))
+        removed += max(0, (i2 - i1) - (j2 - j1))
+        blocks.append((old_risks, list(range(j1, j2))))
+    # Safe clauses of rewritten or deleted clauses are re-checked with the changed text, never carried
+    safe = [s for s in previous.safe_clauses if owning_clause(s.clause_text, old_clauses) in unchanged]
+    return RevisionPlan(clauses, changed, removed, ContractAnalysis(risks=carried, safe_clauses=safe), blocks)
+
+# ==========================================
+# 2. RESOLVED / INTRODUCED / UNCHANGED
+# ==========================================
+def compare_findings(plan: RevisionPlan, fresh: ContractAnalysis) -> tuple:
+    # fresh = LLM findings for plan.changed_text only. Inside a rewritten region, a new risk of the same
+    # category as an old one is the same issue re-worded ("unchanged"), anything else is resolved / introduced.
+    changed = [plan.clauses[i] for i in plan.changed]
+    block_of = {j: b for b, (_, new) in enumerate(plan.blocks) for j in new}
+    by_block = {}
+    for risk in fresh.risks:
+        owner = owning_clause(risk.clause_text, changed)
+        by_block.setdefault(block_of[plan.changed[owner]] if owner is not None else None, []).append(risk)
+
+    resolved, introduced, unchanged = [], [], list(plan.carried.risks)
+    for b, (old_risks, _) in enumerate(plan.blocks):
+        new_risks = by_block.pop(b, [])
+        for old in old_risks:
+            match = next((r for r in new_risks if r.category.strip().lower() == old.category.strip().lower()), None)
+            if match is None:
+                resolved.append(old)
+            else:
+                new_risks.remove(match)
+                unchanged.append(match)
+        introduced.extend(new_risks)
+    introduced.extend(r for risks in by_block.values() for r in risks)
+
+    risks, safe_clauses = merge_findings([plan.carried, fresh])
+    diff = VersionDiff(resolved=resolved, introduced=introduced, unchanged=unchanged, clauses_total=len(plan.clauses),
+                       clauses_reanalyzed=len(plan.changed), clauses_removed=plan.removed)
+    return ContractAnalysis(risks=risks, safe_clauses=safe_clauses), diff
@@ -0,0 +1,200 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pydantic import BaseModel
+from core.models import ContractAnalysis, RiskItem, SafeItem, VersionDiff
+
+# ==========================================
+# 1. COMPACT FORM (ZLIB-COMPRESSED JSON, TYPE TAG)
+# ==========================================
+# A live pydantic ContractAnalysis costs several times its compressed JSON; sessions only hold the bytes
+MODELS = {cls.__name__: cls for cls in (ContractAnalysis, RiskItem, SafeItem, VersionDiff)}
+ENTRY_OVERHEAD = 120  # dict slot + tuple + key strings, so thousands of tiny values still count
+
+def pack(value) -> tuple:
+    if isinstance(value, BaseModel):
+        kind, raw = type(value).__name__, value.model_dump_json()
+    elif isinstance(value, str):
+        kind, raw = "str", value
+    else:
+        kind, raw = "json", json.dumps(value, ensure_ascii=False)
+    return kind, zlib.compress(raw.encode("utf-8"), 6)
+
+def unpack(kind: str, blob: bytes):
+    raw = zlib.decompress(blob).decode("utf-8")
+    if kind == "str":
+        return raw
+    if kind == "json":
+        return json.loads(raw)
+    return MODELS[kind].model_validate_json(raw)
+
+# ==========================================
+# 2. OPTIONAL SPILL TIER (SQLITE; ANYTHING WITH THE SAME METHODS PLUGS IN)
+# ==========================================
+class SqliteSpill:
+    def __init__(self, db_path: str = ".trueclause_cache/sessions.sqlite3"):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS session_values (
+            session_id TEXT NOT NULL, key TEXT NOT NULL, kind TEXT NOT NULL, blob BLOB NOT NULL, touched REAL NOT NULL,
+            PRIMARY KEY (session_id, key))""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_session_values_touched ON session_values(touched)")
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    def put(self, session_id: str, key: str, kind: str, blob: bytes):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO session_values VALUES (?, ?, ?, ?, ?)", (session_id, key, kind, blob, time.time()))
+            self._db.commit()
+
+    def take(self, session_id: str, key: str):
+        # Read + delete: a value lives in exactly one tier
+        with self._lock:
+            row = self._db.execute("SELECT kind, blob FROM session_values WHERE session_id = ? AND key = ?", (session_id, key)).fetchone()
+            if row is not None:
+                self._db.execute("DELETE FROM session_values WHERE session_id = ? AND key = ?", (session_id, key))
+                self._db.commit()
+            return row
+
+    def delete(self, session_id: str, keys=None):
+        with self._lock:
+            if keys is None:
+                self._db.execute("DELETE FROM session_values WHERE session_id = ?", (session_id,))
+            else:
+                self._db.executemany("DELETE FROM session_values WHERE session_id = ? AND key = ?", [(session_id, k) for k in keys])
+            self._db.commit()
+
+    def expire(self, before: float) -> int:
+        with self._lock:
+            removed = self._db.execute("DELETE FROM session_values WHERE touched < ?", (before,)).rowcount
+            self._db.commit()
+            return max(removed, 0)
+
+    def usage(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(LENGTH(blob)), 0) FROM session_values").fetchone()[0]
+
+# ==========================================
+# 3. BOUNDED SESSION STORE (LRU + TTL, PER-SESSION AND GLOBAL CAPS)
+# ==========================================
+class SessionStore:
+    # Values evicted by either cap go to the spill tier when there is one, otherwise they are dropped
+    # (the UI re-runs the analysis, which the result cache answers instantly)
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, session_max_bytes: int = 4 * 1024 * 1024,
+                 ttl_seconds: int = 3600, spill=None):
+        self.max_bytes = max_bytes
+        self.session_max_bytes = session_max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.spill = spill
+        self._entries = OrderedDict()  # (session_id, key) -> (kind, blob); least recently used first
+        self._session_bytes = {}
+        self._last_seen = {}
+        self._bytes = 0
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "spill_hits": 0, "misses": 0, "writes": 0, "evictions": 0, "spills": 0, "expired_sessions": 0}
+
+    def get(self, session_id: str, key: str, default=None):
+        with self._lock:
+            self._touch(session_id)
+            entry = self._entries.get((session_id, key))
+            if entry is not None:
+                self._entries.move_to_end((session_id, key))
+                self._counters["hits"] += 1
+                return unpack(*entry)
+            row = self.spill.take(session_id, key) if self.spill is not None else None
+            if row is None:
+                self._counters["misses"] += 1
+                return default
+            self._counters["spill_hits"] += 1
+            self._insert(session_id, key, row[0], row[1])
+            return unpack(*row)
+
+    def set(self, session_id: str, key: str, value):
+        kind, blob = pack(value)
+        with self._lock:
+            self._touch(session_id)
+            self._remove(session_id, key)
+            if self.spill is not None:
+                self.spill.delete(session_id, [key])
+            self._insert(session_id, key, kind, blob)
+            self._counters["writes"] += 1
+
+    def delete(self, session_id: str, *keys):
+        with self._lock:
+            for key in keys:
+                self._remove(session_id, key)
+            if self.spill is not None:
+                self.spill.delete(session_id, list(keys))
+
+    def drop_session(self, session_id: str):
+        with self._lock:
+            self._drop(session_id)
+
+    def _touch(self, session_id: str):
+        now = time.time()
+        self._last_seen[session_id] = now
+        if now >= self._next_sweep:
+            # Idle sessions go away entirely (Streamlit never says when a tab was closed)
+            self._next_sweep = now + min(60.0, self.ttl_seconds / 4)
+            for idle in [s for s, seen in self._last_seen.items() if now - seen > self.ttl_seconds]:
+                self._drop(idle)
+                self._counters["expired_sessions"] += 1
+            if self.spill is not None:
+                self.spill.expire(now - self.ttl_seconds)
+
+    def _insert(self, session_id: str, key: str, kind: str, blob: bytes):
+        self._entries[(session_id, key)] = (kind, blob)
+        size = len(blob) + ENTRY_OVERHEAD
+        self._session_bytes[session_id] = self._session_bytes.get(session_id, 0) + size
+        self._bytes += size
+        # Per-session cap first (one heavy tab can't push everyone else out), then the global cap
+        if self._session_bytes[session_id] > self.session_max_bytes:
+            for victim in [k for k in self._entries if k[0] == session_id and k != (session_id, key)]:
+                if self._session_bytes[session_id] <= self.session_max_bytes:
+                    break
+                self._evict(victim)
+        for victim in list(self._entries):
+            if self._bytes <= self.max_bytes:
+                break
+            if victim != (session_id, key):
+                self._evict(victim)
+
+    def _evict(self, entry_key: tuple):
+        kind, blob = self._entries[entry_key]
+        self._remove(*entry_key)
+        self._counters["evictions"] += 1
+        if self.spill is not None:
+            self.spill.put(entry_key[0], entry_key[1], kind, blob)
+            self._counters["spills"] += 1
+
+    def _remove(self, session_id: str, key: str):
+        entry = self._entries.pop((session_id, key), None)
+        if entry is not None:
+            size = len(entry[1]) + ENTRY_OVERHEAD
+            self._bytes -= size
+            self._session_bytes[session_id] -= size
+            if not self._session_bytes[session_id]:
+                del self._session_bytes[session_id]
+
+    def _drop(self, session_id: str):
+        for entry_key in [k for k in self._entries if k[0] == session_id]:
+            self._remove(*entry_key)
+        self._last_seen.pop(session_id, None)
+        if self.spill is not None:
+            self.spill.delete(session_id)
+
+    def stats(self, top: int = 10) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update(memory_bytes=self._bytes, max_bytes=self.max_bytes, sessions=len(self._last_seen), entries=len(self._entries),
+                         disk_bytes=self.spill.usage() if self.spill is not None else 0)
+            heaviest = sorted(self._session_bytes.items(), key=lambda item: item[1], reverse=True)[:top]
+            stats["max_session_bytes"] = max(self._session_bytes.values(), default=0)
+        stats["largest_sessions"] = [{"session": s[:8], "memory_bytes": b} for s, b in heaviest]
+        return stats
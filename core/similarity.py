@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+from core.cache import normalize_text
+from core.chunking import clause_spans, split_into_clauses
+from core.models import ContractAnalysis, RiskItem, SafeItem
+
+# ==========================================
+# 1. MINHASH SIGNATURES (NUMPY, LOADED ON FIRST USE)
+# ==========================================
+# 128 permutations in 16 LSH bands of 8 rows: contracts above ~0.7 Jaccard almost always share a band,
+# unrelated ones (< 0.4) practically never do. Exact similarity is then read off the stored signatures.
+NUM_PERM = 128
+BANDS = 16
+SHINGLE_WORDS = 5
+_PRIME = (1 << 31) - 1
+_WORD = re.compile(r"\w+")
+_PERMUTATIONS = None
+SCHEMA_VERSION = 3
+EVICT_BATCH = 50
+
+def _permutations():
+    global _PERMUTATIONS
+    if _PERMUTATIONS is None:
+        import numpy as np
+        rng = np.random.default_rng(20240601)  # fixed: signatures must stay comparable across restarts
+        _PERMUTATIONS = (rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64), rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64))
+    return _PERMUTATIONS
+
+def clause_key(clause: str) -> str:
+    return hashlib.sha256(normalize_text(clause).lower().encode("utf-8")).hexdigest()[:32]
+
+def minhash_signature(text: str):
+    import numpy as np
+    words = _WORD.findall(text.lower())
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(max(len(words) - SHINGLE_WORDS + 1, 1))}
+    hashes = np.fromiter((int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingles),
+                         dtype=np.uint64, count=len(shingles))
+    a, b = _permutations()
+    # (a*h + b) mod p per permutation, min over shingles; a, h < 2^32 so the product fits in uint64
+    return ((a[:, None] * hashes[None, :] + b[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+def _band_keys(namespace: str, signature) -> list:
+    rows = NUM_PERM // BANDS
+    keys = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(namespace.encode("utf-8") + bytes([band]) + signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+# ==========================================
+# 2. REUSE PLAN FOR A NEW CONTRACT
+# ==========================================
+class ReusePlan(NamedTuple):
+    similarity: float          # estimated Jaccard vs the closest stored contract (0.0 = no neighbour)
+    clauses: list              # every clause of the new contract
+    changed: list              # indices of clauses that must go to the LLM
+    reused: ContractAnalysis   # findings carried over from unchanged clauses
+
+    @property
+    def changed_text(self) -> str:
+        return "\n\n".join(self.clauses[i] for i in self.changed)
+
+# ==========================================
+# 3. CLAUSE-LEVEL NEAR-DUPLICATE INDEX (SQLITE, LSH BUCKETS)
+# ==========================================
+class NearDuplicateIndex:
+    # namespace = rulebook + language + models: findings are only reused under the same analysis settings.
+    # A copy of a stored contract is not stored again (its neighbour absorbs the new clause keys instead), so a template
+    # analyzed 10,000 times stays one row per bucket. Contracts unused for retention_days are dropped; max_contracts = 0
+    # keeps every other one. Lookups, inserts and evictions only touch indexed rows of the contracts involved, so their
+    # cost does not grow with the size of the index; the limit is the disk (roughly 300 bytes per stored clause).
+    def __init__(self, db_path: str = ".trueclause_cache/similarity.sqlite3", threshold: float = 0.9, max_candidates: int = 8,
+                 max_contracts: int = 0, retention_days: float = 180):
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self.max_contracts = max_contracts
+        self.retention_seconds = retention_days * 86400
+        self._next_expiry = 0.0
+        self._lock = threading.Lock()
+        self._counters = {"lookups": 0, "near_duplicates": 0, "clauses_reused": 0, "clauses_sent": 0, "stored": 0,
+                          "merged": 0, "evicted": 0}
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # Only a cache: an index written by an older layout is dropped, not migrated
+            self._db.executescript("DROP TABLE IF EXISTS contracts; DROP TABLE IF EXISTS lsh; DROP TABLE IF EXISTS clause_findings; "
+                                   "DROP TABLE IF EXISTS contract_clauses;")
+        self._db.executescript(f"""
+            CREATE TABLE IF NOT EXISTS contracts (
+                id INTEGER PRIMARY KEY, namespace TEXT NOT NULL, signature BLOB NOT NULL,
+                clause_keys TEXT NOT NULL, created_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS lsh (bucket INTEGER NOT NULL, contract_id INTEGER NOT NULL);
+            CREATE INDEX IF NOT EXISTS idx_lsh_bucket ON lsh(bucket);
+            CREATE INDEX IF NOT EXISTS idx_lsh_contract ON lsh(contract_id);
+            CREATE INDEX IF NOT EXISTS idx_contracts_created ON contracts(created_at);
+            CREATE TABLE IF NOT EXISTS clause_findings (
+                namespace TEXT NOT NULL, clause_key TEXT NOT NULL, risks TEXT NOT NULL, safe_clauses TEXT NOT NULL,
+                PRIMARY KEY (namespace, clause_key));
+            -- Which contracts point at which clause findings: eviction deletes only findings nothing else references
+            CREATE TABLE IF NOT EXISTS contract_clauses (contract_id INTEGER NOT NULL, namespace TEXT NOT NULL, clause_key TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS idx_contract_clauses_contract ON contract_clauses(contract_id);
+            CREATE INDEX IF NOT EXISTS idx_contract_clauses_key ON contract_clauses(namespace, clause_key);
+            PRAGMA user_version = {SCHEMA_VERSION};
+        """)
+        self._db.commit()
+
+    def _nearest(self, namespace: str, signature):
+        import numpy as np
+        buckets = _band_keys(namespace, signature)
+        rows = self._db.execute(
+            f"SELECT contract_id, COUNT(*) AS hits FROM lsh WHERE bucket IN ({','.join('?' * len(buckets))}) "
+            "GROUP BY contract_id ORDER BY hits DESC LIMIT ?", (*buckets, self.max_candidates)).fetchall()
+        best = (0.0, None)
+        for contract_id, _ in rows:
+            row = self._db.execute("SELECT signature, clause_keys, id FROM contracts WHERE id = ?", (contract_id,)).fetchone()
+            if row is None:
+                continue
+            similarity = float(np.mean(np.frombuffer(row[0], dtype=np.uint32) == signature))
+            if similarity > best[0]:
+                best = (similarity, row)
+        return best
+
+    def plan(self, namespace: str, text: str) -> ReusePlan:
+        clauses = split_into_clauses(text)
+        signature = minhash_signature(text)
+        with self._lock:
+            self._counters["lookups"] += 1
+            similarity, row = self._nearest(namespace, signature)
+            if row is None or similarity < self.threshold:
+                self._counters["clauses_sent"] += len(clauses)
+                return ReusePlan(similarity, clauses, list(range(len(clauses))), ContractAnalysis(risks=[], safe_clauses=[]))
+
+            neighbour_keys = set(json.loads(row[1]))
+            keys = [clause_key(c) for c in clauses]
+            wanted = sorted({k for k in keys if k in neighbour_keys})
+            stored = {key: (risks, safe) for key, risks, safe in self._db.execute(
+                f"SELECT clause_key, risks, safe_clauses FROM clause_findings WHERE namespace = ? AND clause_key IN ({','.join('?' * len(wanted))})",
+                (namespace, *wanted))} if wanted else {}
+            changed = [i for i, k in enumerate(keys) if k not in stored]
+            # Risks and safe clauses both come only from clauses that are unchanged in this contract
+            unchanged = list(dict.fromkeys(k for k in keys if k in stored))
+            risks = [RiskItem(**r) for k in unchanged for r in json.loads(stored[k][0])]
+            safe = [SafeItem(**s) for k in unchanged for s in json.loads(stored[k][1])]
+            self._counters["near_duplicates"] += 1
+            self._counters["clauses_reused"] += len(clauses) - len(changed)
+            self._counters["clauses_sent"] += len(changed)
+        return ReusePlan(similarity, clauses, changed, ContractAnalysis(risks=risks, safe_clauses=safe))
+
+    def add(self, namespace: str, text: str, analysis: ContractAnalysis, clauses: list = None):
+        clauses = clauses if clauses is not None else split_into_clauses(text)
+        if not clauses:
+            return
+        keys = [clause_key(c) for c in clauses]
+        per_clause = {k: ([], []) for k in keys}
+        unowned = []
+        for slot, items in ((0, analysis.risks), (1, analysis.safe_clauses)):
+            for item in items:
+                owner = owning_clause(item.clause_text, clauses)
+                if owner is None:
+                    unowned.append(item.clause_text)
+                else:
+                    per_clause[keys[owner]][slot].append(item.model_dump())
+        # A quote no clause contains is not filed under a guessed clause; the clauses it may have come from are
+        # left out of the index instead, so they are sent to the LLM again rather than reused as "no findings"
+        for key in _touched_clauses(text, clauses, keys, unowned):
+            per_clause.pop(key, None)
+        signature = minhash_signature(text)
+        now = time.time()
+        with self._lock:
+            similarity, row = self._nearest(namespace, signature)
+            if row is not None and similarity >= self.threshold:
+                # Template copy: the neighbour already answers lookups for it; it takes this copy's clause keys (newest first,
+                # capped so one-off lines like "Reference No. 123" don't pile up) and stays fresh
+                merged = list(dict.fromkeys(keys + json.loads(row[1])))[:2 * len(keys)]
+                self._db.execute("UPDATE contracts SET clause_keys = ?, created_at = ? WHERE id = ?", (json.dumps(merged), now, row[2]))
+                self._db.execute("DELETE FROM contract_clauses WHERE contract_id = ?", (row[2],))
+                self._db.executemany("INSERT INTO contract_clauses (contract_id, namespace, clause_key) VALUES (?, ?, ?)",
+                                     [(row[2], namespace, k) for k in merged])
+                self._counters["merged"] += 1
+            else:
+                cursor = self._db.execute(
+                    "INSERT INTO contracts (namespace, signature, clause_keys, created_at) VALUES (?, ?, ?, ?)",
+                    (namespace, signature.tobytes(), json.dumps(keys), now))
+                self._db.executemany("INSERT INTO lsh (bucket, contract_id) VALUES (?, ?)",
+                                     [(bucket, cursor.lastrowid) for bucket in _band_keys(namespace, signature)])
+                self._db.executemany("INSERT INTO contract_clauses (contract_id, namespace, clause_key) VALUES (?, ?, ?)",
+                                     [(cursor.lastrowid, namespace, k) for k in dict.fromkeys(keys)])
+                self._counters["stored"] += 1
+            self._db.executemany("INSERT OR REPLACE INTO clause_findings (namespace, clause_key, risks, safe_clauses) VALUES (?, ?, ?, ?)",
+                                 [(namespace, k, json.dumps(risks, ensure_ascii=False), json.dumps(safe, ensure_ascii=False))
+                                  for k, (risks, safe) in per_clause.items()])
+            self._evict(now)
+            self._db.commit()
+
+    def _evict(self, now: float):
+        # Expiry is checked hourly and removes at most EVICT_BATCH contracts per insert (a backlog is worked off on the next
+        # inserts), so no single add stalls on a large delete; the optional cap trims the least recently matched contracts
+        expired = []
+        if now >= self._next_expiry:
+            expired = [r[0] for r in self._db.execute("SELECT id FROM contracts WHERE created_at < ? ORDER BY created_at LIMIT ?",
+                                                      (now - self.retention_seconds, EVICT_BATCH))]
+            self._next_expiry = now if len(expired) == EVICT_BATCH else now + 3600
+        if self.max_contracts:
+            over = self._db.execute("SELECT COUNT(*) FROM contracts").fetchone()[0] - len(expired) - self.max_contracts
+            if over > 0:
+                expired += [r[0] for r in self._db.execute("SELECT id FROM contracts WHERE created_at >= ? ORDER BY created_at LIMIT ?",
+                                                           (now - self.retention_seconds, min(over, EVICT_BATCH)))]
+        if not expired:
+            return
+        marks = ",".join("?" * len(expired))
+        keys = self._db.execute(f"SELECT DISTINCT namespace, clause_key FROM contract_clauses WHERE contract_id IN ({marks})", expired).fetchall()
+        for table, column in (("lsh", "contract_id"), ("contract_clauses", "contract_id"), ("contracts", "id")):
+            self._db.execute(f"DELETE FROM {table} WHERE {column} IN ({marks})", expired)
+        # Clause findings no remaining contract points at can never be reused
+        self._db.executemany("DELETE FROM clause_findings WHERE namespace = ? AND clause_key = ? AND NOT EXISTS "
+                             "(SELECT 1 FROM contract_clauses WHERE namespace = ? AND clause_key = ?)", [(n, k, n, k) for n, k in keys])
+        self._counters["evicted"] += len(expired)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["contracts"] = self._db.execute("SELECT COUNT(*) FROM contracts").fetchone()[0]
+        sent = stats["clauses_reused"] + stats["clauses_sent"]
+        stats["clause_reuse_rate"] = round(stats["clauses_reused"] / sent, 3) if sent else 0.0
+        return stats
+
+def owning_clause(quote: str, clauses: list):
+    # Index of the clause containing the quote (after normalization), None when no clause does
+    needle = normalize_text(quote).lower()
+    if not needle:
+        return None
+    return next((i for i, clause in enumerate(clauses) if needle in normalize_text(clause).lower()), None)
+
+def _touched_clauses(text: str, clauses: list, keys: list, quotes: list) -> set:
+    # Clause keys an (approximately) anchored quote overlaps; quotes that cannot be anchored at all touch nothing
+    quotes = [q for q in quotes if q and q.strip()]
+    if not quotes:
+        return set()
+    from core.anchoring import ClauseAnchorIndex
+    index, spans = ClauseAnchorIndex(text), clause_spans(text)
+    if len(spans) != len(clauses):
+        return set(keys)
+    touched = set()
+    for quote in quotes:
+        anchor = index.locate(quote)
+        if anchor.start >= 0:
+            touched.update(keys[i] for i, (start, end) in enumerate(spans) if start < anchor.end and anchor.start < end)
+    return touched
@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+
+# ==========================================
+# 1. INCREMENTAL JSON: COMPLETE ITEMS OF ONE ARRAY
+# ==========================================
+class ArrayItemStreamParser:
+    # Fed the model's raw token stream; returns each object of the top-level `field` array
+    # as soon as its closing brace arrives. Code fences / prose around the JSON are ignored.
+    def __init__(self, field: str = "risks"):
+        self.field = field
+        self.text = ""
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_key = None
+        self._array_depth = None
+        self._item_start = None
+
+    def feed(self, chunk: str) -> list:
+        self.text += chunk
+        items = []
+        for i in range(self._pos, len(self.text)):
+            ch = self.text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._last_key = self.text[self._string_start + 1:i]
+            elif ch == '"':
+                self._in_string, self._string_start = True, i
+            elif ch in "{[":
+                if ch == "[" and self._stack == ["{"] and self._last_key == self.field:
+                    self._array_depth = 2
+                self._stack.append(ch)
+                if ch == "{" and self._array_depth and len(self._stack) == self._array_depth + 1:
+                    self._item_start = i
+            elif ch in "}]" and self._stack:
+                if ch == "}" and self._item_start is not None and len(self._stack) == self._array_depth + 1:
+                    try:
+                        items.append(json.loads(self.text[self._item_start:i + 1]))
+                    except ValueError:
+                        pass
+                    self._item_start = None
+                self._stack.pop()
+                if ch == "]" and self._array_depth and len(self._stack) < self._array_depth:
+                    self._array_depth = None
+        self._pos = len(self.text)
+        return items
+
+def parse_streamed_json(text: str, schema):
+    # Same pydantic validation as the structured-output path; None (= invalid answer) on failure
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        return None
+    try:
+        return schema.model_validate_json(text[start:end + 1])
+    except Exception:
+        return None
+
+def chunk_text(chunk) -> str:
+    # Gemini may deliver content as a list of parts instead of a plain string
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+
+# ==========================================
+# 2. RELAY: ONE PROVIDER PER SECTION REACHES THE CALLER
+# ==========================================
+class RiskStreamRelay:
+    # With hedging two engines may stream the same section at once. The first one to produce
+    # a risk owns that section's stream; if a different engine ends up winning, the section is
+    # reset and re-sent from the winner's validated answer.
+    def __init__(self, emit, on_first_risk=None):
+        self.emit = emit
+        self.on_first_risk = on_first_risk
+        self.started = time.perf_counter()
+        self.first_risk_seconds = None
+        self._owners = {}
+        self._lock = threading.Lock()
+
+    def _send(self, section: int, provider: str, risk):
+        if self.first_risk_seconds is None:
+            self.first_risk_seconds = time.perf_counter() - self.started
+            self.emit("first_risk", {"seconds": round(self.first_risk_seconds, 3), "provider": provider})
+            if self.on_first_risk:
+                self.on_first_risk(self.first_risk_seconds)
+        self.emit("risk", {"section": section, "provider": provider, "risk": risk.model_dump()})
+
+    def risk(self, section: int, provider: str, risk):
+        with self._lock:
+            if self._owners.setdefault(section, provider) == provider:
+                self._send(section, provider, risk)
+
+    def finish(self, section: int, provider: str, result):
+        with self._lock:
+            owner = self._owners.get(section)
+            if owner == provider:
+                return
+            if owner is not None:
+                self.emit("risk_reset", {"section": section})
+            self._owners[section] = provider
+            for risk in result.risks:
+                self._send(section, provider, risk)
+
+class TextStreamRelay:
+    # Same ownership rule for free text (email drafts): the first engine to write owns the stream,
+    # a different winner resets it and re-sends its whole answer in one delta
+    def __init__(self, emit):
+        self.emit = emit
+        self._owner = None
+        self._lock = threading.Lock()
+
+    def delta(self, provider: str, text: str):
+        if not text:
+            return
+        with self._lock:
+            if self._owner is None:
+                self._owner = provider
+            if self._owner == provider:
+                self.emit("text_delta", {"provider": provider, "text": text})
+
+    def finish(self, provider: str, content: str):
+        with self._lock:
+            if self._owner == provider:
+                return
+            if self._owner is not None:
+                self.emit("text_reset", {})
+            self._owner = provider
+            self.emit("text_delta", {"provider": provider, "text": content})
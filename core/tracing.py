@@ -0,0 +1,208 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+# ==========================================
+# 1. SPANS (ONE TRACE PER ANALYSIS / EMAIL / UPLOAD)
+# ==========================================
+# Worker threads don't inherit context variables: hand them contextvars.copy_context().run
+# so their spans hang under the caller's span.
+_current_span = contextvars.ContextVar("trueclause_span", default=None)
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "attrs", "status", "error")
+
+    def __init__(self, name: str, parent, attrs: dict):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(8).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self.attrs = attrs
+        self.status = "ok"
+        self.error = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+class _NoopSpan:
+    def set(self, **attrs):
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+# ==========================================
+# 2. METRICS AGGREGATED FROM FINISHED SPANS
+# ==========================================
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_ATTRS = ("input_tokens", "output_tokens", "cached_tokens")
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+def _labels(pairs) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+class SpanMetrics:
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}  # (span, provider, status) -> [bucket counts..., sum, count]
+        self._counters = {}    # (metric, labels tuple) -> value
+        self._lock = threading.Lock()
+
+    def _count(self, metric: str, labels: tuple, amount: float = 1):
+        key = (metric, labels)
+        self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, span: Span, seconds: float):
+        provider = span.attrs.get("provider", "")
+        with self._lock:
+            row = self._histograms.setdefault((span.name, provider, span.status), [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    row[i] += 1
+            row[-2] += seconds
+            row[-1] += 1
+            for attr in TOKEN_ATTRS:
+                if span.attrs.get(attr):
+                    self._count("trueclause_tokens_total", (("provider", provider), ("kind", attr[:-len("_tokens")])), span.attrs[attr])
+            if "cache_hit" in span.attrs:
+                self._count("trueclause_cache_lookups_total", (("stage", span.name), ("result", "hit" if span.attrs["cache_hit"] else "miss")))
+            if "reason" in span.attrs:
+                self._count("trueclause_provider_attempts_total", (("provider", provider), ("reason", span.attrs["reason"]), ("status", span.status)))
+
+    def prometheus(self) -> list:
+        with self._lock:
+            histograms, counters = dict(self._histograms), dict(self._counters)
+        lines = ["# HELP trueclause_span_duration_seconds Time spent per pipeline stage.",
+                 "# TYPE trueclause_span_duration_seconds histogram"]
+        for (name, provider, status), row in sorted(histograms.items()):
+            base = (("span", name), ("provider", provider), ("status", status))
+            for bound, count in zip(self.buckets, row):
+                lines.append(f"trueclause_span_duration_seconds_bucket{_labels(base + (('le', bound),))} {count}")
+            lines.append(f"trueclause_span_duration_seconds_bucket{_labels(base + (('le', '+Inf'),))} {row[-1]}")
+            lines.append(f"trueclause_span_duration_seconds_sum{_labels(base)} {row[-2]:.6f}")
+            lines.append(f"trueclause_span_duration_seconds_count{_labels(base)} {row[-1]}")
+        typed = set()
+        for (metric, labels), value in sorted(counters.items()):
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{_labels(labels)} {value}")
+        return lines
+
+def gauge_lines(name: str, help_text: str, samples) -> list:
+    # samples: iterable of (labels tuple, value)
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    lines.extend(f"{name}{_labels(labels) if labels else ''} {value}" for labels, value in samples)
+    return lines
+
+# ==========================================
+# 3. TRACER (JSONL FILE + METRICS)
+# ==========================================
+class Tracer:
+    def __init__(self, path: str = ".trueclause_cache/traces.jsonl", max_bytes: int = 20 * 1024 * 1024,
+                 backups: int = 3, enabled: bool = True):
+        self.enabled = enabled
+        self.metrics = SpanMetrics()
+        self._handler = None
+        if enabled and path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            # RotatingFileHandler does the size-based rotation and serializes writers with its own lock
+            self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+            self._handler.setFormatter(logging.Formatter("%(message)s"))
+
+    @staticmethod
+    def current():
+        return _current_span.get()
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+        span = Span(name, _current_span.get(), attrs)
+        token = _current_span.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.status, span.error = "error", f"{type(e).__name__}: {str(e)[:200]}"
+            raise
+        finally:
+            _current_span.reset(token)
+            self._finish(span, time.perf_counter() - started)
+
+    def annotate(self, **attrs):
+        span = _current_span.get()
+        if span is not None:
+            span.set(**attrs)
+
+    def record(self, name: str, seconds: float, **attrs):
+        # Child span measured elsewhere (e.g. parsing time taken from LLM callback timestamps)
+        if not self.enabled:
+            return
+        span = Span(name, _current_span.get(), attrs)
+        span.start -= seconds
+        self._finish(span, seconds)
+
+    def _finish(self, span: Span, seconds: float):
+        self.metrics.observe(span, seconds)
+        if self._handler is not None:
+            entry = {"trace_id": span.trace_id, "span_id": span.span_id, "parent_id": span.parent_id, "name": span.name,
+                     "start": round(span.start, 6), "duration_ms": round(seconds * 1000, 3), "status": span.status}
+            if span.error:
+                entry["error"] = span.error
+            entry.update(span.attrs)
+            self._handler.handle(logging.makeLogRecord({"msg": json.dumps(entry, ensure_ascii=False, default=str)}))
+
+# ==========================================
+# 4. LLM TIMING CALLBACK (SPLITS MODEL TIME FROM OUTPUT PARSING)
+# ==========================================
+_llm_end_recorder_class = None
+
+def llm_end_recorder():
+    # Built on first use: langchain_core is a lazy import (see tools/import_report.py)
+    global _llm_end_recorder_class
+    if _llm_end_recorder_class is None:
+        from langchain_core.callbacks import BaseCallbackHandler
+
+        class LLMEndRecorder(BaseCallbackHandler):
+            def __init__(self):
+                self.llm_end = None
+
+            def on_llm_end(self, response, **kwargs):
+                self.llm_end = time.perf_counter()
+
+        _llm_end_recorder_class = LLMEndRecorder
+    return _llm_end_recorder_class()
+
+# ==========================================
+# 5. STANDALONE /metrics ENDPOINT (FOR THE STREAMLIT PROCESS)
+# ==========================================
+def serve_metrics(host: str, port: int, render):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            data = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="trueclause-metrics").start()
+    return server
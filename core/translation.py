@@ -0,0 +1,40 @@
+from typing import List
+from pydantic import BaseModel
+from core.models import RiskItem, SafeItem
+
+# ==========================================
+# 1. WHAT GETS TRANSLATED
+# ==========================================
+# Detection always runs in one language; the UI language only changes these explanation fields.
+# clause_text stays a verbatim quote, risk_level / category stay machine values.
+CANONICAL_LANGUAGE = "English"
+EXPLANATORY_FIELDS = {RiskItem: ("baseline", "deviation", "suggestion"), SafeItem: ("clause_summary", "reason")}
+
+class TranslatedEntry(BaseModel):
+    id: int
+    baseline: str = ""
+    deviation: str = ""
+    suggestion: str = ""
+    clause_summary: str = ""
+    reason: str = ""
+
+class TranslationBatch(BaseModel):
+    entries: List[TranslatedEntry]
+
+def explanatory_fields(item) -> dict:
+    return {field: getattr(item, field) for field in EXPLANATORY_FIELDS[type(item)]}
+
+# ==========================================
+# 2. REQUEST + RESULT
+# ==========================================
+def translation_entries(items: list) -> list:
+    # Numbered so the answer can be matched back without trusting the model to keep the order
+    return [{"id": i, **explanatory_fields(item)} for i, item in enumerate(items)]
+
+def translated_fields(item, entry: TranslatedEntry) -> dict:
+    # All fields or nothing: a half-translated card reads worse than an untranslated one
+    fields = {field: getattr(entry, field).strip() for field in EXPLANATORY_FIELDS[type(item)]}
+    return fields if all(fields.values()) else None
+
+def apply_fields(item, fields: dict):
+    return item.model_copy(update=fields) if fields else item
@@ -0,0 +1,16 @@
+from rules.employment import EMPLOYMENT_RULES
+from rules.rent import RENTAL_RULES
+from rules.freelance import FREELANCE_RULES
+from rules.nda import NDA_RULES
+from rules.tos import TOS_RULES
+from rules.generic import GENERIC_RULES
+
+# Short keys used by the headless entry points (bulk CLI, HTTP API)
+RULEBOOKS = {
+    "employment": EMPLOYMENT_RULES,
+    "rent": RENTAL_RULES,
+    "freelance": FREELANCE_RULES,
+    "nda": NDA_RULES,
+    "tos": TOS_RULES,
+    "generic": GENERIC_RULES,
+}
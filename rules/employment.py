@@ -43,4 +43,35 @@ BASELINE VS. RED FLAGS (DETECT DEVIATIONS):
    - Standard: Employer releases full and final settlement within a reasonable time after exit, subject to clear dues.
    - 🚩 RED FLAG: Company reserves the right to delay or withhold final settlement, experience letter, or relieving letter indefinitely.
    - 🚩 RED FLAG: Linking final settlement to vague conditions like "management approval" or "successful knowledge transfer".
-"""
\ No newline at end of file
+"""
+
+# Local pre-screen triggers (core/prescreen.py): rulebook section / heuristic -> (category, regex patterns)
+EMPLOYMENT_TRIGGERS = {
+    "VAGUENESS": ("Legal", [r"sole discretion", r"as (?:it |may be )?deemed fit", r"without (?:any )?prior notice"]),
+    "INFINITE TIME": ("Career", [r"perpetu(?:al|ity)", r"\blifetime\b", r"\bindefinite(?:ly)?\b"]),
+    "NOTICE PERIOD & TERMINATION": ("Career", [
+        r"terminat\w*[^.]{0,60}(?:immediately|without (?:any )?notice)",
+        r"notice period of (?:9[1-9]|[1-9]\d{2})\s*days",
+        r"(?:9[1-9]|[1-9]\d{2})[- ]days?'? notice",
+        r"\b(?:[4-9]|1[0-2])[- ]months?'? notice",
+    ]),
+    "FINANCIAL PENALTIES & BONDS": ("Financial", [
+        r"training (?:bond|recovery|cost|fee)", r"\bservice bond\b", r"\bpenalt(?:y|ies)\b", r"liquidated damages",
+        r"(?:deduct|withh?old)\w*[^.]{0,40}salary", r"salary[^.]{0,40}(?:deduct|withh?old)\w*", r"poor performance",
+    ]),
+    "INTELLECTUAL PROPERTY (IP) & MOONLIGHTING": ("Career", [
+        r"all (?:intellectual property|inventions|work product|ip)\b", r"side[- ]projects?", r"moonlighting",
+        r"outside (?:of )?(?:working hours|activities|employment|business)", r"personal (?:time|devices?)",
+    ]),
+    "NON-COMPETE & NON-SOLICITATION": ("Career", [
+        r"non[- ]?compet\w*", r"non[- ]?solicit\w*", r"(?:entire|any) (?:industry|sector)",
+        r"\bglobally\b|\bworldwide\b|anywhere in the world",
+    ]),
+    "RELOCATION & ROLE CHANGES": ("Freedom", [
+        r"transfer\w*[^.]{0,60}(?:any|other) (?:location|city|office|country|branch)", r"\brelocat\w+",
+        r"(?:additional|other) (?:duties|responsibilities)", r"change[^.]{0,30}(?:role|designation|duties)",
+    ]),
+    "FINAL SETTLEMENT & EXIT BLOCKING": ("Financial", [
+        r"(?:relieving|experience) letter", r"(?:full and )?final settlement", r"management approval", r"knowledge transfer",
+    ]),
+}
@@ -33,4 +33,26 @@ BASELINE VS. RED FLAGS (DETECT DEVIATIONS):
 6. LIABILITY & INDEMNITY
    - Standard: Freelancer is responsible only for their own intentional misconduct or gross negligence.
    - 🚩 RED FLAG: Freelancer must indemnify the client for all losses, lawsuits, or third-party claims, even those unrelated to the freelancer’s work.
-"""
\ No newline at end of file
+"""
+
+# Local pre-screen triggers (core/prescreen.py): rulebook section / heuristic -> (category, regex patterns)
+FREELANCE_TRIGGERS = {
+    "VAGUENESS": ("Legal", [r"unlimited revisions?", r"satisfactory quality", r"to the (?:client's )?satisfaction"]),
+    "POWER ASYMMETRY": ("Financial", [r"pay[- ]when[- ]paid", r"paid only (?:when|after|if)[^.]{0,40}(?:client|customer)"]),
+    "INTELLECTUAL PROPERTY (IP) TRANSFER": ("Career", [
+        r"upon (?:creation|delivery)", r"intellectual property|\bcopyright\b|\bownership\b", r"\bportfolio\b", r"white[- ]label|ghost\w*",
+    ]),
+    "PAYMENT TERMS": ("Financial", [
+        r"\bnet[- ]?(?:4[5-9]|[5-9]\d|1\d{2})\b", r"(?:4[5-9]|[5-9]\d|1\d{2}) days (?:after|from|of) (?:the )?invoice",
+    ]),
+    "NON-COMPETE FOR FREELANCERS": ("Career", [
+        r"non[- ]?compet\w*", r"may not work with any other client", r"\bcompetitors?\b", r"\bglobally\b|\bworldwide\b",
+    ]),
+    "SCOPE CREEP & UNPAID WORK": ("Financial", [
+        r"additional (?:features|work|revisions|support)", r"without (?:any )?(?:additional|extra) (?:compensation|payment|cost|charge)",
+    ]),
+    "TERMINATION & PARTIAL PAYMENT": ("Financial", [
+        r"terminat\w*[^.]{0,40}at any time", r"without (?:any )?(?:payment|compensation)", r"in[- ]progress work",
+    ]),
+    "LIABILITY & INDEMNITY": ("Legal", [r"indemnif\w+|hold harmless", r"all (?:losses|claims|damages)", r"third[- ]party claims?"]),
+}
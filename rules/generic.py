@@ -40,4 +40,22 @@ ONLY FLAG CLAUSES IF THEY VIOLATE THESE UNIVERSAL PRINCIPLES:
 8. SURVIVAL OF OBLIGATIONS
    - Standard: Only essential clauses (payment, confidentiality, dispute resolution) survive termination.
    - 🚩 RED FLAG: Broad language stating that "all obligations" survive termination, effectively extending penalties indefinitely.
-"""
\ No newline at end of file
+"""
+
+# Local pre-screen triggers (core/prescreen.py): rulebook section / heuristic -> (category, regex patterns)
+GENERIC_TRIGGERS = {
+    "MUTUALITY & ASYMMETRY (TERMINATION)": ("Legal", [r"terminat\w*[^.]{0,40}(?:for convenience|at any time|without cause)"]),
+    "UNCAPPED LIABILITY & INDEMNIFICATION": ("Financial", [
+        r"unlimited liability|uncapped", r"indemnif\w+|hold harmless", r"liability[^.]{0,40}(?:shall not exceed|limited to)",
+    ]),
+    'UNILATERAL MODIFICATION (THE "GOD" CLAUSE)': ("Legal", [
+        r"(?:change|modify|amend|revise)\w*[^.]{0,40}(?:at any time|sole discretion|without (?:the )?(?:consent|notice))",
+    ]),
+    "DISPUTE RESOLUTION & JURISDICTION TRAPS": ("Legal", [r"\barbitrat\w+", r"class[- ]action", r"\bjurisdiction\b|governing law"]),
+    "VAGUE PENALTIES": ("Financial", [r"\bpenalt(?:y|ies)\b", r"liquidated damages", r"breach of trust", r"\binconvenience\b"]),
+    "PAYMENT WITHHOLDING & UNCERTAINTY": ("Financial", [
+        r"(?:delay|suspend|withh?old|refuse)\w*[^.]{0,40}payment", r"internal approval", r"\bsatisf(?:action|actory)\b",
+    ]),
+    "ASSIGNMENT & TRANSFER OF OBLIGATIONS": ("Legal", [r"\bassign\w*[^.]{0,40}(?:third part|any part|without)", r"\bnot (?:be )?(?:assign|transfer)\w*"]),
+    "SURVIVAL OF OBLIGATIONS": ("Legal", [r"all obligations[^.]{0,30}surviv\w*", r"surviv\w*[^.]{0,40}terminat\w*"]),
+}
@@ -31,4 +31,19 @@ BASELINE VS. RED FLAGS (DETECT DEVIATIONS):
 6. INJUNCTIVE RELIEF & IMMEDIATE ACTION
    - Standard: Injunctive relief is limited to actual, provable risk of irreparable harm.
    - 🚩 RED FLAG: Automatic or unconditional right to injunction without requiring proof of actual harm.
-"""
\ No newline at end of file
+"""
+
+# Local pre-screen triggers (core/prescreen.py): rulebook section / heuristic -> (category, regex patterns)
+NDA_TRIGGERS = {
+    "OVERREACH": ("Legal", [r"publicly (?:available|known)", r"whether or not (?:marked|public)"]),
+    "DURATION OF CONFIDENTIALITY": ("Career", [
+        r"perpetu(?:al|ity)", r"\bindefinite(?:ly)?\b", r"\blifetime\b", r"\bforever\b", r"surviv\w*[^.]{0,40}(?:termination|expiry)",
+    ]),
+    "PENALTIES & DAMAGES": ("Financial", [r"liquidated damages", r"\bpenalt(?:y|ies)\b", r"(?:₹|rs\.?|inr|\$|usd)\s?[\d,]{5,}"]),
+    "EXCLUSIONS (WHAT IS NOT CONFIDENTIAL)": ("Legal", [r"(?:all|any) information", r"including (?:but not limited to )?(?:public|all)"]),
+    "ONE-WAY (UNILATERAL) NDA": ("Legal", [r"\bunilateral\b", r"only the (?:recipient|receiving party|employee|contractor|vendor)"]),
+    "USE OF GENERAL SKILLS & EXPERIENCE": ("Career", [r"general (?:skills|knowledge|experience)", r"know[- ]how", r"skills,? (?:knowledge|experience)"]),
+    "INJUNCTIVE RELIEF & IMMEDIATE ACTION": ("Legal", [
+        r"\binjunct\w+", r"equitable relief", r"without (?:the )?(?:need|requirement) (?:to|of) (?:prove|proving|proof)",
+    ]),
+}
@@ -41,4 +41,30 @@ BASELINE VS. RED FLAGS (DETECT DEVIATIONS):
 8. DISPUTE RESOLUTION
    - Standard: Local jurisdiction or mutually accessible dispute resolution.
    - 🚩 RED FLAG: Forcing dispute resolution in a distant or impractical jurisdiction for the tenant.
-"""
\ No newline at end of file
+"""
+
+# Local pre-screen triggers (core/prescreen.py): rulebook section / heuristic -> (category, regex patterns)
+RENTAL_TRIGGERS = {
+    "VAGUENESS": ("Legal", [r"wear and tear", r"(?:any )?inconvenience to (?:the )?landlord"]),
+    "POWER ASYMMETRY": ("Financial", [r"(?:per day|daily) (?:fine|penalty)", r"(?:fine|penalty) of [^.]{0,20}per day"]),
+    "DEPOSIT & DEDUCTIONS": ("Financial", [
+        r"security deposit", r"\bdeduct\w*", r"regardless of (?:the )?(?:actual )?condition",
+        r"\b(?:re)?painting\b|deep cleaning", r"withh?old\w*[^.]{0,30}deposit",
+    ]),
+    "LOCK-IN PERIOD & EVICTION": ("Freedom", [
+        r"lock[- ]?in", r"\bevict\w*", r"remaining (?:lease|rent|term|period)",
+        r"\b(?:24|48|72) hours'? notice", r"\b[1-7] days'? notice",
+    ]),
+    "PRIVACY & ACCESS": ("Privacy", [
+        r"enter (?:the )?(?:premises|property|flat|house|room)", r"at any time", r"without (?:any )?(?:prior )?notice",
+    ]),
+    "MAINTENANCE & REPAIRS": ("Financial", [r"\bstructural\b", r"\brepairs?\b", r"\bappliances?\b"]),
+    "RESTRICTIONS (PG / RENTALS)": ("Freedom", [
+        r"\b(?:guests?|visitors?)\b", r"\bcurfew\b", r"(?:no|ban on) (?:pets|cooking|non[- ]veg\w*)",
+    ]),
+    "UTILITIES & COMMON CHARGES": ("Financial", [
+        r"flat[- ]rate", r"electricity|water charges|maintenance charges", r"society (?:charges|penalt\w+|dues)",
+    ]),
+    "EMERGENCY & FORCE MAJEURE EXIT": ("Freedom", [r"force majeure", r"no refunds?", r"under any circumstances"]),
+    "DISPUTE RESOLUTION": ("Legal", [r"\bjurisdiction\b", r"\barbitrat\w+", r"courts? (?:of|at|in)\b"]),
+}
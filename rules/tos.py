@@ -32,4 +32,25 @@ BASELINE VS. RED FLAGS (DETECT DEVIATIONS):
 6. LIMITATION OF LIABILITY
    - Standard: Company limits liability to a reasonable extent.
    - 🚩 RED FLAG: Company disclaims all liability, even for data loss, security breaches, or financial harm caused by its own negligence.
-"""
\ No newline at end of file
+"""
+
+# Local pre-screen triggers (core/prescreen.py): rulebook section / heuristic -> (category, regex patterns)
+TOS_TRIGGERS = {
+    "POWER ASYMMETRY": ("Legal", [r"at any time,? (?:and )?without (?:any )?(?:prior )?notice"]),
+    "LOSS OF RIGHTS": ("Legal", [r"binding arbitration", r"waive\w*[^.]{0,40}(?:rights?|class)"]),
+    "DATA PRIVACY & SHARING": ("Privacy", [
+        r"\bsell\w*[^.]{0,40}(?:data|information|content)", r"data brokers?", r"(?:marketing|advertising) (?:partners|agencies)",
+        r"(?:perpetual|irrevocable|worldwide)[^.]{0,30}licen[cs]e", r"own(?:s|ership)? (?:of )?(?:all )?(?:user )?content",
+    ]),
+    "MODIFICATION OF TERMS": ("Legal", [
+        r"(?:change|modify|amend|update)\w*[^.]{0,40}(?:at any time|without notice)", r"continued use",
+    ]),
+    "DISPUTE RESOLUTION": ("Legal", [r"\barbitrat\w+", r"class[- ]action", r"\bjurisdiction\b|governing law"]),
+    "ACCOUNT TERMINATION & SERVICE ACCESS": ("Freedom", [
+        r"(?:suspend|terminate|delete|disable)\w*[^.]{0,40}accounts?", r"sole discretion",
+    ]),
+    "BILLING, AUTO-RENEWAL & REFUNDS": ("Financial", [r"auto(?:matic(?:ally)?)?[- ]?renew\w*", r"no refunds?|non[- ]refundable"]),
+    "LIMITATION OF LIABILITY": ("Legal", [
+        r"disclaim\w*", r"(?:shall )?not (?:be )?liable", r"\bno liability\b", r"\bas is\b", r"limitation of liability",
+    ]),
+}
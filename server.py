@@ -0,0 +1,184 @@
+import argparse
+import base64
+import json
+import re
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from core.engine import EngineConfig, TrueClauseEngine
+from core.jobs import JobQueue, contract_fields
+from core.tracing import gauge_lines
+from rules import RULEBOOKS
+
+# ==========================================
+# 1. HTTP API
+# ==========================================
+# POST /v1/analyze            {"text" | "pdf_base64", "doc_type", "language", "stream"}  -> 202 {"job_id"}
+#                             risks are detected in English (cached once per contract), "language" is a translation pass on top
+#                             "doc_type": "auto" picks the rulebook with the local classifier (no LLM call)
+#                             "pdf_base64" is extracted (scanned pages OCR'd) inside the job: a "page" event per page read, then "extracted"
+#                             "stream": true adds a "risk" event per finished risk (watch /events)
+#                             result "anchors": per risk {start, end, page, score, status}; status "not_found" = the quote
+#                             is not in the contract (paraphrased or invented), found locally without another LLM call
+# POST /v1/compare            /v1/analyze body + {"previous_text", "previous_analysis"}  -> 202 {"job_id"}
+#                             revised draft: only changed clauses are re-analyzed; result adds "diff" (resolved/introduced/unchanged)
+# POST /v1/translate          {"analysis", "language", "diff"?}  -> 202 {"job_id"}
+#                             explanations in another language: one small call (or none, cached), no re-analysis
+# POST /v1/email              {"risks": [RiskItem...], "doc_type", "language", "tone", "stream", "same_context"}  -> 202 {"job_id"}
+#                             cached per (risks, doc_type, language, tone); "stream": true adds "text_delta" events;
+#                             "same_context": true continues the client_id's last analysis conversation
+# GET  /v1/portfolio          ?doc_type=freelance&portfolio=vendors&level=HIGH&days=90 (doc_type / portfolio repeatable)
+#                             vectorized scores + aggregates over every analysis this service has completed:
+#                             verdict mix, which categories drive the level's risks, per doc type; no contract text is stored
+# GET  /v1/jobs/<id>          poll status / result
+# GET  /v1/jobs/<id>/events   stream job events as NDJSON until the job finishes
+# GET  /v1/health             provider health, queue depth, rate-limit queues, caches, token, repair, anchoring, streaming, feedback spool + analytics stats
+# GET  /metrics               Prometheus text: per-stage span histograms, tokens, cache, failovers, gauges
+# "portfolio" (optional, /v1/analyze + /v1/compare) files the result under a named portfolio, e.g. "vendors"
+# "client_id" (optional, any POST) groups a caller's jobs for fair queueing when provider quota runs out
+JOB_PATH = re.compile(r"^/v1/jobs/(?P<id>[0-9a-f]{32})(?P<events>/events)?$")
+
+class TrueClauseHandler(BaseHTTPRequestHandler):
+    server_version = "TrueClause/1.0"
+    queue: JobQueue = None
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_POST(self):
+        try:
+            body = self._read_json()
+            if not isinstance(body, dict):
+                raise ValueError("Request body must be a JSON object.")
+            if self.path == "/v1/analyze":
+                job = self.queue.submit("analyze", self._analyze_payload(body))
+            elif self.path == "/v1/compare":
+                if not body.get("previous_text") or not isinstance(body.get("previous_analysis"), dict):
+                    raise ValueError("'previous_text' and 'previous_analysis' (the earlier result's analysis) are required.")
+                job = self.queue.submit("compare", {**self._analyze_payload(body), "previous_text": body["previous_text"],
+                                                    "previous_analysis": body["previous_analysis"]})
+            elif self.path == "/v1/translate":
+                if not isinstance(body.get("analysis"), dict) or not body.get("language"):
+                    raise ValueError("'analysis' (an earlier result's analysis) and 'language' are required.")
+                job = self.queue.submit("translate", {"analysis": body["analysis"], "diff": body.get("diff"), "language": body["language"],
+                                                      "client_id": body.get("client_id")})
+            elif self.path == "/v1/email":
+                if not isinstance(body.get("risks"), list):
+                    raise ValueError("'risks' must be a list of risk items.")
+                job = self.queue.submit("email", {"risks": body["risks"], "doc_type": body.get("doc_type", "contract"), "client_id": body.get("client_id"),
+                                                  "language": body.get("language", "English"), "tone": body.get("tone", "Polite"),
+                                                  "same_context": bool(body.get("same_context")), "stream": bool(body.get("stream"))})
+            else:
+                return self._send_json(404, {"error": "Not found"})
+        except (ValueError, KeyError) as e:
+            return self._send_json(400, {"error": str(e)})
+        except RuntimeError as e:
+            return self._send_json(503, {"error": str(e)})
+        self._send_json(202, {"job_id": job.id, "status": job.status, "poll": f"/v1/jobs/{job.id}", "events": f"/v1/jobs/{job.id}/events"})
+
+    def _analyze_payload(self, body: dict) -> dict:
+        doc_type = body.get("doc_type", "generic")
+        if doc_type != "auto" and doc_type not in RULEBOOKS:
+            raise ValueError(f"Unknown doc_type. Use one of: {', '.join(sorted(RULEBOOKS))}, auto")
+        payload = {"doc_type": doc_type, "language": body.get("language", "English"), "client_id": body.get("client_id"),
+                   "stream": bool(body.get("stream")), "portfolio": body.get("portfolio") or "default"}
+        if body.get("pdf_base64"):
+            # Only decoded here: extraction + OCR run in the job (an unreadable PDF fails the job, not the request)
+            return {**payload, "pdf": base64.b64decode(body["pdf_base64"], validate=True)}
+        return {**payload, **contract_fields(body.get("text", ""), doc_type)}
+
+    def _portfolio(self, query: dict):
+        try:
+            days = float(query["days"][0]) if query.get("days") else None
+            level = query.get("level", ["HIGH"])[0].upper()
+            if level not in ("HIGH", "MEDIUM"):
+                raise ValueError("'level' must be HIGH or MEDIUM.")
+        except ValueError as e:
+            return self._send_json(400, {"error": str(e)})
+        result = self.queue.engine.portfolio(doc_types=query.get("doc_type"), portfolios=query.get("portfolio"), level=level,
+                                             since=time.time() - days * 86400 if days else None)
+        self._send_json(200, result)
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            jobs = gauge_lines("trueclause_job_queue_depth", "Jobs accepted but not started.", [((), self.queue.queue_depth())])
+            data = self.queue.engine.metrics_text(jobs).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        if self.path == "/v1/health":
+            engine = self.queue.engine
+            return self._send_json(200, {
+                "providers": engine.registry.health(),
+                "queue_depth": self.queue.queue_depth(),
+                "rate_limits": engine.limiter.metrics(),
+                "analysis_cache": engine.analysis_cache.stats(),
+                "translation_cache": engine.translation_cache.stats(),
+                "tokens": engine.tokens.stats(),
+                "output_repair": engine.repairs.stats(),
+                "clause_anchors": engine.anchors.stats(),
+                "streaming": engine.streaming_stats(),
+                "near_duplicates": engine.similar.stats() if engine.similar else None,
+                "feedback": engine.feedback_stats(),
+                "analytics": engine.analytics.stats(),
+            })
+        if urlsplit(self.path).path == "/v1/portfolio":
+            return self._portfolio(parse_qs(urlsplit(self.path).query))
+        match = JOB_PATH.match(self.path)
+        job = self.queue.get(match.group("id")) if match else None
+        if job is None:
+            return self._send_json(404, {"error": "Unknown job"})
+        if not match.group("events"):
+            return self._send_json(200, job.to_dict())
+
+        # Streamed response: one JSON event per line, connection closes when the job finishes
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        cursor, finished = 0, False
+        while not finished:
+            events, finished = job.wait_for_events(cursor, timeout=15.0)
+            cursor += len(events)
+            lines = [json.dumps(e, ensure_ascii=False) for e in events] or ['{"event": "keepalive"}']
+            if finished:
+                lines.append(json.dumps({"event": "result", **job.to_dict()}, ensure_ascii=False))
+            self.wfile.write(("\n".join(lines) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+# ==========================================
+# 2. ENTRY POINT
+# ==========================================
+def make_server(host: str, port: int, workers: int, config: EngineConfig = None) -> ThreadingHTTPServer:
+    handler = type("BoundHandler", (TrueClauseHandler,), {"queue": JobQueue(TrueClauseEngine(config or EngineConfig.load()), workers=workers)})
+    return ThreadingHTTPServer((host, port), handler)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="TrueClause analysis service (job queue + worker pool over HTTP).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Analysis jobs running concurrently")
+    args = parser.parse_args(argv)
+    server = make_server(args.host, args.port, args.workers)
+    print(f"TrueClause API listening on http://{args.host}:{args.port} with {args.workers} worker(s)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
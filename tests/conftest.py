@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+from benchmark import make_engine
+from synthetic_contracts import contract_text, generate_pages
+from core.models import ContractAnalysis, RiskItem, SafeItem
+
+# ==========================================
+# SHARED FIXTURES (MOCK PROVIDERS FROM tools/benchmark.py, STORES IN A TEMP DIR)
+# ==========================================
+@pytest.fixture
+def engine():
+    return make_engine("healthy", 0.0, seed=1)
+
+@pytest.fixture
+def contract():
+    return contract_text(generate_pages(2, "employment", seed=3))
+
+def llm_calls(engine) -> int:
+    # Mock "gemini" + "groq" calls so far
+    return sum(llm.calls for llm in engine._llms.values())
+
+def risk(quote: str, level: str = "HIGH") -> RiskItem:
+    return RiskItem(clause_text=quote, risk_level=level, category="Legal", baseline="Market standard", deviation="One-sided", suggestion="Negotiate")
+
+def safe(summary: str, quote: str = "") -> SafeItem:
+    return SafeItem(clause_summary=summary, reason="Standard terms", clause_text=quote)
+
+def analysis(risks=(), safe_clauses=()) -> ContractAnalysis:
+    return ContractAnalysis(risks=list(risks), safe_clauses=list(safe_clauses))
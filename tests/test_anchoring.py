@@ -0,0 +1,33 @@
+from core.anchoring import EXACT, FUZZY, NOT_FOUND, ClauseAnchorIndex, page_starts
+from core.pdf import PageText, join_pages
+
+PAGES = [PageText(1, "1. The Employee shall be on probation for six months.", 0.0, True),
+         PageText(2, "", 0.0, False),
+         PageText(3, "2. The Employee must serve a 90-day notice period if they wish to resign.\n3. Salary is paid monthly.", 0.0, True)]
+
+def index() -> ClauseAnchorIndex:
+    return ClauseAnchorIndex(join_pages(PAGES), page_starts(PAGES))
+
+# ==========================================
+# 1. QUOTE -> OFFSETS + PAGE (user-025)
+# ==========================================
+def test_verbatim_quote_is_exact_with_its_page():
+    text, anchor = join_pages(PAGES), index().locate("must serve a 90-day notice period")
+    assert anchor.status == EXACT and anchor.page == 3
+    assert text[anchor.start:anchor.end] == "must serve a 90-day notice period"
+
+def test_case_and_punctuation_changes_still_match():
+    anchor = index().locate("The employee shall be on probation for SIX months")
+    assert anchor.status == EXACT and anchor.page == 1
+
+def test_lightly_reworded_quote_is_fuzzy():
+    anchor = index().locate("The Employee must serve a ninety day notice period if they wish to resign")
+    assert anchor.status == FUZZY and anchor.page == 3 and anchor.score >= 0.6
+
+def test_elided_quote_spans_both_fragments():
+    text, anchor = join_pages(PAGES), index().locate("The Employee must serve ... if they wish to resign")
+    assert text[anchor.start:anchor.end] == "The Employee must serve a 90-day notice period if they wish to resign"
+
+def test_invented_quote_is_not_found():
+    anchor = index().locate("Employer may relocate the employee to any country")
+    assert anchor.status == NOT_FOUND and anchor.start == -1
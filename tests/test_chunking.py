@@ -0,0 +1,38 @@
+from conftest import analysis, risk, safe
+from core.chunking import chunk_contract, estimate_tokens, merge_findings, split_into_clauses
+
+CONTRACT = "\n".join(f"{i}. The Employee shall comply with office policy number {i} at all times during the term." for i in range(1, 61))
+
+# ==========================================
+# 1. SPLITTING (user-002)
+# ==========================================
+def test_numbered_items_are_clauses():
+    clauses = split_into_clauses(CONTRACT)
+    assert len(clauses) == 60
+    assert clauses[0].startswith("1. ") and clauses[-1].startswith("60. ")
+
+def test_chunks_stay_within_budget_and_keep_every_clause():
+    chunks = chunk_contract(CONTRACT, max_tokens=200)
+    assert len(chunks) > 1
+    # The budget counts the clauses themselves, not the blank lines joining them
+    assert all(sum(estimate_tokens(clause) for clause in chunk.split("\n\n")) <= 200 for chunk in chunks)
+    assert "\n\n".join(chunks).count("The Employee shall") == 60
+
+# ==========================================
+# 2. MERGING CHUNK FINDINGS (user-002)
+# ==========================================
+PENALTY = "The Employee agrees to pay a training recovery fee of Rs 3,00,000 if they leave within the first 2 years of service"
+
+def test_same_clause_quoted_with_more_context_is_one_risk():
+    risks, _ = merge_findings([analysis([risk(PENALTY, "MEDIUM")]), analysis([risk(PENALTY + ", payable on demand.", "HIGH")])])
+    assert len(risks) == 1
+    assert risks[0].risk_level == "HIGH"
+
+def test_short_quote_inside_another_is_not_a_duplicate():
+    short = "within the first 2 years"
+    risks, _ = merge_findings([analysis([risk(PENALTY)]), analysis([risk(short)])])
+    assert [r.clause_text for r in risks] == [PENALTY, short]
+
+def test_safe_summaries_merge_only_when_identical():
+    _, safe_clauses = merge_findings([analysis(safe_clauses=[safe("Notice")]), analysis(safe_clauses=[safe("30-Day Notice Period"), safe("notice")])])
+    assert [s.clause_summary for s in safe_clauses] == ["Notice", "30-Day Notice Period"]
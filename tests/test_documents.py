@@ -0,0 +1,101 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT, analysis, risk
+from synthetic_contracts import contract_pdf, contract_text, generate_pages, scanned_pdf
+from core.analytics import AnalyticsStore
+from core.classifier import classify_document
+from core.ocr import ocr_available
+from core.pdf import iter_pdf_pages, join_pages
+
+# ==========================================
+# 1. PDF EXTRACTION (user-005)
+# ==========================================
+@pytest.mark.parametrize("parallel_min_pages", [100, 2])
+def test_pages_come_back_in_order(parallel_min_pages):
+    doc = generate_pages(12, "employment", seed=5)
+    pages = list(iter_pdf_pages(contract_pdf(doc), parallel_min_pages=parallel_min_pages, max_workers=2))
+    assert [page.number for page in pages] == list(range(1, 13))
+    assert all(page.has_text_layer for page in pages)
+    assert join_pages(pages).split()[:5] == contract_text(doc).split()[:5]
+
+def test_same_upload_is_parsed_once(engine):
+    pdf = contract_pdf(generate_pages(3, "employment", seed=5))
+    first = engine.extract_text_from_pdf(pdf)
+    hits = engine.pdf_cache.stats()["memory_hits"]
+    assert engine.extract_text_from_pdf(pdf) == first
+    assert engine.pdf_cache.stats()["memory_hits"] == hits + 1
+
+# ==========================================
+# 2. DOCUMENT TYPE (user-017)
+# ==========================================
+def test_classifier_accuracy_on_the_eval_set():
+    with open(os.path.join(ROOT, "tools", "doc_type_eval.jsonl"), encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    correct = sum(classify_document(row["text"]).doc_type == row["label"] for row in rows)
+    assert correct / len(rows) >= 0.85
+
+def test_unclear_text_falls_back_to_generic():
+    prediction = classify_document("Lorem ipsum dolor sit amet.")
+    assert (prediction.doc_type, prediction.confidence) == ("generic", 0.0)
+
+# ==========================================
+# 3. PORTFOLIO ANALYTICS (user-024)
+# ==========================================
+def test_portfolio_counts_drivers_per_filter(tmp_path):
+    store = AnalyticsStore(str(tmp_path / "analytics"))
+    high = analysis([risk("Penalty"), risk("Non-compete").model_copy(update={"category": "Freedom"})])
+    assert store.record(high, "employment", "hr", contract_key="a" * 16)
+    assert store.record(analysis([risk("Deposit", "MEDIUM")]), "rent", "facilities", contract_key="b" * 16)
+    assert not store.record(high, "employment", "hr", contract_key="a" * 16)
+    result = AnalyticsStore(store.path).portfolio(portfolios=["hr"])
+    assert result["analyses"] == 1
+    assert {d["category"]: d["risks"] for d in result["drivers"] if d["risks"]} == {"Legal": 1, "Freedom": 1}
+    assert store.portfolio(level="MEDIUM")["analyses"] == 2
+
+# ==========================================
+# 4. BULK CLI (user-008)
+# ==========================================
+def test_bulk_run_processes_files_and_resumes(engine, contract, tmp_path):
+    from bulk_analyze import RateLimiter, load_done, process_file
+    path = tmp_path / "offer.txt"
+    path.write_text(contract, encoding="utf-8")
+    row = process_file(engine, str(path), None, "auto", "English", RateLimiter(0))
+    assert row["status"] == "ok", row.get("error")
+    assert row["doc_type"] == "employment" and row["analysis"]["risks"]
+    output = tmp_path / "results.jsonl"
+    output.write_text(json.dumps(row) + "\n" + json.dumps({"path": "failed.pdf", "status": "error"}) + "\n{half", encoding="utf-8")
+    assert load_done(str(output)) == {str(path)}
+
+# ==========================================
+# 5. COLD START (user-010)
+# ==========================================
+def test_app_modules_do_not_import_provider_sdks():
+    from import_report import LAZY_MODULES, STARTUP_MODULES
+    code = f"import sys; import {', '.join(STARTUP_MODULES)}; print([m for m in {LAZY_MODULES!r} if m in sys.modules])"
+    loaded = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    assert loaded == "[]"
+
+# ==========================================
+# 6. OCR OF SCANNED PAGES (user-022)
+# ==========================================
+def test_same_scan_in_another_file_shares_its_cache_key():
+    from core.ocr import page_fingerprints
+    pages = generate_pages(3, "employment", seed=5)
+    whole, tail = scanned_pdf(pages), scanned_pdf(pages[1:])
+    assert list(page_fingerprints(whole, [1, 2]).values()) == list(page_fingerprints(tail, [0, 1]).values())
+    assert page_fingerprints(whole, [0])[0] != page_fingerprints(whole, [1])[1]
+
+@pytest.mark.skipif(not ocr_available(), reason="pytesseract / tesseract not installed")
+def test_scanned_pages_are_read_once(engine):
+    pdf = scanned_pdf(generate_pages(2, "employment", seed=5))
+    pages = engine.extract_pdf_pages(pdf)
+    assert all(page.ocr and page.text for page in pages)
+    engine.pdf_cache.clear()
+    misses = engine.ocr_cache.stats()["misses"]
+    assert [page.text for page in engine.extract_pdf_pages(pdf)] == [page.text for page in pages]
+    assert engine.ocr_cache.stats()["misses"] == misses
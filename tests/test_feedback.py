@@ -0,0 +1,51 @@
+import json
+import logging
+
+from core.engine import EngineConfig, TrueClauseEngine
+from core.feedback import MESSAGE_CHARS, FeedbackDelivery, FeedbackSpool, format_batch, split_feedback
+
+class FakeWebhook:
+    # requests.Session stand-in: answers with the queued status codes, then 204
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.posts = []
+
+    def post(self, url, json=None, timeout=None):
+        self.posts.append(json["content"])
+        status = self.statuses.pop(0) if self.statuses else 204
+        return type("Response", (), {"status_code": status, "headers": {}, "json": lambda self: {}})()
+
+# ==========================================
+# 1. SPOOL + DELIVERY (user-023)
+# ==========================================
+def test_spooled_feedback_goes_out_in_one_batch():
+    spool, webhook = FeedbackSpool(":memory:"), FakeWebhook()
+    for i in range(3):
+        spool.add(f"Feedback #{i}")
+    FeedbackDelivery(spool, "https://hooks.invalid", session=webhook).deliver_due()
+    assert len(webhook.posts) == 1 and all(f"Feedback #{i}" in webhook.posts[0] for i in range(3))
+    assert spool.stats()["pending"] == 0 and spool.stats()["delivered"] == 3
+
+def test_failed_post_stays_in_the_spool():
+    spool, webhook = FeedbackSpool(":memory:"), FakeWebhook(503)
+    spool.add("Please add NDA support")
+    delivery = FeedbackDelivery(spool, "https://hooks.invalid", base_backoff=0.0, session=webhook)
+    delivery.deliver_due()
+    assert spool.stats()["pending"] == 1 and delivery.stats()["failures"] == 1
+    delivery.deliver_due()
+    assert spool.stats()["delivered"] == 1
+
+def test_long_feedback_is_split_into_messages_that_fit():
+    parts = split_feedback("word " * 2000)
+    assert len(parts) > 1 and parts[0].startswith(f"(1/{len(parts)}) ")
+    assert all(len(format_batch([part])) <= MESSAGE_CHARS for part in parts)
+
+def test_without_a_webhook_feedback_is_kept_and_flagged(tmp_path, caplog):
+    engine = TrueClauseEngine(EngineConfig(feedback_spool_path=str(tmp_path / "feedback.sqlite3"), discord_webhook_url="", cache_path="",
+                                           similarity_path="", translation_cache_path="", ocr_cache_path="", analytics_path="", trace_path=""))
+    with caplog.at_level(logging.WARNING, logger="trueclause"):
+        engine.send_feedback("The notice period explanation was confusing.")
+    assert "not delivered" in caplog.text
+    assert not engine.feedback_delivery_configured()
+    assert engine.feedback_stats()["pending"] == 1 and engine.feedback_stats()["webhook_configured"] is False
+    assert "trueclause_feedback_delivery_configured 0" in engine.metrics_text()
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from core.hedging import hedged_call
+
+def slow(value, seconds):
+    def call():
+        time.sleep(seconds)
+        return value
+    return call
+
+def failing():
+    raise RuntimeError("503 from provider")
+
+# ==========================================
+# 1. HEDGED FAILOVER (user-003)
+# ==========================================
+def test_fast_primary_wins_without_a_hedge():
+    launches = []
+    name, result = hedged_call([("gemini", slow("a", 0.0)), ("groq", slow("b", 0.0))], hedge_after=1.0,
+                               on_launch=lambda name, reason, error: launches.append((name, reason)))
+    assert (name, result) == ("gemini", "a")
+    assert launches == [("gemini", "primary")]
+
+def test_slow_primary_is_hedged():
+    launches = []
+    name, result = hedged_call([("gemini", slow("a", 1.0)), ("groq", slow("b", 0.0))], hedge_after=0.05,
+                               on_launch=lambda name, reason, error: launches.append((name, reason)))
+    assert (name, result) == ("groq", "b")
+    assert launches == [("gemini", "primary"), ("groq", "hedge")]
+
+def test_failure_fails_over_at_once():
+    launches = []
+    started = time.perf_counter()
+    name, _ = hedged_call([("gemini", failing), ("groq", slow("b", 0.0))], hedge_after=5.0,
+                          on_launch=lambda name, reason, error: launches.append((name, reason)))
+    assert name == "groq" and launches[-1] == ("groq", "failover")
+    assert time.perf_counter() - started < 1.0
+
+def test_invalid_answer_counts_as_failure():
+    with pytest.raises(RuntimeError, match="All engines failed"):
+        hedged_call([("gemini", slow(None, 0.0)), ("groq", slow(None, 0.0))], hedge_after=1.0)
+
+# ==========================================
+# 2. RATE-LIMIT ADMISSION ON THE CALLER THREAD (user-011)
+# ==========================================
+def test_hedge_without_quota_is_skipped():
+    # The backup has no free quota: the primary keeps racing alone instead of the hedge waiting on a pool thread
+    asked = []
+    def admit(name, reason):
+        asked.append((name, reason))
+        return reason != "hedge"
+    name, _ = hedged_call([("gemini", slow("a", 0.2)), ("groq", slow("b", 0.0))], hedge_after=0.02, admit=admit)
+    assert name == "gemini"
+    assert asked == [("gemini", "primary"), ("groq", "hedge")]
+
+def test_admission_error_fails_over():
+    def admit(name, reason):
+        if name == "gemini":
+            raise TimeoutError("queue timeout")
+        return True
+    assert hedged_call([("gemini", slow("a", 0.0)), ("groq", slow("b", 0.0))], hedge_after=1.0, admit=admit) == ("groq", "b")
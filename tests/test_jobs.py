@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from core.jobs import DONE, FAILED, Job, JobQueue
+
+def text_of(events) -> str:
+    parts = []
+    for event in events:
+        if event["event"] == "text_reset":
+            parts.clear()
+        elif event["event"] == "text_delta":
+            parts.append(event["text"])
+    return "".join(parts)
+
+# ==========================================
+# 1. JOB EVENTS (user-009)
+# ==========================================
+def test_finished_job_keeps_one_delta_per_answer():
+    job = Job("email", {})
+    for word in ("Dear ", "Sir, ", "please ", "revisit."):
+        job.add_event("text_delta", {"provider": "gemini", "text": word})
+    job.finish(DONE, {"seconds": 0.1})
+    assert [e["event"] for e in job.events] == ["text_delta", DONE]
+    assert job.events[0]["text"] == "Dear Sir, please revisit."
+
+def test_reader_in_the_middle_of_a_stream_gets_the_rest_once():
+    job = Job("email", {})
+    job.add_event("queued", {"position": 0})
+    job.add_event("text_delta", {"provider": "gemini", "text": "Dear "})
+    events, finished = job.wait_for_events(0, timeout=0.0)
+    cursor = len(events)
+    job.add_event("text_delta", {"provider": "gemini", "text": "Sir"})
+    job.add_event("text_reset", {})
+    job.add_event("text_delta", {"provider": "groq", "text": "Hello"})
+    job.finish(DONE, {"seconds": 0.1})
+    rest, finished = job.wait_for_events(cursor, timeout=0.0)
+    assert finished
+    assert (rest[0]["event"], rest[0]["text"]) == ("text_delta", "Sir")
+    assert text_of(events + rest) == text_of(job.wait_for_events(0, timeout=0.0)[0]) == "Hello"
+
+# ==========================================
+# 2. QUEUE (user-009)
+# ==========================================
+def wait_done(job, timeout=10.0):
+    deadline = time.time() + timeout
+    while job.status not in (DONE, FAILED) and time.time() < deadline:
+        job.wait_for_events(len(job.events), timeout=0.1)
+    return job
+
+def test_analyze_job_runs_on_a_worker(engine, contract):
+    from rules import RULEBOOKS
+    queue = JobQueue(engine, workers=1)
+    job = wait_done(queue.submit("analyze", {"text": contract, "rules_text": RULEBOOKS["employment"], "doc_type": "employment"}))
+    assert job.status == DONE, job.error
+    assert job.result["analysis"]["risks"] and job.result["verdict"]
+    assert [e["event"] for e in job.events][:2] == ["queued", "started"]
+
+def test_unknown_job_kind_is_rejected(engine):
+    with pytest.raises(ValueError):
+        JobQueue(engine, workers=1).submit("summarize", {})
@@ -0,0 +1,48 @@
+from core.local_llm import LocalChatModel
+from core.models import ContractAnalysis
+from core.prompts import PromptCompiler, TokenLedger
+from core.prescreen import get_prescreen_engine
+from rules import RULEBOOKS
+
+RULES = RULEBOOKS["employment"]
+
+# ==========================================
+# 1. COMPILED CHAINS (user-007)
+# ==========================================
+def test_focused_rulebooks_share_one_chain():
+    compiler, llm = PromptCompiler(), LocalChatModel()
+    first = compiler.analysis("gemini", llm, ContractAnalysis, RULES[:500], "English", prefix_caching=False)
+    second = compiler.analysis("gemini", llm, ContractAnalysis, RULES[:900], "English", prefix_caching=False)
+    assert first is second
+    assert first.inputs("contract", "rules") == {"contract_text": "contract", "rules_text": "rules"}
+    assert first.static_tokens(RULES[:900]) > first.static_tokens(RULES[:500])
+
+def test_prefix_cached_chain_bakes_in_its_rulebook():
+    compiler, llm = PromptCompiler(), LocalChatModel()
+    compiled = compiler.analysis("gemini", llm, ContractAnalysis, RULES, "English", prefix_caching=True)
+    assert RULES in compiled.static_text and compiled.inputs("contract", RULES) == {"contract_text": "contract"}
+    assert compiler.analysis("gemini", llm, ContractAnalysis, RULEBOOKS["rent"], "English", prefix_caching=True) is not compiled
+
+def test_repeated_prefix_is_reported_as_cached_tokens():
+    compiler, llm, ledger = PromptCompiler(), LocalChatModel(), TokenLedger()
+    compiled = compiler.analysis("local", llm, ContractAnalysis, RULES, "English", prefix_caching=True)
+    for _ in range(2):
+        raw = compiled.chain.invoke(compiled.inputs("1. The employee shall not compete.", RULES))["raw"]
+        usage = ledger.record("local", compiled, raw, "1. The employee shall not compete.", RULES)
+    assert usage["cached_tokens"] > 0 and ledger.stats()["requests"] == 2
+
+# ==========================================
+# 2. LOCAL PRE-SCREEN (user-006)
+# ==========================================
+def test_prescreen_sends_only_triggered_clauses():
+    contract = ("1. The Employee shall be on probation for six months.\n"
+                "2. The Employee shall not join any competitor for 2 years after leaving (non-compete).\n"
+                "3. Office hours are 9 to 6.")
+    result = get_prescreen_engine(RULES).scan(contract)
+    assert result.total_clauses == 3
+    assert any("competitor" in c.clause for c in result.candidates)
+    assert "Office hours" not in result.focused_text
+    assert len(result.focused_rules) < len(RULES)
+
+def test_custom_rulebook_has_no_prescreen():
+    assert get_prescreen_engine("My own rules") is None
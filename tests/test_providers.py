@@ -0,0 +1,52 @@
+import pytest
+
+from core.providers import CLOSED, HALF_OPEN, OPEN, ProviderRegistry
+
+def registry(**breaker_options) -> ProviderRegistry:
+    providers = ProviderRegistry()
+    providers.register("gemini", lambda: "gemini-model", **breaker_options)
+    providers.register("groq", lambda: "groq-model", **breaker_options)
+    return providers
+
+def fail(message):
+    def invoke(model):
+        raise RuntimeError(message)
+    return invoke
+
+# ==========================================
+# 1. CIRCUIT BREAKER (user-004)
+# ==========================================
+def test_repeated_failures_open_the_circuit():
+    providers = registry(failure_threshold=3)
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            providers.call("gemini", fail("503 unavailable"))
+    assert providers.get("gemini").state == OPEN
+    assert providers.ranked() == ["groq"]
+
+def test_rate_limit_opens_the_circuit_at_once():
+    providers = registry()
+    with pytest.raises(RuntimeError):
+        providers.call("gemini", fail("429 Resource exhausted"))
+    assert providers.get("gemini").state == OPEN
+    assert providers.get("gemini").snapshot()["rate_limited"] == 1
+
+def test_successful_probe_closes_the_circuit():
+    providers = registry(cooldown_seconds=0.0)
+    with pytest.raises(RuntimeError):
+        providers.call("gemini", fail("429"))
+    assert "gemini" in providers.ranked()
+    assert providers.get("gemini").state == HALF_OPEN
+    assert providers.call("gemini", lambda model: model) == "gemini-model"
+    assert providers.get("gemini").state == CLOSED
+
+def test_failed_probe_doubles_the_cooldown():
+    providers = registry(cooldown_seconds=0.0)
+    providers.get("gemini").base_cooldown = providers.get("gemini").cooldown = 1.0
+    with pytest.raises(RuntimeError):
+        providers.call("gemini", fail("429"))
+    providers.get("gemini").opened_at -= 1.0
+    providers.ranked()
+    with pytest.raises(RuntimeError):
+        providers.call("gemini", fail("429"))
+    assert providers.get("gemini").state == OPEN and providers.get("gemini").cooldown == 2.0
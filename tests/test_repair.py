@@ -0,0 +1,23 @@
+from core.repair import normalize_category, normalize_level, raw_payload, repair_analysis
+
+# ==========================================
+# 1. LOCAL REPAIR OF DRIFTED ANSWERS (user-020)
+# ==========================================
+def test_levels_and_categories_snap_to_the_schema():
+    assert [normalize_level(v) for v in ("High", "critical", "low risk", "Medium")] == ["HIGH", "HIGH", "MEDIUM", "MEDIUM"]
+    assert [normalize_category(v) for v in ("financial", "Employment terms", "Data protection", "???")] == ["Financial", "Career", "Privacy", "Legal"]
+
+def test_aliased_fields_are_repaired_and_incomplete_items_re_requested():
+    outcome = repair_analysis({"risks": [
+        {"quote": "Penalty of Rs 3 lakh", "severity": "High", "category": "Money", "standard": "None", "issue": "Punitive", "fix": "Remove"},
+        {"clause_text": "90-day notice", "risk_level": "MEDIUM", "category": "Career"},
+        {"risk_level": "HIGH"},
+    ], "safe_clauses": [{"summary": "Probation", "explanation": "Six months is standard"}]})
+    assert [(r.clause_text, r.risk_level, r.category) for r in outcome.analysis.risks] == [("Penalty of Rs 3 lakh", "HIGH", "Financial")]
+    assert [b["clause_text"] for b in outcome.broken] == ["90-day notice"]
+    assert outcome.dropped == 1
+    assert outcome.analysis.safe_clauses[0].clause_summary == "Probation"
+
+def test_truncated_answer_keeps_its_complete_risks():
+    text = '{"risks": [{"clause_text": "A", "risk_level": "HIGH"}, {"clause_text": "B", "risk_lev'
+    assert raw_payload(text) == {"risks": [{"clause_text": "A", "risk_level": "HIGH"}]}
@@ -0,0 +1,27 @@
+from conftest import analysis, risk, safe
+from core.revisions import compare_findings, plan_revision
+
+OLD = "1. Salary is paid monthly.\n\n2. Notice period is thirty days.\n\n3. Employee pays a penalty of ten lakh."
+PREVIOUS = analysis([risk("penalty of ten lakh")], [safe("Monthly salary", "Salary is paid monthly"), safe("30-Day Notice", "Notice period is thirty days")])
+
+# ==========================================
+# 1. NEGOTIATION ROUNDS (user-016)
+# ==========================================
+def test_only_the_rewritten_clause_is_sent_again():
+    plan = plan_revision(OLD, PREVIOUS, OLD.replace("thirty days", "ninety days"))
+    assert plan.changed_text.strip() == "2. Notice period is ninety days."
+    assert [r.clause_text for r in plan.carried.risks] == ["penalty of ten lakh"]
+
+def test_safe_clause_is_carried_only_while_its_clause_is_unchanged():
+    plan = plan_revision(OLD, PREVIOUS, OLD.replace("thirty days", "ninety days"))
+    assert [s.clause_summary for s in plan.carried.safe_clauses] == ["Monthly salary"]
+
+def test_diff_reports_introduced_and_resolved_risks():
+    new = OLD.replace("thirty days", "ninety days").replace("\n\n3. Employee pays a penalty of ten lakh.", "")
+    plan = plan_revision(OLD, PREVIOUS, new)
+    # Same region, different category: a new issue, not the old one re-worded
+    fresh = analysis([risk("Notice period is ninety days", "MEDIUM").model_copy(update={"category": "Career"})])
+    result, diff = compare_findings(plan, fresh)
+    assert [r.clause_text for r in diff.introduced] == ["Notice period is ninety days"]
+    assert [r.clause_text for r in diff.resolved] == ["penalty of ten lakh"]
+    assert [r.clause_text for r in result.risks] == ["Notice period is ninety days"]
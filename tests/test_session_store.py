@@ -0,0 +1,39 @@
+from conftest import analysis, risk
+from core.models import ContractAnalysis
+from core.session_store import SessionStore, SqliteSpill
+
+BIG = "x" * 5000
+
+# ==========================================
+# 1. BOUNDED SESSION STORE (user-019)
+# ==========================================
+def test_values_round_trip_as_their_own_type():
+    store = SessionStore()
+    store.set("s1", "analysis", analysis([risk("Penalty of Rs 3 lakh")]))
+    store.set("s1", "score", {"score": 40})
+    assert isinstance(store.get("s1", "analysis"), ContractAnalysis)
+    assert store.get("s1", "analysis").risks[0].clause_text == "Penalty of Rs 3 lakh"
+    assert store.get("s1", "score") == {"score": 40}
+    assert store.get("s2", "analysis", "missing") == "missing"
+
+def test_one_heavy_session_cannot_push_out_the_others():
+    store = SessionStore(max_bytes=10 ** 6, session_max_bytes=300)
+    store.set("light", "note", "keep me")
+    for i in range(20):
+        store.set("heavy", f"text{i}", BIG + str(i))
+    assert store.get("light", "note") == "keep me"
+    assert store.stats()["max_session_bytes"] <= 300
+    assert store.get("heavy", "text19") == BIG + "19"
+
+def test_evicted_values_come_back_from_the_spill(tmp_path):
+    store = SessionStore(max_bytes=400, session_max_bytes=10 ** 6, spill=SqliteSpill(str(tmp_path / "sessions.sqlite3")))
+    for i in range(10):
+        store.set(f"s{i}", "text", f"{i}" + BIG)
+    assert store.stats()["spills"] > 0
+    assert store.get("s0", "text") == "0" + BIG
+
+def test_dropped_session_is_gone():
+    store = SessionStore()
+    store.set("s1", "text", "hello")
+    store.drop_session("s1")
+    assert store.get("s1", "text") is None and store.stats()["memory_bytes"] == 0
@@ -0,0 +1,47 @@
+from conftest import analysis, risk, safe
+from core.similarity import NearDuplicateIndex, owning_clause
+
+BODY = "\n\n".join(f"{i}. The Employee shall observe standard rule number {i} regarding conduct and office policy at all times." for i in range(1, 40))
+TEXT = BODY + "\n\n40. Notice period is thirty days for either party.\n\n41. Employee pays a penalty of ten lakh rupees on resignation."
+FINDINGS = analysis([risk("pays a penalty of ten lakh rupees")], [safe("30-Day Notice", "Notice period is thirty days"), safe("Rule 7", "standard rule number 7 regarding")])
+
+def index_with(text=TEXT, findings=FINDINGS) -> NearDuplicateIndex:
+    index = NearDuplicateIndex(db_path="", threshold=0.8)
+    index.add("ns", text, findings)
+    return index
+
+# ==========================================
+# 1. REUSE ACROSS TEMPLATED CONTRACTS (user-015)
+# ==========================================
+def test_identical_contract_reuses_everything():
+    plan = index_with().plan("ns", TEXT)
+    assert not plan.changed
+    assert [r.clause_text for r in plan.reused.risks] == ["pays a penalty of ten lakh rupees"]
+    assert {s.clause_summary for s in plan.reused.safe_clauses} == {"30-Day Notice", "Rule 7"}
+
+def test_safe_clause_of_unchanged_clause_is_carried_after_an_edit():
+    plan = index_with().plan("ns", TEXT.replace("thirty days", "ninety days"))
+    assert len(plan.changed) == 1 and "ninety days" in plan.changed_text
+    assert [s.clause_summary for s in plan.reused.safe_clauses] == ["Rule 7"]
+    assert [r.clause_text for r in plan.reused.risks] == ["pays a penalty of ten lakh rupees"]
+
+def test_edited_clause_loses_its_risk():
+    plan = index_with().plan("ns", TEXT.replace("ten lakh", "twenty lakh"))
+    assert not plan.reused.risks
+    assert "twenty lakh" in plan.changed_text
+
+def test_other_namespace_reuses_nothing():
+    plan = index_with().plan("other rulebook", TEXT)
+    assert not plan.reused.risks and len(plan.changed) == len(plan.clauses)
+
+def test_paraphrased_quote_is_never_reused():
+    # The model's quote is in no clause: the clauses it probably came from are sent again instead of guessed
+    paraphrased = analysis([risk("Employee pays penalty of ten lakh rupees upon resignation")])
+    plan = index_with(findings=paraphrased).plan("ns", TEXT)
+    assert not plan.reused.risks
+    assert "ten lakh" in plan.changed_text
+
+def test_quote_owner_needs_containment():
+    clauses = ["Notice period is thirty days.", "Salary is paid monthly."]
+    assert owning_clause("thirty days", clauses) == 0
+    assert owning_clause("notice of thirty days", clauses) is None
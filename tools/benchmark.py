@@ -0,0 +1,324 @@
+import argparse
+import atexit
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from functools import lru_cache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.engine import EngineConfig, TrueClauseEngine, calculate_score, generate_report_text
+from core.local_llm import LocalChatModel
+from core.models import ContractAnalysis
+from rules import RULEBOOKS
+from synthetic_contracts import contract_pdf, contract_text, generate_pages, portfolio_columns, scanned_pdf
+
+# ==========================================
+# 1. MOCK PROVIDERS + FAILOVER SCENARIOS
+# ==========================================
+CLAUSE_SENTENCE = re.compile(r"[^.\n]*\b(?:shall|must|may)\b[^.\n]*\.")
+
+def mock_responder(messages, schema):
+    # Deterministic "model": quotes up to 3 obligation sentences of the contract back as risks
+    if schema is None:
+        return "Dear [Name],\n\nThank you for the agreement. We would like to revisit the clauses listed below.\n\nBest regards"
+    if schema.__name__ == "TranslationBatch":
+        # Explanation-language pass: echo every entry back, tagged so the output is visibly "translated"
+        entries = json.loads(str(messages[-1].content).rsplit("Entries:", 1)[-1])
+        return {"entries": [{k: v if k == "id" else f"[translated] {v}" for k, v in e.items()} for e in entries]}
+    contract = str(messages[-1].content).rsplit("Contract:", 1)[-1]
+    quotes = CLAUSE_SENTENCE.findall(contract)[:3]
+    return {
+        "risks": [{"clause_text": q.strip(), "risk_level": "HIGH" if i == 0 else "MEDIUM", "category": "Legal",
+                   "baseline": "Market standard", "deviation": "One-sided", "suggestion": "Negotiate"} for i, q in enumerate(quotes)],
+        "safe_clauses": [{"clause_summary": "Payment", "reason": "Standard terms"}],
+    }
+
+def malformed_responder(messages, schema):
+    # Schema drift like real models produce: "High", free-form categories, an item without its explanation
+    if schema is not None and schema.__name__ == "RiskRepairBatch":
+        entries = json.loads(str(messages[-1].content).rsplit("Entries:", 1)[-1])
+        return {"risks": [dict({"baseline": "Market standard", "deviation": "One-sided", "suggestion": "Negotiate"}, **e) for e in entries]}
+    answer = mock_responder(messages, schema)
+    if schema is not None and answer.get("risks"):
+        answer["risks"][0].update(risk_level="High", category="Employment terms")
+        del answer["risks"][-1]["suggestion"]
+    return answer
+
+# scenario -> latency -> (primary mock options, backup mock options); primary = "gemini" slot, backup = "groq" slot
+SCENARIOS = {
+    "healthy": lambda latency: ({}, {}),
+    "primary_flaky": lambda latency: ({"failure_rate": 0.3}, {}),
+    "primary_429": lambda latency: ({"rate_limit_rate": 0.5}, {}),
+    "primary_down": lambda latency: ({"failure_rate": 1.0}, {}),
+    # 1 call in 5 is 20x slower: the hedged backup should cut the tail
+    "primary_slow_tail": lambda latency: ({"slow_call_rate": 0.2, "slow_call_seconds": latency * 20}, {}),
+    # Answers that fail validation: repaired in place instead of re-running the prompt on the backup
+    "primary_malformed": lambda latency: ({"responder": malformed_responder}, {}),
+}
+
+def make_engine(scenario: str, latency: float, seed: int, near_duplicate_threshold: float = 0.0) -> TrueClauseEngine:
+    primary, backup = SCENARIOS[scenario](latency)
+    llms = {}
+    for name, options in (("gemini", primary), ("groq", backup)):
+        llms[name] = LocalChatModel(**{"model": f"mock-{name}", "responder": mock_responder, "latency_seconds": latency, "seed": seed, **options})
+    # Quotas, traces and the near-duplicate index off unless asked: this measures the engine itself.
+    # Every store lives in a fresh temp directory, never in the app's .trueclause_cache
+    store = tempfile.mkdtemp(prefix="trueclause-bench-", dir=_bench_dir())
+    paths = {field: os.path.join(store, name) for field, name in (("cache_path", "analysis.sqlite3"), ("similarity_path", "similarity.sqlite3"),
+                                                                  ("translation_cache_path", "translations.sqlite3"), ("ocr_cache_path", "ocr.sqlite3"),
+                                                                  ("analytics_path", "analytics"), ("feedback_spool_path", "feedback.sqlite3"))}
+    config = EngineConfig(gemini_api_key="mock", groq_api_key="mock", trace_path="", discord_webhook_url="", session_spill_path="", **paths,
+                          near_duplicate_threshold=near_duplicate_threshold, gemini_rpm=0, gemini_tpm=0, groq_rpm=0, groq_tpm=0)
+    return TrueClauseEngine(config, llms=llms)
+
+@lru_cache(maxsize=1)
+def _bench_dir() -> str:
+    # One per run, removed on exit
+    path = tempfile.mkdtemp(prefix="trueclause-bench-")
+    atexit.register(shutil.rmtree, path, True)
+    return path
+
+# ==========================================
+# 2. MEASUREMENT
+# ==========================================
+def summarize(samples: list, units: float = 1.0) -> dict:
+    # units: work items per call (pages for extraction), for the throughput column
+    ordered = sorted(samples)
+    pick = lambda p: ordered[min(int(p * len(ordered)), len(ordered) - 1)]
+    total = sum(ordered)
+    return {
+        "n": len(ordered),
+        "mean_ms": round(total / len(ordered) * 1000, 3),
+        "p50_ms": round(pick(0.50) * 1000, 3),
+        "p90_ms": round(pick(0.90) * 1000, 3),
+        "p99_ms": round(pick(0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "throughput_per_s": round(len(ordered) * units / total, 2) if total else None,
+    }
+
+def measure(fn, iterations: int, setup=None) -> list:
+    samples = []
+    for _ in range(iterations):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def iterations_for(pages: int, iterations: int) -> int:
+    # Big documents get fewer rounds so a full run stays in minutes
+    return max(3, min(iterations, 200 // pages))
+
+def run_suite(args) -> dict:
+    results = {}
+    rules = RULEBOOKS[args.doc_type]
+    docs = {pages: generate_pages(pages, args.doc_type, args.seed) for pages in args.pages}
+
+    # --- extract_text_from_pdf (upload cache cleared each round: cold parse) ---
+    engine = make_engine("healthy", args.latency, args.seed)
+    for pages, doc in docs.items():
+        pdf = contract_pdf(doc)
+        samples = measure(lambda: engine.extract_text_from_pdf(pdf), iterations_for(pages, args.iterations), setup=engine.pdf_cache.clear)
+        results[f"extract_text_from_pdf/{pages}p"] = summarize(samples, units=pages)
+
+    # --- prompt build: compile (cold) vs reuse (warm) + render with the contract ---
+    from core.prompts import PromptCompiler
+    llm = engine._get_llm("gemini")
+    text = contract_text(docs[min(docs)])
+    def build(compiler):
+        compiled = compiler.analysis("gemini", llm, ContractAnalysis, rules, "English", False)
+        compiled.chain.first.invoke(compiled.inputs(text, rules))
+    results["prompt_build/cold"] = summarize(measure(lambda: build(PromptCompiler()), args.iterations))
+    warm = PromptCompiler()
+    results["prompt_build/warm"] = summarize(measure(lambda: build(warm), args.iterations))
+
+    # --- analyze_contract per failover scenario (analysis cache cleared each round) ---
+    analysis = None
+    for scenario in args.scenarios:
+        engine = make_engine(scenario, args.latency, args.seed)
+        # Untimed warm-up: fills the latency history that hedging needs and lets circuit breakers settle
+        warmup_text = contract_text(docs[min(docs)])
+        for _ in range(args.warmup):
+            engine.analysis_cache.clear()
+            try:
+                engine.analyze_contract(warmup_text, rules, "English")
+            except RuntimeError:
+                pass
+        for pages, doc in docs.items():
+            text = contract_text(doc)
+            def analyze():
+                nonlocal analysis
+                analysis = engine.analyze_contract(text, rules, "English")
+            try:
+                samples = measure(analyze, iterations_for(pages, args.iterations), setup=engine.analysis_cache.clear)
+                results[f"analyze_contract/{scenario}/{pages}p"] = summarize(samples, units=pages)
+            except RuntimeError as e:
+                results[f"analyze_contract/{scenario}/{pages}p"] = {"error": str(e)}
+        results[f"analyze_contract/{scenario}/provider_calls"] = {name: llm.calls for name, llm in engine._llms.items()}
+        results[f"analyze_contract/{scenario}/output_repair"] = engine.repairs.stats()
+
+        risks = (analysis.risks if analysis else [])
+        samples = []
+        for _ in range(max(3, args.iterations // 4)):
+            started = time.perf_counter()
+            try:
+                engine.generate_email(risks, args.doc_type)
+            except RuntimeError:
+                pass
+            samples.append(time.perf_counter() - started)
+        results[f"generate_email/{scenario}"] = summarize(samples)
+
+    # --- templated contracts: edited copies of an analyzed contract (near-duplicate clause reuse) ---
+    engine = make_engine("healthy", args.latency, args.seed, near_duplicate_threshold=0.9)
+    for pages, doc in docs.items():
+        text = contract_text(doc)
+        engine.analyze_contract(text, rules, "English")
+        variants = iter(f"Reference No. TC-{i}\n{text}" for i in range(10 ** 6))
+        samples = measure(lambda: engine.analyze_contract(next(variants), rules, "English"), iterations_for(pages, args.iterations),
+                          setup=engine.analysis_cache.clear)
+        results[f"analyze_contract/near_duplicate/{pages}p"] = summarize(samples, units=pages)
+    results["analyze_contract/near_duplicate/index"] = engine.similar.stats()
+
+    # --- OCR of scanned pages (only pages without a text layer; needs pytesseract + tesseract) ---
+    from core.ocr import ocr_available, ocr_pages
+    if not ocr_available():
+        results["extract_pdf_pages/scanned"] = {"skipped": "pytesseract / tesseract not installed"}
+    else:
+        engine = make_engine("healthy", args.latency, args.seed)
+        for pages in args.ocr_pages:
+            pdf = scanned_pdf(generate_pages(pages))
+            def cold():
+                engine.pdf_cache.clear()
+                engine.ocr_cache.clear()
+            samples = measure(lambda: engine.extract_pdf_pages(pdf), 3, setup=cold)
+            results[f"extract_pdf_pages/scanned/{pages}p"] = summarize(samples, units=pages)
+            _, stats = ocr_pages(pdf, list(range(pages)))
+            results[f"extract_pdf_pages/scanned/{pages}p/ocr"] = stats
+            samples = measure(lambda: engine.extract_pdf_pages(pdf), 3, setup=engine.pdf_cache.clear)
+            results[f"extract_pdf_pages/scanned_cached/{pages}p"] = summarize(samples, units=pages)
+
+    # --- explanation language switch on an analyzed contract (translation pass vs. the full re-analysis it replaces) ---
+    engine = make_engine("healthy", args.latency, args.seed)
+    for pages, doc in docs.items():
+        canonical = engine.analyze_contract(contract_text(doc), rules, "English")
+        results[f"translate_analysis/cold/{pages}p"] = summarize(measure(lambda: engine.translate_analysis(canonical, "Hindi"), args.iterations,
+                                                                         setup=engine.translation_cache.clear))
+        results[f"translate_analysis/cached/{pages}p"] = summarize(measure(lambda: engine.translate_analysis(canonical, "Hindi"), args.iterations))
+
+    # --- portfolio analytics: every past analysis scored + aggregated at once (columnar store, vectorized) ---
+    from core.analytics import AnalyticsStore
+    with tempfile.TemporaryDirectory() as tmp:
+        store = AnalyticsStore(os.path.join(tmp, "analytics"))
+        store.append_columns(*portfolio_columns(args.portfolio_analyses, args.seed))
+        stamps = iter(range(10 ** 9))
+        results["analytics/record"] = summarize(measure(lambda: store.record(analysis or ContractAnalysis(risks=[], safe_clauses=[]), args.doc_type,
+                                                                             contract_key=f"{next(stamps):016x}"), args.iterations * 10))
+        queries = {
+            "all": {},
+            "vendors_high": {"portfolios": ["vendors"], "level": "HIGH"},
+            "freelance_90d": {"doc_types": ["freelance"], "since": time.time() - 90 * 86400},
+        }
+        for name, filters in queries.items():
+            results[f"portfolio/{args.portfolio_analyses}/{name}"] = summarize(measure(lambda: store.portfolio(**filters), args.iterations))
+        results[f"portfolio/{args.portfolio_analyses}/load"] = summarize(measure(lambda: AnalyticsStore(store.path).stats(), 3))
+        results[f"portfolio/{args.portfolio_analyses}/store"] = store.stats()
+
+    # --- clause anchoring: quoted clauses -> offsets + page in the extracted text (local, no LLM) ---
+    from core.anchoring import AnchorStats, ClauseAnchorIndex
+    for pages, doc in docs.items():
+        text = contract_text(doc)
+        quotes = CLAUSE_SENTENCE.findall(text)[:: max(1, len(CLAUSE_SENTENCE.findall(text)) // 50)][:50]
+        # What models actually send back: verbatim, elided ("A ... B") and invented quotes
+        quotes += [" ".join(q.split()[:4]) + "... " + " ".join(q.split()[-4:]) for q in quotes[:10]]
+        quotes += ["The Licensee shall indemnify the Licensor against all third party claims arising from the use of the Software."]
+        results[f"anchor_index/{pages}p"] = summarize(measure(lambda: ClauseAnchorIndex(text), iterations_for(pages, args.iterations)), units=pages)
+        index, stats = ClauseAnchorIndex(text), AnchorStats()
+        results[f"anchor_clauses/{pages}p"] = summarize(measure(lambda: stats.record(index.anchor(quotes)), args.iterations), units=len(quotes))
+        results[f"anchor_clauses/{pages}p/found"] = {key: value // args.iterations if isinstance(value, int) else value for key, value in stats.stats().items()}
+
+    # --- local document-type classifier (pre-selects the rulebook before any LLM call) ---
+    from core.classifier import classify_document
+    for pages, doc in docs.items():
+        text = contract_text(doc)
+        results[f"classify_document/{pages}p"] = summarize(measure(lambda: classify_document(text), args.iterations), units=pages)
+
+    # --- pure-CPU helpers on the last analysis ---
+    analysis = analysis or ContractAnalysis(risks=[], safe_clauses=[])
+    score = calculate_score(analysis.risks)
+    results["calculate_score"] = summarize(measure(lambda: calculate_score(analysis.risks), args.iterations * 50))
+    results["generate_report_text"] = summarize(measure(lambda: generate_report_text(analysis, score, "bench"), args.iterations * 50))
+    return results
+
+# ==========================================
+# 3. REPORT, JSON OUTPUT + COMPARISON
+# ==========================================
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+def print_table(results: dict, baseline: dict = None):
+    print(f"{'benchmark':<48}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'per s':>10}" + (f"{'p50 vs base':>13}" if baseline else ""))
+    for name, row in results.items():
+        if "p50_ms" not in row:
+            print(f"{name:<48}  {json.dumps(row)}")
+            continue
+        line = f"{name:<48}{row['p50_ms']:>10.2f}{row['p90_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['throughput_per_s'] or 0:>10.1f}"
+        base = (baseline or {}).get(name)
+        if base and base.get("p50_ms"):
+            line += f"{(row['p50_ms'] - base['p50_ms']) / base['p50_ms']:>+13.0%}"
+        print(line)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="TrueClause benchmark suite (mock providers, synthetic contracts, no API quota).")
+    parser.add_argument("-p", "--pages", type=int, nargs="+", default=[1, 10, 100], help="Synthetic contract sizes (1-500 pages)")
+    parser.add_argument("--ocr-pages", type=int, nargs="+", default=[1, 10], help="Scanned PDF sizes for the OCR benchmark")
+    parser.add_argument("--portfolio-analyses", type=int, default=300000, help="Stored analyses for the portfolio query benchmark")
+    parser.add_argument("-t", "--doc-type", default="employment", choices=sorted(RULEBOOKS))
+    parser.add_argument("-n", "--iterations", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock provider latency per call (seconds)")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--warmup", type=int, default=12, help="Untimed analyses per scenario before measuring")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Earlier results JSON to diff against (p50 change per benchmark)")
+    args = parser.parse_args(argv)
+    if any(not 1 <= pages <= 500 for pages in args.pages):
+        parser.error("page counts must be between 1 and 500")
+
+    started = time.time()
+    results = run_suite(args)
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": started,
+            "seconds": round(time.time() - started, 1),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_table(results, baseline)
+    print(f"\nSaved {len(results)} benchmarks to {args.output} ({report['meta']['seconds']}s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmark import measure, summarize
+from core.classifier import TEMPERATURE, build_classifier, classify_document, get_classifier
+from rules import RULEBOOKS
+from synthetic_contracts import contract_text, generate_pages
+
+# ==========================================
+# 1. ACCURACY ON THE LABELED SET
+# ==========================================
+def load_eval_set(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def evaluate(rows: list) -> dict:
+    labels = sorted(RULEBOOKS)
+    confusion = {truth: {predicted: 0 for predicted in labels} for truth in labels}
+    mistakes = []
+    for row in rows:
+        prediction = classify_document(row["text"])
+        confusion[row["label"]][prediction.doc_type] += 1
+        if prediction.doc_type != row["label"]:
+            mistakes.append({"label": row["label"], "predicted": prediction.doc_type, "confidence": prediction.confidence, "text": row["text"][:80]})
+    per_class = {}
+    for label in labels:
+        hits = confusion[label][label]
+        predicted = sum(confusion[truth][label] for truth in labels)
+        actual = sum(confusion[label].values())
+        per_class[label] = {"precision": round(hits / predicted, 3) if predicted else None, "recall": round(hits / actual, 3) if actual else None}
+    correct = sum(confusion[label][label] for label in labels)
+    return {"accuracy": round(correct / len(rows), 3), "n": len(rows), "per_class": per_class, "confusion": confusion, "mistakes": mistakes}
+
+# ==========================================
+# 2. TEMPERATURE SWEEP (TUNING SPLIT ONLY)
+# ==========================================
+TEMPERATURES = (0.005, 0.01, 0.02, 0.03, 0.05, 0.08, 0.12)
+
+def tune(rows: list) -> list:
+    # Accuracy first (the generic fallback depends on the confidence), then mean log-probability of the right label
+    results = []
+    for temperature in TEMPERATURES:
+        classifier, correct, log_prob = build_classifier(temperature), 0, 0.0
+        for row in rows:
+            prediction = classifier.predict(row["text"])
+            correct += prediction.doc_type == row["label"]
+            best = max(prediction.scores.values())
+            exp = {name: math.exp((s - best) / temperature) for name, s in prediction.scores.items()}
+            log_prob += math.log(max(exp.get(row["label"], 0.0) / sum(exp.values()), 1e-9))
+        results.append({"temperature": temperature, "accuracy": round(correct / len(rows), 3), "mean_log_prob": round(log_prob / len(rows), 3)})
+    return sorted(results, key=lambda r: (r["accuracy"], r["mean_log_prob"]), reverse=True)
+
+# ==========================================
+# 3. LATENCY (SNIPPETS + FULL-LENGTH SYNTHETIC CONTRACTS)
+# ==========================================
+def latency(rows: list, pages: list, iterations: int) -> dict:
+    results = {}
+    started = time.perf_counter()
+    build_classifier()
+    results["build_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    get_classifier()
+    texts = iter([row["text"] for row in rows] * iterations)
+    results["snippet"] = summarize(measure(lambda: classify_document(next(texts)), len(rows) * iterations))
+    for count in pages:
+        text = contract_text(generate_pages(count))
+        results[f"contract/{count}p"] = summarize(measure(lambda: classify_document(text), iterations))
+    return results
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Accuracy + latency of the local document-type classifier.")
+    parser.add_argument("--eval-set", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "doc_type_eval.jsonl"))
+    parser.add_argument("--tune-set", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "doc_type_tune.jsonl"),
+                        help="Separate labeled split the temperature is tuned on (never the eval set)")
+    parser.add_argument("--tune", action="store_true", help="Sweep the softmax temperature on --tune-set and exit")
+    parser.add_argument("-p", "--pages", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("-n", "--iterations", type=int, default=20)
+    parser.add_argument("-o", "--output", help="Write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.tune:
+        sweep = tune(load_eval_set(args.tune_set))
+        for row in sweep:
+            print(f"  temperature {row['temperature']:<6} accuracy {row['accuracy']:.1%}  mean log-prob {row['mean_log_prob']}")
+        print(f"Best: {sweep[0]['temperature']} (current TEMPERATURE = {TEMPERATURE})")
+        return 0
+
+    rows = load_eval_set(args.eval_set)
+    report = {"accuracy": evaluate(rows), "latency": latency(rows, args.pages, args.iterations)}
+    accuracy = report["accuracy"]
+    print(f"Accuracy: {accuracy['accuracy']:.1%} on {accuracy['n']} labeled documents")
+    for label, row in accuracy["per_class"].items():
+        print(f"  {label:<12} precision {row['precision']}  recall {row['recall']}")
+    for mistake in accuracy["mistakes"]:
+        print(f"  ✗ {mistake['label']} -> {mistake['predicted']} ({mistake['confidence']}): {mistake['text']}")
+    print(f"Build: {report['latency']['build_ms']} ms")
+    for name, row in report["latency"].items():
+        if isinstance(row, dict):
+            print(f"  {name:<16} p50 {row['p50_ms']:.3f} ms  p99 {row['p99_ms']:.3f} ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
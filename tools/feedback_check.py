@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmark import summarize
+from core.engine import EngineConfig, TrueClauseEngine
+
+# ==========================================
+# 1. STUB WEBHOOK (DISCORD-LIKE, WITH FAULTS)
+# ==========================================
+class StubWebhook(ThreadingHTTPServer):
+    # Fails the first `fail_first` posts with 503, answers every `rate_limit_every`-th post with a 429, records the rest
+    def __init__(self, fail_first: int = 0, rate_limit_every: int = 0, latency: float = 0.0):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.fail_first, self.rate_limit_every, self.latency = fail_first, rate_limit_every, latency
+        self.posts, self.received, self.connections = 0, [], set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/webhook"
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse shows up in the report
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        time.sleep(server.latency)
+        with server.lock:
+            server.posts += 1
+            server.connections.add(self.client_address[1])
+            if server.posts <= server.fail_first:
+                status, reply = 503, b""
+            elif server.rate_limit_every and server.posts % server.rate_limit_every == 0:
+                status, reply = 429, json.dumps({"retry_after": 0.2}).encode()
+            else:
+                status, reply = 204, b""
+                server.received.append(body["content"])
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, format, *args):
+        pass
+
+# ==========================================
+# 2. CHECK: EVERY MESSAGE ARRIVES, THE CALLER NEVER WAITS
+# ==========================================
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Feedback delivery against a local stub webhook (spool -> worker -> HTTP).")
+    parser.add_argument("-n", "--messages", type=int, default=50)
+    parser.add_argument("--fail-first", type=int, default=3, help="Stub answers the first N posts with 503")
+    parser.add_argument("--rate-limit-every", type=int, default=4, help="Stub answers every Nth post with 429 (0 = never)")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub response time (seconds)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args(argv)
+
+    stub = StubWebhook(args.fail_first, args.rate_limit_every, args.latency)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        config = EngineConfig(discord_webhook_url=stub.url, feedback_spool_path=os.path.join(tmp, "feedback.sqlite3"),
+                              cache_path="", similarity_path="", translation_cache_path="", ocr_cache_path="", trace_path="")
+        engine = TrueClauseEngine(config)
+        engine.feedback_delivery.base_backoff = 0.05  # seconds instead of minutes, same code path
+        samples = []
+        for i in range(args.messages):
+            started = time.perf_counter()
+            engine.send_feedback(f"Feedback #{i}: the notice period explanation was confusing.")
+            samples.append(time.perf_counter() - started)
+        flushed = engine.feedback_delivery.flush(args.timeout)
+        stats = engine.feedback_stats()
+        engine.feedback_delivery.stop()
+    stub.shutdown()
+
+    delivered = sum(content.count("Feedback #") for content in stub.received)
+    send = summarize(samples)
+    print(f"send_feedback: p50 {send['p50_ms']:.2f} ms  p99 {send['p99_ms']:.2f} ms (stub webhook takes {args.latency * 1000:.0f} ms)")
+    print(f"delivered {delivered}/{args.messages} in {len(stub.received)} webhook messages, {stub.posts} posts "
+          f"({stats['failures']} failed + retried) over {len(stub.connections)} connection(s)")
+    print(f"spool: {json.dumps({k: stats[k] for k in ('pending', 'delivered', 'dead')})}")
+    return 0 if flushed and delivered == args.messages else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# ==========================================
+# 1. CONFIG
+# ==========================================
+# What app.py pulls in before the first paint
+STARTUP_MODULES = ["components.sidebar", "components.analyze_ui", "components.demo_ui", "components.portfolio_ui",
+                   "components.dashboard_ui", "core.backend"]
+# Heavy modules that must only load on first use (first analysis / first PDF upload)
+LAZY_MODULES = ["langchain_google_genai", "langchain_groq", "langchain_core", "PyPDF2", "requests"]
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(?P<self>\d+)\s+\|\s+(?P<cumulative>\d+)\s+\|(?P<indent>\s*)(?P<module>\S+)")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ==========================================
+# 2. MEASURE (FRESH INTERPRETER, python -X importtime)
+# ==========================================
+def measure(modules: list) -> list:
+    code = "import " + ", ".join(modules)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            rows.append({
+                "module": match.group("module"),
+                "self_ms": int(match.group("self")) / 1000,
+                "cumulative_ms": int(match.group("cumulative")) / 1000,
+                "depth": (len(match.group("indent")) - 1) // 2,
+            })
+    return rows
+
+def top_level_breakdown(rows: list) -> dict:
+    # Group by top-level package: one line per package is what you act on (streamlit vs langchain vs ours)
+    totals = {}
+    for row in rows:
+        package = row["module"].split(".")[0]
+        totals[package] = totals.get(package, 0.0) + row["self_ms"]
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+# ==========================================
+# 3. REPORT + CHECK
+# ==========================================
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Per-module import-time report for the TrueClause UI cold start.")
+    parser.add_argument("--top", type=int, default=15, help="Packages to list")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a lazy module is imported at startup or the budget is exceeded")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="Max total import time for --check")
+    args = parser.parse_args(argv)
+
+    rows = measure(STARTUP_MODULES)
+    total_ms = sum(row["self_ms"] for row in rows)
+    print(f"Cold import of {', '.join(STARTUP_MODULES)}: {total_ms:.0f} ms across {len(rows)} modules\n")
+    print(f"{'package':<32}{'self ms':>10}{'share':>8}")
+    for package, ms in list(top_level_breakdown(rows).items())[:args.top]:
+        print(f"{package:<32}{ms:>10.1f}{ms / total_ms:>8.0%}")
+
+    print("\nOur modules:")
+    for row in rows:
+        if row["module"].split(".")[0] in ("core", "components", "rules"):
+            print(f"  {row['module']:<30}{row['self_ms']:>8.1f} ms self {row['cumulative_ms']:>8.1f} ms cumulative")
+
+    loaded = {row["module"].split(".")[0] for row in rows}
+    eager = [m for m in LAZY_MODULES if m in loaded]
+    print(f"\nLazy modules imported at startup: {', '.join(eager) if eager else 'none'}")
+    if args.check:
+        failures = []
+        if eager:
+            failures.append(f"eagerly imported: {', '.join(eager)}")
+        if total_ms > args.budget_ms:
+            failures.append(f"{total_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        if failures:
+            print("CHECK FAILED: " + "; ".join(failures))
+            return 1
+        print("CHECK PASSED")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import argparse
+import io
+import os
+import random
+import sys
+import textwrap
+import time
+
+# ==========================================
+# 1. CLAUSE LIBRARY (ASCII ONLY, PDF BASE-14 FONTS)
+# ==========================================
+# Risky clauses hit rulebook triggers, standard ones should pass; the mix drives the pre-screen realistically
+RISKY_CLAUSES = [
+    ("NON-COMPETE", "The {party} shall not engage in any business that competes with the Company anywhere in the world for a period of five (5) years after termination."),
+    ("TRAINING BOND", "The {party} agrees to a service bond of Rs. 3,00,000 and training recovery charges shall be deducted from the final salary if the {party} resigns within two years."),
+    ("NOTICE PERIOD", "The {party} must serve a notice period of 180 days, while the Company may terminate this agreement immediately without any notice."),
+    ("INTELLECTUAL PROPERTY", "All intellectual property, including side projects created on personal devices outside working hours, shall belong exclusively to the Company."),
+    ("MODIFICATION", "The Company may modify or amend these terms at any time at its sole discretion without the consent of the {party}."),
+    ("LIABILITY", "The {party} shall indemnify and hold harmless the Company against all claims, and such liability shall be unlimited."),
+    ("PAYMENT", "The Company may withhold payment until internal approval is obtained and the deliverables are to its complete satisfaction."),
+    ("CONFIDENTIALITY", "The obligations of confidentiality shall survive in perpetuity and apply to all information whether or not marked confidential."),
+    ("DISPUTES", "Any dispute shall be resolved exclusively by arbitration seated at a location chosen by the Company, and the {party} waives any class action."),
+]
+
+STANDARD_CLAUSES = [
+    ("COMPENSATION", "The {party} shall be paid a monthly amount of Rs. {amount} on or before the seventh day of each calendar month by bank transfer."),
+    ("WORKING HOURS", "Normal working hours are nine hours per day, five days a week, inclusive of a one hour lunch break."),
+    ("LEAVE", "The {party} is entitled to eighteen days of paid leave per year in addition to public holidays notified by the Company."),
+    ("EXPENSES", "Reasonable travel expenses incurred for approved business purposes will be reimbursed within thirty days of submission of receipts."),
+    ("TERMINATION", "Either party may terminate this agreement by giving thirty days written notice to the other party."),
+    ("GOVERNING LAW", "This agreement is governed by the laws of India and the courts at the city of the {party}'s ordinary residence shall have jurisdiction."),
+    ("CONFIDENTIALITY", "Confidential information excludes information that is public, already known to the {party}, or independently developed."),
+    ("ENTIRE AGREEMENT", "This document constitutes the entire agreement between the parties and supersedes all prior discussions on its subject matter."),
+    ("NOTICES", "All notices under this agreement shall be in writing and delivered by email to the addresses recorded on the first page."),
+    ("SEVERABILITY", "If any provision is held unenforceable, the remaining provisions shall continue in full force and effect."),
+]
+
+PARTIES = {"employment": "Employee", "rent": "Tenant", "freelance": "Contractor", "nda": "Receiving Party", "tos": "User", "generic": "Party"}
+LINES_PER_PAGE = 48
+CHARS_PER_LINE = 90
+
+# ==========================================
+# 2. GENERATOR
+# ==========================================
+def generate_pages(pages: int, doc_type: str = "employment", seed: int = 0, risky_share: float = 0.25) -> list:
+    # Deterministic for (pages, doc_type, seed, risky_share): benchmark runs compare like with like
+    rng = random.Random(f"{pages}|{doc_type}|{seed}|{risky_share}")
+    party = PARTIES.get(doc_type, "Party")
+    lines, number = [f"{doc_type.upper()} AGREEMENT", ""], 1
+    while len(lines) < pages * LINES_PER_PAGE:
+        title, body = rng.choice(RISKY_CLAUSES if rng.random() < risky_share else STANDARD_CLAUSES)
+        body = body.format(party=party, amount=f"{rng.randrange(20, 200) * 1000:,}")
+        lines.append(f"{number}. {title}")
+        lines.extend(textwrap.wrap(body, CHARS_PER_LINE))
+        lines.append("")
+        number += 1
+    return ["\n".join(lines[i:i + LINES_PER_PAGE]) for i in range(0, pages * LINES_PER_PAGE, LINES_PER_PAGE)]
+
+def contract_text(pages: list) -> str:
+    return "\n".join(pages) + "\n"
+
+def contract_pdf(pages: list) -> bytes:
+    # Minimal PDF 1.4 writer (one Helvetica text object per page) so the suite needs no PDF library
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in pages:
+        escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in page.split("\n")]
+        stream = "BT /F1 10 Tf 40 800 Td 16 TL " + " ".join(f"({line}) '" for line in escaped) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {len(objects)} 0 R "
+                       "/Resources << /Font << /F1 3 0 R >> >> >>")
+        kids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>"
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+def scanned_pdf(pages: list, dpi: int = 150) -> bytes:
+    # "Scanned" copy: every page is one grayscale image, no text layer (the OCR benchmark input). Needs Pillow.
+    from PIL import Image, ImageDraw, ImageFont
+    width, height = int(8.27 * dpi), int(11.69 * dpi)
+    font = ImageFont.load_default(size=dpi // 9)
+    images = []
+    for page in pages:
+        image = Image.new("L", (width, height), 255)
+        ImageDraw.Draw(image).multiline_text((dpi // 2, dpi // 2), page, fill=0, font=font, spacing=dpi // 20)
+        images.append(image)
+    out = io.BytesIO()
+    images[0].save(out, "PDF", resolution=dpi, save_all=True, append_images=images[1:])
+    return out.getvalue()
+
+def portfolio_columns(analyses: int, seed: int = 0, days: int = 365) -> tuple:
+    # Past analyses in AnalyticsStore.append_columns layout (portfolio benchmark input). Needs NumPy.
+    # Vendor contracts skew towards Financial / Legal risks so a "what drives HIGH risk" query has a visible answer.
+    import numpy as np
+    from core.analytics import CATEGORY_CODES
+    rng = np.random.default_rng(seed)
+    vocab = {"doc_type": ["employment", "rent", "freelance", "nda", "tos", "generic"], "portfolio": ["default", "vendors", "hiring"]}
+    doc_type = rng.choice(len(vocab["doc_type"]), analyses, p=[0.3, 0.15, 0.25, 0.1, 0.1, 0.1]).astype("int16")
+    portfolio = np.where(doc_type == 2, 1, np.where(doc_type == 0, 2, 0)).astype("int16")
+    risk_counts = rng.poisson(np.where(portfolio == 1, 4.0, 2.5))
+    row = np.repeat(np.arange(analyses, dtype="int64"), risk_counts)
+    vendor = portfolio[row] == 1
+    level = (rng.random(len(row)) >= np.where(vendor, 0.45, 0.3)).astype("int8")
+    weights = {False: [0.25, 0.3, 0.15, 0.2, 0.1], True: [0.45, 0.05, 0.1, 0.35, 0.05]}
+    category = np.where(vendor, rng.choice(len(CATEGORY_CODES), len(row), p=weights[True]),
+                        rng.choice(len(CATEGORY_CODES), len(row), p=weights[False])).astype("int8")
+    high = np.bincount(row[level == 0], minlength=analyses).astype("int16")
+    columns = {
+        "ts": np.sort(rng.uniform(time.time() - days * 86400, time.time(), analyses)),
+        "doc_type": doc_type, "portfolio": portfolio, "high": high, "medium": (risk_counts - high).astype("int16"),
+        "safe": rng.integers(0, 6, analyses).astype("int16"), "contract": rng.integers(1, 2 ** 63, analyses, dtype="int64").astype("uint64"),
+    }
+    return columns, {"row": row, "level": level, "category": category}, vocab
+
+# ==========================================
+# 3. CLI (WRITE A CORPUS TO DISK)
+# ==========================================
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate deterministic synthetic contracts (text + PDF) for benchmarks.")
+    parser.add_argument("output_dir")
+    parser.add_argument("-p", "--pages", type=int, nargs="+", default=[1, 10, 100, 500], help="Page counts (1-500)")
+    parser.add_argument("-t", "--doc-type", default="employment", choices=sorted(PARTIES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--risky-share", type=float, default=0.25, help="Fraction of clauses that should be flagged")
+    parser.add_argument("--scanned", action="store_true", help="Also write an image-only copy (<stem>_scanned.pdf) for OCR")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for count in args.pages:
+        if not 1 <= count <= 500:
+            parser.error("page counts must be between 1 and 500")
+        pages = generate_pages(count, args.doc_type, args.seed, args.risky_share)
+        stem = os.path.join(args.output_dir, f"{args.doc_type}_{count:03d}p")
+        with open(stem + ".txt", "w", encoding="utf-8") as f:
+            f.write(contract_text(pages))
+        with open(stem + ".pdf", "wb") as f:
+            f.write(contract_pdf(pages))
+        if args.scanned:
+            with open(stem + "_scanned.pdf", "wb") as f:
+                f.write(scanned_pdf(pages))
+        print(f"{stem}.txt / .pdf ({count} pages)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())